@@ -0,0 +1,657 @@
+"""
+Shared client layer for the search backends.
+
+One backend object per server, created once and reused by every caller
+(scripts, the Django app, hybrid_search):
+
+    from backends import TypesenseBackend, register, get
+    register(TypesenseBackend("typesense", "http://localhost:8108", api_key="..."))
+    get("typesense").collections["machinedata"].documents.search(params, timeout=0.5)
+
+- HttpBackend keeps a pool of keep-alive HTTP/1.1 connections (sync) and a
+  separate per-event-loop pool for the asyncio variant (arequest), so a
+  fan-out of N searches costs N requests, not N TCP handshakes. An event
+  loop that ends with the request (an async Django view under WSGI) must
+  call aclose_pools() before it finishes; only a long-lived loop (ASGI)
+  reuses connections across requests.
+- every call has a deadline (timeout seconds, default from the backend);
+  retries with full-jitter backoff never sleep past it. Idempotent requests
+  are retried on connection errors and 429/502/503/504; others only when
+  the request provably never reached the server (see _unsent).
+- each backend records its latencies in a LatencyHistogram;
+  latency_stats() returns a snapshot of all of them.
+
+Only the standard library is used; MilvusBackend wraps a pymilvus Collection
+(or milvus_bm25.LocalCollection) and runs its blocking calls on a bounded
+executor.
+"""
+import asyncio
+import http.client
+import json
+import random
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from urllib.parse import urlencode, urlsplit
+
+RETRYABLE_STATUS = {429, 502, 503, 504}
+# stale keep-alive sockets and refused / reset connections
+_CONNECTION_ERRORS = (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine,
+                      asyncio.IncompleteReadError)
+
+
+def _unsent(exc, sent):
+    """
+    Whether a connection error proves the server never got the request:
+    it failed while connecting or writing, or the server closed the socket
+    (typically an idle keep-alive one) before sending a single response
+    byte. Only then may a non-idempotent request be resent.
+    """
+    return not sent or isinstance(exc, http.client.RemoteDisconnected)
+
+
+class BackendError(Exception):
+    """Non-2xx response from a backend."""
+
+    def __init__(self, status, message, backend=None):
+        super().__init__(f"[{status}] {message}")
+        self.status = status
+        self.message = message
+        self.backend = backend
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, timeout):
+        self.expires = time.monotonic() + timeout
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def check(self, what="request"):
+        left = self.remaining()
+        if left <= 0:
+            raise DeadlineExceeded(f"{what} exceeded its deadline")
+        return left
+
+
+def _backoff(attempt, base, deadline):
+    """Full-jitter exponential backoff, never past the deadline."""
+    return max(0.0, min(random.uniform(0, base * 2 ** attempt), deadline.remaining()))
+
+
+# ---------------------------------------------------------------------------
+# Latency histograms
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets (milliseconds); thread-safe, O(1) per observation."""
+
+    BOUNDS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect_left(self.BOUNDS_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.errors += error
+
+    def quantile(self, q):
+        """Upper bound (ms) of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.BOUNDS_MS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "mean_ms": self.total_ms / self.count if self.count else 0.0,
+                "p50_ms": self.quantile(0.5),
+                "p95_ms": self.quantile(0.95),
+                "p99_ms": self.quantile(0.99),
+                "buckets": {f"le_{b}ms": n for b, n in zip(self.BOUNDS_MS + ("inf",), self.counts)},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.count = self.errors = 0
+            self.total_ms = 0.0
+
+
+_HISTOGRAMS = {}
+_REGISTRY = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name):
+    with _registry_lock:
+        if name not in _HISTOGRAMS:
+            _HISTOGRAMS[name] = LatencyHistogram(name)
+        return _HISTOGRAMS[name]
+
+
+def latency_stats():
+    """{backend name: histogram snapshot} for every backend that has been called."""
+    return {name: h.snapshot() for name, h in sorted(_HISTOGRAMS.items())}
+
+
+def register(backend):
+    """Make backend available to every caller under backend.name; returns it."""
+    with _registry_lock:
+        _REGISTRY[backend.name] = backend
+    return backend
+
+
+def get(name):
+    return _REGISTRY[name]
+
+
+async def aclose_pools():
+    """Close every registered backend's connections on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for backend in list(_REGISTRY.values()):
+        pool = getattr(backend, "_apools", {}).pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+
+class HttpBackend:
+    """
+    JSON-over-HTTP backend with pooled keep-alive connections.
+
+    request() / arequest() return the decoded JSON body (or text for non-JSON
+    responses) and raise BackendError on non-2xx, DeadlineExceeded when the
+    call's deadline passes.
+    """
+
+    def __init__(self, name, url, headers=None, pool_size=8, timeout=2.0, retries=2, backoff=0.05):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url!r}")
+        self.name = name
+        self.url = url
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.headers = dict(headers or {})
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.histogram = histogram(name)
+        self._idle = deque()                     # idle sync connections, most recent last
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._apools = weakref.WeakKeyDictionary()   # event loop -> _AsyncPool
+
+    # -- sync ---------------------------------------------------------------
+
+    def _connect(self, timeout):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=timeout)
+
+    def _encode(self, method, path, params, body):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = dict(self.headers)
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if body is not None:
+            headers["Content-Length"] = str(len(body))
+        return path, headers, body
+
+    def _decode(self, status, content_type, data):
+        text = data.decode("utf-8")
+        payload = json.loads(text) if "json" in (content_type or "") and text else text
+        if not 200 <= status < 300:
+            message = payload.get("message", text) if isinstance(payload, dict) else text
+            raise BackendError(status, message, self.name)
+        return payload
+
+    def _send_once(self, method, path, headers, body, deadline):
+        if not self._slots.acquire(timeout=max(deadline.remaining(), 0)):
+            raise DeadlineExceeded(f"{self.name}: no free connection before the deadline")
+        conn = None
+        sent = False
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            conn = conn or self._connect(deadline.remaining())
+            conn.timeout = deadline.check(self.name)
+            if conn.sock is not None:
+                conn.sock.settimeout(conn.timeout)
+            conn.request(method, path, body=body, headers=headers)
+            sent = True
+            resp = conn.getresponse()                # RemoteDisconnected only if no status line byte came
+            data = resp.read()
+            if resp.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+            conn = None
+            return resp.status, resp.getheader("Content-Type"), data
+        except TimeoutError as exc:
+            raise DeadlineExceeded(f"{self.name}: {exc or 'timed out'}") from exc
+        except _CONNECTION_ERRORS as exc:
+            exc.unsent = _unsent(exc, sent)
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+            self._slots.release()
+
+    def request(self, method, path, params=None, body=None, timeout=None, idempotent=None):
+        deadline = Deadline(self.timeout if timeout is None else timeout)
+        idempotent = method in ("GET", "HEAD", "PUT", "DELETE") if idempotent is None else idempotent
+        path, headers, body = self._encode(method, path, params, body)
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    status, content_type, data = self._send_once(method, path, headers, body, deadline)
+                    if status in RETRYABLE_STATUS and idempotent and attempt < self.retries:
+                        raise BackendError(status, "retryable status", self.name)
+                    result = self._decode(status, content_type, data)
+                    self.histogram.observe(time.perf_counter() - start)
+                    return result
+                except (BackendError, *_CONNECTION_ERRORS) as exc:
+                    retryable = (getattr(exc, "status", None) in RETRYABLE_STATUS and idempotent) \
+                        or (not isinstance(exc, BackendError) and (idempotent or getattr(exc, "unsent", False)))
+                    if not retryable or attempt >= self.retries or deadline.remaining() <= 0:
+                        raise
+                time.sleep(_backoff(attempt, self.backoff, deadline))
+                attempt += 1
+        except Exception:
+            self.histogram.observe(time.perf_counter() - start, error=True)
+            raise
+
+    def get(self, path, params=None, timeout=None):
+        return self.request("GET", path, params=params, timeout=timeout)
+
+    def post(self, path, body=None, params=None, timeout=None, idempotent=False):
+        return self.request("POST", path, params=params, body=body, timeout=timeout, idempotent=idempotent)
+
+    # -- asyncio ------------------------------------------------------------
+
+    def _apool(self):
+        loop = asyncio.get_running_loop()
+        pool = self._apools.get(loop)
+        if pool is None:
+            pool = self._apools[loop] = _AsyncPool(self)
+        return pool
+
+    async def arequest(self, method, path, params=None, body=None, timeout=None, idempotent=None):
+        """asyncio variant of request(); connections are pooled per event loop."""
+        deadline = Deadline(self.timeout if timeout is None else timeout)
+        idempotent = method in ("GET", "HEAD", "PUT", "DELETE") if idempotent is None else idempotent
+        path, headers, body = self._encode(method, path, params, body)
+        pool = self._apool()
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    left = deadline.check(self.name)
+                    try:
+                        status, content_type, data = await asyncio.wait_for(
+                            pool.send(method, path, headers, body), left)
+                    except asyncio.TimeoutError as exc:
+                        raise DeadlineExceeded(f"{self.name}: timed out") from exc
+                    if status in RETRYABLE_STATUS and idempotent and attempt < self.retries:
+                        raise BackendError(status, "retryable status", self.name)
+                    result = self._decode(status, content_type, data)
+                    self.histogram.observe(time.perf_counter() - start)
+                    return result
+                except (BackendError, *_CONNECTION_ERRORS) as exc:
+                    retryable = (getattr(exc, "status", None) in RETRYABLE_STATUS and idempotent) \
+                        or (not isinstance(exc, BackendError) and (idempotent or getattr(exc, "unsent", False)))
+                    if not retryable or attempt >= self.retries or deadline.remaining() <= 0:
+                        raise
+                await asyncio.sleep(_backoff(attempt, self.backoff, deadline))
+                attempt += 1
+        except BaseException:
+            self.histogram.observe(time.perf_counter() - start, error=True)
+            raise
+
+    async def aget(self, path, params=None, timeout=None):
+        return await self.arequest("GET", path, params=params, timeout=timeout)
+
+    async def apost(self, path, body=None, params=None, timeout=None, idempotent=False):
+        return await self.arequest("POST", path, params=params, body=body, timeout=timeout, idempotent=idempotent)
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+        for loop, pool in list(self._apools.items()):
+            if not loop.is_closed():             # a closed loop can no longer close its transports
+                pool.close()
+
+
+class _AsyncPool:
+    """Minimal HTTP/1.1 client over asyncio streams (Content-Length or chunked bodies)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.idle = []
+        self.slots = asyncio.Semaphore(backend.pool_size)
+
+    async def send(self, method, path, headers, body):
+        b = self.backend
+        async with self.slots:
+            sent = False
+            try:
+                reader, writer = self.idle.pop() if self.idle else \
+                    await asyncio.open_connection(b.host, b.port, ssl=b.https or None)
+            except _CONNECTION_ERRORS as exc:
+                exc.unsent = True
+                raise
+            try:
+                head = [f"{method} {path} HTTP/1.1", f"Host: {b.host}:{b.port}"]
+                head += [f"{k}: {v}" for k, v in headers.items()]
+                if body is None and method in ("POST", "PUT", "PATCH"):
+                    head.append("Content-Length: 0")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (body or b""))
+                await writer.drain()
+                sent = True
+                status, resp_headers, data, keep = await self._read_response(reader)
+            except _CONNECTION_ERRORS as exc:
+                writer.close()
+                exc.unsent = _unsent(exc, sent)
+                raise
+            except BaseException:
+                writer.close()                   # cancelled mid-response: the socket is unusable
+                raise
+            if keep:
+                self.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, resp_headers.get("content-type"), data
+
+    @staticmethod
+    async def _read_response(reader):
+        line = await reader.readline()
+        if not line:
+            raise http.client.RemoteDisconnected("connection closed by server")
+        version, status = line.decode("latin-1").split(" ", 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass                     # trailers
+                    break
+                data += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data, keep = await reader.read(), False
+        return int(status), headers, bytes(data), keep
+
+    def close(self):
+        while self.idle:
+            self.idle.pop()[1].close()
+
+    async def aclose(self):
+        writers = [writer for _, writer in self.idle]
+        self.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except _CONNECTION_ERRORS:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# Typesense
+
+class _RemoteDocuments:
+    def __init__(self, backend, name):
+        self._backend = backend
+        self._path = f"/collections/{name}/documents"
+
+    def search(self, params, timeout=None):
+        return self._backend.get(self._path + "/search", params=params, timeout=timeout)
+
+    async def asearch(self, params, timeout=None):
+        return await self._backend.aget(self._path + "/search", params=params, timeout=timeout)
+
+    def create(self, document, timeout=None):
+        return self._backend.post(self._path, body=document, timeout=timeout)
+
+    def upsert(self, document, timeout=None):
+        return self._backend.post(self._path, body=document, params={"action": "upsert"},
+                                  timeout=timeout, idempotent=True)
+
+    def import_(self, documents, import_parameters=None, timeout=None):
+        """JSONL string in, JSONL results out (lists of dicts are encoded/decoded for you)."""
+        params = dict(import_parameters or {})
+        raw = isinstance(documents, (str, bytes))
+        body = documents if raw else "\n".join(json.dumps(d) for d in documents)
+        result = self._backend.post(self._path + "/import", body=body, params=params, timeout=timeout,
+                                    idempotent=params.get("action") == "upsert")
+        return result if raw else [json.loads(line) for line in result.split("\n") if line.strip()]
+
+
+class _RemoteCollection:
+    def __init__(self, backend, name):
+        self._backend = backend
+        self.name = name
+        self.documents = _RemoteDocuments(backend, name)
+
+    def retrieve(self, timeout=None):
+        return self._backend.get(f"/collections/{self.name}", timeout=timeout)
+
+    def delete(self, timeout=None):
+        return self._backend.request("DELETE", f"/collections/{self.name}", timeout=timeout)
+
+
+class _RemoteCollections:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getitem__(self, name):
+        return _RemoteCollection(self._backend, name)
+
+    def create(self, schema, timeout=None):
+        return self._backend.post("/collections", body=schema, timeout=timeout)
+
+
+class TypesenseBackend(HttpBackend):
+    """
+    Pooled Typesense client with the same collections[name].documents
+    surface as typesense.Client (search/create/upsert/import_), plus
+    asearch() for asyncio fan-out. Works against stub_servers.TypesenseStub.
+    """
+
+    def __init__(self, name, url="http://localhost:8108", api_key="xyz", **kwargs):
+        headers = dict(kwargs.pop("headers", None) or {}, **{"X-TYPESENSE-API-KEY": api_key})
+        super().__init__(name, url, headers=headers, **kwargs)
+        self.collections = _RemoteCollections(self)
+
+    def health(self, timeout=None):
+        return self.get("/health", timeout=timeout)
+
+
+# ---------------------------------------------------------------------------
+# Milvus
+
+class MilvusBackend:
+    """
+    Deadline, retry and histogram wrapper around a Milvus collection
+    (pymilvus Collection or milvus_bm25.LocalCollection) and its vectorizer.
+    pymilvus is blocking, so calls run on a bounded executor; the executor
+    size caps concurrent searches the same way the HTTP pool does.
+    """
+
+    def __init__(self, name, collection, vectorizer, timeout=2.0, retries=2, backoff=0.05, max_workers=8):
+        self.name = name
+        self.collection = collection
+        self.vectorizer = vectorizer
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.histogram = histogram(name)
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=f"{name}-")
+
+    @staticmethod
+    def _retryable(exc):
+        return isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ == "MilvusException"
+
+    def search_many(self, queries, top_k=1, timeout=None):
+        from milvus_bm25 import milvus_search_many
+
+        deadline = Deadline(self.timeout if timeout is None else timeout)
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                future = self._pool.submit(milvus_search_many, self.collection, self.vectorizer, queries, top_k)
+                try:
+                    result = future.result(timeout=deadline.check(self.name))
+                    self.histogram.observe(time.perf_counter() - start)
+                    return result
+                except FutureTimeout as exc:
+                    future.cancel()
+                    raise DeadlineExceeded(f"{self.name}: timed out") from exc
+                except Exception as exc:
+                    if isinstance(exc, DeadlineExceeded) or not self._retryable(exc) \
+                            or attempt >= self.retries or deadline.remaining() <= 0:
+                        raise
+                time.sleep(_backoff(attempt, self.backoff, deadline))
+                attempt += 1
+        except Exception:
+            self.histogram.observe(time.perf_counter() - start, error=True)
+            raise
+
+    def search(self, query, top_k=1, timeout=None):
+        return self.search_many([query], top_k, timeout)[0]
+
+    async def asearch_many(self, queries, top_k=1, timeout=None):
+        """asyncio variant of search_many(): awaits the bounded executor directly."""
+        from milvus_bm25 import milvus_search_many
+
+        loop = asyncio.get_running_loop()
+        deadline = Deadline(self.timeout if timeout is None else timeout)
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                future = loop.run_in_executor(self._pool, milvus_search_many, self.collection, self.vectorizer,
+                                              queries, top_k)
+                try:
+                    result = await asyncio.wait_for(future, deadline.check(self.name))
+                    self.histogram.observe(time.perf_counter() - start)
+                    return result
+                except asyncio.TimeoutError as exc:
+                    raise DeadlineExceeded(f"{self.name}: timed out") from exc
+                except Exception as exc:
+                    if isinstance(exc, DeadlineExceeded) or not self._retryable(exc) \
+                            or attempt >= self.retries or deadline.remaining() <= 0:
+                        raise
+                await asyncio.sleep(_backoff(attempt, self.backoff, deadline))
+                attempt += 1
+        except BaseException:
+            self.histogram.observe(time.perf_counter() - start, error=True)
+            raise
+
+    async def asearch(self, query, top_k=1, timeout=None):
+        return (await self.asearch_many([query], top_k, timeout))[0]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    # Pooled vs. per-request connections, and sequential vs. asyncio fan-out,
+    # against the Typesense stub.
+    import urllib.request
+
+    from stub_servers import TypesenseStub
+    from typesense_loader import load
+
+    with TypesenseStub(latency=0.002) as stub:
+        ts = register(TypesenseBackend("typesense", stub.url, pool_size=16))
+        load(ts, "sample.csv", "machinedata")
+        params = {"q": "17FU4", "query_by": "ProductName,Brand,MPN", "per_page": 3}
+        search_url = f"{stub.url}/collections/machinedata/documents/search?{urlencode(params)}"
+        n = 300
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            with urllib.request.urlopen(search_url, timeout=2) as resp:
+                json.load(resp)
+        fresh = (time.perf_counter() - t0) / n
+        t0 = time.perf_counter()
+        for _ in range(n):
+            ts.collections["machinedata"].documents.search(params)
+        pooled = (time.perf_counter() - t0) / n
+        print(f"new connection per request: {fresh * 1e3:.2f} ms/search, pooled keep-alive: {pooled * 1e3:.2f} ms/search")
+
+        queries = [dict(params, q=q) for q in ["17FU4", "YTIE99", "Q51PTG4Z", "847VDJ", "53RVRPUI"] * 4]
+
+        async def fan_out():
+            docs = ts.collections["machinedata"].documents
+            return await asyncio.gather(*(docs.asearch(p) for p in queries))
+
+        stub.latency = 0.02                      # a remote server: 20 ms round trip
+        t0 = time.perf_counter()
+        for p in queries:
+            ts.collections["machinedata"].documents.search(p)
+        seq = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        results = asyncio.run(fan_out())
+        fan = time.perf_counter() - t0
+        print(f"{len(queries)} searches at 20 ms RTT: sequential {seq * 1e3:.1f} ms, "
+              f"asyncio fan-out {fan * 1e3:.1f} ms ({sum(r['found'] for r in results)} hits)")
+
+        stub.latency = 0.2
+        try:
+            ts.collections["machinedata"].documents.search(params, timeout=0.05)
+        except DeadlineExceeded as exc:
+            print("deadline:", exc)
+        stub.latency = 0.0
+
+        snap = latency_stats()["typesense"]
+        print(f"typesense: {snap['count']} calls, {snap['errors']} errors, "
+              f"p50 <= {snap['p50_ms']} ms, p99 <= {snap['p99_ms']} ms")
@@ -0,0 +1,157 @@
+"""
+Score a file of name pairs in parallel.
+
+    python batch_score.py pairs.csv -o scores.csv --scorer ptic --workers 32
+
+Pairs are read in chunks (CSV, JSONL or Parquet), sharded across a process
+pool whose workers warm up their scorer once, and written back in input
+order. At most max_in_flight chunks are queued at a time, so reading blocks
+when the workers fall behind.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+SCORERS = {
+    "search_match": "0-100 token Levenshtein (search_match.name_similarity)",
+    "ptic": "0-1 Beider-Morse (ptic.compute_name_similarity)",
+    "stapp": "0-100 Name Match app score (name_score.calculate_match_score)",
+}
+
+_SCORER = None                             # per-worker scorer, set by _init_worker
+
+
+def _load_scorer(scorer):
+    """Import the scorer lazily so workers only pay for the one they use."""
+    if scorer == "search_match":
+        from search_match import name_similarity
+        return name_similarity
+    if scorer == "ptic":
+        from ptic import compute_name_similarity
+        return compute_name_similarity
+    if scorer == "stapp":
+        from name_score import calculate_match_score
+        return lambda a, b: calculate_match_score([a], [b])
+    raise ValueError(f"unknown scorer {scorer!r}, expected one of {sorted(SCORERS)}")
+
+
+def _init_worker(scorer):
+    """Resolve the scorer and build its encoder state once per worker process."""
+    global _SCORER
+    _SCORER = _load_scorer(scorer)
+    _SCORER("warm up", "warm up")          # imports the module, builds encoders / caches
+
+
+def _score_chunk(pairs):
+    start = time.perf_counter()
+    scores = [_SCORER(a, b) for a, b in pairs]
+    return os.getpid(), time.perf_counter() - start, scores
+
+
+def read_pairs(path, col1="name1", col2="name2", chunk_size=1000):
+    """Yield lists of (a, b) pairs from a .csv, .jsonl/.ndjson or .parquet file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=[col1, col2]):
+            cols = batch.to_pydict()
+            yield [(a or "", b or "") for a, b in zip(cols[col1], cols[col2])]
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext in (".jsonl", ".ndjson"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        chunk = []
+        for row in rows:
+            chunk.append((row.get(col1) or "", row.get(col2) or ""))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def score_pairs(chunks, scorer="search_match", workers=None, max_in_flight=None, stats=None):
+    """
+    Yield (pairs, scores) per chunk, in input order.
+    stats, if given, is filled with {worker pid: [pairs, busy seconds]}.
+    """
+    if scorer not in SCORERS:
+        raise ValueError(f"unknown scorer {scorer!r}, expected one of {sorted(SCORERS)}")
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * workers
+
+    def collect(pairs, future):
+        pid, elapsed, scores = future.result()
+        if stats is not None:
+            entry = stats.setdefault(pid, [0, 0.0])
+            entry[0] += len(pairs)
+            entry[1] += elapsed
+        return pairs, scores
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scorer,)) as pool:
+        pending = deque()
+        for pairs in chunks:
+            pending.append((pairs, pool.submit(_score_chunk, pairs)))
+            if len(pending) >= max_in_flight:
+                yield collect(*pending.popleft())
+        while pending:
+            yield collect(*pending.popleft())
+
+
+def write_scores(results, out, fmt="csv"):
+    """Stream (pairs, scores) chunks to a CSV or JSONL file object; returns rows written."""
+    n = 0
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer:
+        writer.writerow(["name1", "name2", "score"])
+    for pairs, scores in results:
+        for (a, b), score in zip(pairs, scores):
+            if writer:
+                writer.writerow([a, b, score])
+            else:
+                out.write(json.dumps({"name1": a, "name2": b, "score": score}) + "\n")
+        n += len(pairs)
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score name pairs in parallel.")
+    parser.add_argument("pairs", help="input .csv, .jsonl or .parquet with two name columns")
+    parser.add_argument("-o", "--output", help="output file (.csv or .jsonl); default stdout as CSV")
+    parser.add_argument("--scorer", choices=sorted(SCORERS), default="search_match")
+    parser.add_argument("--col1", default="name1")
+    parser.add_argument("--col2", default="name2")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    fmt = "jsonl" if args.output and args.output.endswith((".jsonl", ".ndjson")) else "csv"
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    stats = {}
+    start = time.perf_counter()
+    try:
+        chunks = read_pairs(args.pairs, args.col1, args.col2, args.chunk_size)
+        results = score_pairs(chunks, args.scorer, args.workers, args.max_in_flight, stats)
+        n = write_scores(results, out, fmt)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    for pid, (pairs, busy) in sorted(stats.items()):
+        print(f"worker {pid}: {pairs} pairs, {pairs / busy if busy else 0:,.0f} pairs/s", file=sys.stderr)
+    print(f"total: {n} pairs in {elapsed:.2f}s, {n / elapsed if elapsed else 0:,.0f} pairs/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ChaptersConfig(AppConfig):
     name = 'chapters'
+
+    def ready(self):
+        # build the topic index once per process, not per request;
+        # settings.CHAPTERS_TOPICS may point at a JSON list of topics
+        from .catalog import TOPICS, TopicCatalog, load_topics
+        path = getattr(settings, 'CHAPTERS_TOPICS', None)
+        self.catalog = TopicCatalog(load_topics(path) if path else TOPICS)
+        # retrieval backends the async search fans out to
+        from .fanout import build_sources
+        self.sources = build_sources(getattr(settings, 'CHAPTERS_SEARCH_SOURCES', [{'kind': 'catalog'}]))
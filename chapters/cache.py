@@ -0,0 +1,98 @@
+"""
+Response cache for the chapter pages.
+
+    @cache_page()
+    def home(request): ...
+
+The first request for a URL renders the view and stores the body together
+with its gzip (and, if the brotli package is installed, brotli) encodings,
+a content ETag and a Last-Modified time; later requests for that URL are
+built from the cache entry with the best encoding the client accepts, so
+neither the template nor the compressor runs again. ETag / If-None-Match
+and Last-Modified / If-Modified-Since are answered with 304 by
+ConditionalGetMiddleware.
+"""
+import gzip
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# only found pages: a 404 echoes the query, so every misspelling would get its own entry
+CACHEABLE_STATUS = {200}
+MIN_COMPRESS = 200                               # bytes; smaller bodies are sent as-is
+
+
+def _encodings(body):
+    encoded = {"identity": body}
+    if len(body) >= MIN_COMPRESS:
+        encoded["gzip"] = gzip.compress(body, 9, mtime=0)
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body)
+    return encoded
+
+
+def _accepts(request, encoding):
+    accept = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    return any(part.split(";")[0].strip() == encoding and not part.replace(" ", "").endswith(";q=0")
+               for part in accept.split(","))
+
+
+def _entry(response):
+    body = response.content
+    return {
+        "status": response.status_code,
+        "content_type": response["Content-Type"],
+        "bodies": _encodings(body),
+        "etag": hashlib.sha1(body).hexdigest()[:16],
+        "last_modified": time.time(),
+    }
+
+
+def _response(request, entry, max_age):
+    encoding = next((e for e in ("br", "gzip") if e in entry["bodies"] and _accepts(request, e)), "identity")
+    response = HttpResponse(entry["bodies"][encoding], content_type=entry["content_type"], status=entry["status"])
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    # one ETag per representation, so a gzip body is never revalidated as brotli
+    response["ETag"] = '"%s%s"' % (entry["etag"], "" if encoding == "identity" else "-" + encoding)
+    response["Last-Modified"] = http_date(entry["last_modified"])
+    patch_vary_headers(response, ("Accept-Encoding",))
+    patch_cache_control(response, max_age=max_age)
+    return response
+
+
+def cache_page(timeout=None):
+    """
+    Cache a GET view's rendered page for timeout seconds (default
+    settings.CHAPTERS_PAGE_CACHE_SECONDS; 0 disables). Pages are keyed by
+    path and query string, so they must not depend on the user or session.
+    Only 200 responses are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            seconds = settings.CHAPTERS_PAGE_CACHE_SECONDS if timeout is None else timeout
+            if not seconds or request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            key = "chapters.page:" + hashlib.sha1(request.get_full_path().encode()).hexdigest()
+            entry = cache.get(key)
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code not in CACHEABLE_STATUS or response.streaming:
+                    return response
+                entry = _entry(response)
+                cache.set(key, entry, seconds)
+            return _response(request, entry, seconds)
+        return wrapper
+    return decorator
@@ -0,0 +1,190 @@
+"""
+Topic catalog for the chapters app, indexed once at startup
+(ChaptersConfig.ready) and shared by the views.
+
+    catalog = TopicCatalog(TOPICS)
+    catalog.lookup("trigonometry")   # -> (topic, [suggestions])
+
+Each topic is a dict with slug, title, template and optional aliases. Their
+names are indexed three ways, so a lookup touches only the names that can
+match instead of walking every topic:
+- exact: normalized name -> topic, one dict lookup
+- typos: a name_index.NameIndex, whose q-gram and length filters only
+  score names that can reach min_score with search_match.name_similarity
+- prefix: a typesense_local.Trie of name tokens, for partial words ("trig")
+
+complete() serves type-ahead from a prefix table computed at build time:
+every prefix (up to prefix_len characters) of every name, and of every
+name suffix starting at a word, maps to its topics in rank order, so a
+keystroke costs one dict lookup.
+"""
+import hashlib
+import json
+
+from name_index import NameIndex
+from search_match import HIGH_SCORE, name_similarity
+from typesense_local import Trie, tokenize
+
+TOPICS = [
+    {"slug": "trignometry", "title": "Trigonometry", "template": "chapters/trigs.html",
+     "aliases": ["trignometry", "trig", "trigs"]},
+    {"slug": "algebra", "title": "Algebra", "template": "chapters/algeb.html",
+     "aliases": ["algeb"]},
+]
+
+
+def load_topics(path):
+    """Topics from a JSON file holding a list of topic dicts."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TopicCatalog:
+    """
+    In-memory topic index. lookup() returns (topic or None, suggestions),
+    where suggestions are {"slug", "title", "name", "score"} dicts, best
+    first, one per topic. min_score is the lowest name_similarity a
+    misspelled name is suggested at; max_prefix caps how many prefix
+    matches are scored for very short queries.
+    """
+
+    def __init__(self, topics=TOPICS, min_score=60, max_prefix=50, prefix_len=6):
+        self.topics = list(topics)
+        self.by_slug = {t["slug"]: t for t in self.topics}
+        self.min_score = min_score
+        self.max_prefix = max_prefix
+        self.prefix_len = prefix_len
+        # changes whenever the topics do; the API uses it in ETags
+        self.version = hashlib.sha1(json.dumps(self.topics, sort_keys=True).encode()).hexdigest()[:12]
+        self.owner = []                          # name id -> topic index
+        self.exact = {}                          # normalized name -> topic index
+        self.index = NameIndex(min_score=min_score)
+        self.trie = Trie()
+        for i, topic in enumerate(self.topics):
+            for name in [topic["title"], topic["slug"], *topic.get("aliases", ())]:
+                key = " ".join(tokenize(name))
+                if not key or key in self.exact:
+                    continue
+                self.exact[key] = i
+                j = self.index.add(name)
+                self.owner.append(i)
+                for token in key.split():
+                    self.trie.insert(token, "name", j)
+        self._build_prefixes()
+
+    def _build_prefixes(self):
+        """
+        prefix -> topic indexes, whole-name matches before word matches,
+        shorter names first; keys[i] holds topic i's completable strings.
+        """
+        self.keys = [[] for _ in self.topics]
+        starts = []                              # (word-start rank, length, key, topic)
+        for key, i in self.exact.items():
+            words = key.split()
+            for w in range(len(words)):
+                tail = " ".join(words[w:])
+                self.keys[i].append(tail)
+                starts.append((w > 0, len(key), tail, i))
+        starts.sort()
+        self.prefixes = {}
+        seen = set()
+        for _, _, tail, i in starts:
+            for n in range(1, min(len(tail), self.prefix_len) + 1):
+                p = tail[:n]
+                if (p, i) not in seen:
+                    seen.add((p, i))
+                    self.prefixes.setdefault(p, []).append(i)
+
+    def complete(self, query, limit=8):
+        """Topics with a name (or a word in one) starting with query, best first."""
+        key = " ".join(tokenize(query))
+        if not key:
+            return []
+        ranked = self.prefixes.get(key[:self.prefix_len], ())
+        if len(key) > self.prefix_len:
+            # the table stops at prefix_len: verify the rest of the prefix
+            ranked = (i for i in ranked if any(k.startswith(key) for k in self.keys[i]))
+        out = []
+        for i in ranked:
+            out.append(self.topics[i])
+            if len(out) == limit:
+                break
+        return out
+
+    def __len__(self):
+        return len(self.topics)
+
+    def _prefixed(self, tokens):
+        """Name ids with a token starting with the query's last token (the one still being typed)."""
+        ids = set()
+        for _, _, docs in self.trie.search(tokens[-1], prefix=True):
+            ids.update(docs["name"])
+            if len(ids) >= self.max_prefix:
+                break
+        return ids
+
+    def suggest(self, query, limit=5):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        hits = dict(self.index.search(query, self.min_score))
+        for j in self._prefixed(tokens) - hits.keys():
+            hits[j] = name_similarity(query, self.index.name(j))
+        best = {}
+        for j, score in hits.items():
+            i = self.owner[j]
+            if i not in best or score > best[i]["score"]:
+                best[i] = {"slug": self.topics[i]["slug"], "title": self.topics[i]["title"],
+                           "name": self.index.name(j), "score": score}
+        return sorted(best.values(), key=lambda s: (-s["score"], s["title"]))[:limit]
+
+    def lookup(self, query, limit=5):
+        """
+        The topic query names (an exact title/slug/alias, or a single close
+        match scoring >= HIGH_SCORE), plus ranked suggestions.
+        """
+        key = " ".join(tokenize(query))
+        if key in self.exact:
+            topic = self.topics[self.exact[key]]
+            return topic, [s for s in self.suggest(query, limit + 1) if s["slug"] != topic["slug"]][:limit]
+        suggestions = self.suggest(query, limit)
+        if suggestions and suggestions[0]["score"] >= HIGH_SCORE and (
+                len(suggestions) == 1 or suggestions[1]["score"] < suggestions[0]["score"]):
+            return self.by_slug[suggestions[0]["slug"]], suggestions[1:]
+        return None, suggestions
+
+
+if __name__ == "__main__":
+    # lookup / complete time as the catalog grows, vs. scoring every title
+    #   python -m chapters.catalog
+    import random
+    import string
+    import time
+
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+    for n in (100, 1_000, 10_000):
+        topics = TOPICS + [{"slug": f"t{i}", "title": f"{word()} {word()}", "template": ""} for i in range(n)]
+        catalog = TopicCatalog(topics)
+        queries = []
+        for t in rng.sample(topics, min(200, len(topics))):
+            w = t["title"].lower()
+            j = rng.randrange(len(w))
+            queries.append(w[:j] + rng.choice(string.ascii_lowercase) + w[j + 1:])
+        t0 = time.perf_counter()
+        found = sum(catalog.lookup(q)[0] is not None for q in queries)
+        indexed = (time.perf_counter() - t0) / len(queries)
+        t0 = time.perf_counter()
+        for q in queries:
+            for n in range(1, len(q) + 1):
+                catalog.complete(q[:n])
+        keystroke = (time.perf_counter() - t0) / sum(len(q) for q in queries)
+        t0 = time.perf_counter()
+        for q in queries[:20]:
+            max(topics, key=lambda t: name_similarity(q, t["title"]))
+        scan = (time.perf_counter() - t0) / 20
+        print(f"{len(topics):6d} topics: lookup {indexed * 1e3:.2f} ms/query ({found}/{len(queries)} resolved), "
+              f"complete {keystroke * 1e6:.1f} us/keystroke, scan {scan * 1e3:.2f} ms/query")
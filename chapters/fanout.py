@@ -0,0 +1,359 @@
+"""
+Concurrent multi-backend search behind the async api/search/all/ view.
+
+    result = await search("17FU4 sensor", sources, limit=10)
+
+A source wraps one retrieval backend (the topic catalog, a Typesense
+collection, a Milvus collection) with a sync search() and an async
+asearch(). search() queries every source at once, each under its own
+timeout: a source that is slow or failing is reported in "backends" and
+left out of that response instead of holding it up, so a request costs
+its slowest *healthy* source, not the sum of all of them. The merged
+candidates are then rescored with the hybrid_search rerank stages
+(search_match.name_similarity, plus ptic.compute_name_similarity when
+abydos is installed) on a bounded thread pool, so CPU-bound scoring never
+runs on the event loop.
+
+search_serial() is the same search done one source after another, the
+way a synchronous view would.
+
+Connection reuse across requests needs ASGI: under WSGI, Django runs the
+async view on a new event loop per request, and the view closes that
+loop's backend connections (backends.aclose_pools) before returning.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+
+import backends
+
+_pool = None
+
+
+def scoring_pool():
+    """Bounded executor for CPU-bound scoring (settings.CHAPTERS_SCORING_WORKERS threads)."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(getattr(settings, "CHAPTERS_SCORING_WORKERS", 4),
+                                   thread_name_prefix="chapters-scoring")
+    return _pool
+
+
+async def run_scoring(fn, *args):
+    # cancelling the await (a timeout) also drops the job if it has not started
+    return await asyncio.get_running_loop().run_in_executor(scoring_pool(), fn, *args)
+
+
+# ---------------------------------------------------------------------------
+# Sources: search(query, limit) / asearch(query, limit) -> [{"id", "text", "score"}]
+
+class CatalogSource:
+    """Topics from the app's TopicCatalog (in process, scored on the scoring pool)."""
+
+    def __init__(self, name="catalog", timeout=0.1):
+        self.name = name
+        self.timeout = timeout
+
+    def search(self, query, limit):
+        catalog = apps.get_app_config("chapters").catalog
+        return [{"id": s["slug"], "text": s["title"], "score": s["score"]} for s in catalog.suggest(query, limit)]
+
+    async def asearch(self, query, limit):
+        return await run_scoring(self.search, query, limit)
+
+
+class TypesenseSource:
+    """A collection on a registered backends.TypesenseBackend; params are extra search parameters."""
+
+    def __init__(self, name="typesense", collection="machinedata", query_by="ProductName,Brand,MPN",
+                 text_fields=None, timeout=0.3, backend=None, params=None):
+        self.name = name
+        self.collection = collection
+        self.query_by = query_by
+        self.text_fields = text_fields or query_by.split(",")
+        self.timeout = timeout
+        self.backend = backend or name
+        self.params = dict(params or {})
+
+    def _params(self, query, limit):
+        return dict(self.params, q=query, query_by=self.query_by, per_page=limit)
+
+    def _hits(self, result):
+        return [{"id": hit["document"].get("id"),
+                 "text": " ".join(str(hit["document"].get(f) or "") for f in self.text_fields),
+                 "score": hit["text_match"]} for hit in result["hits"]]
+
+    def search(self, query, limit):
+        documents = backends.get(self.backend).collections[self.collection].documents
+        return self._hits(documents.search(self._params(query, limit), timeout=self.timeout))
+
+    async def asearch(self, query, limit):
+        documents = backends.get(self.backend).collections[self.collection].documents
+        return self._hits(await documents.asearch(self._params(query, limit), timeout=self.timeout))
+
+
+class MilvusSource:
+    """A registered backends.MilvusBackend; score is 1 / (1 + L2 distance)."""
+
+    def __init__(self, name="milvus", timeout=0.3, backend=None):
+        self.name = name
+        self.timeout = timeout
+        self.backend = backend or name
+
+    @staticmethod
+    def _hits(result):
+        return [{"id": text, "text": text, "score": 1 / (1 + distance)} for text, distance in result]
+
+    def search(self, query, limit):
+        return self._hits(backends.get(self.backend).search(query, limit, timeout=self.timeout))
+
+    async def asearch(self, query, limit):
+        return self._hits(await backends.get(self.backend).asearch(query, limit, timeout=self.timeout))
+
+
+SOURCE_KINDS = {"catalog": CatalogSource, "typesense": TypesenseSource, "milvus": MilvusSource}
+
+
+def build_sources(config):
+    """
+    Sources from settings.CHAPTERS_SEARCH_SOURCES entries ({"kind": ...,
+    plus the source's arguments}). A typesense entry with a url registers
+    its TypesenseBackend if no backend of that name exists yet.
+    """
+    sources = []
+    for entry in config:
+        entry = dict(entry)
+        kind = entry.pop("kind")
+        url, api_key = entry.pop("url", None), entry.pop("api_key", "xyz")
+        source = SOURCE_KINDS[kind](**entry)
+        if url is not None:
+            try:
+                backends.get(source.backend)
+            except KeyError:
+                backends.register(backends.TypesenseBackend(source.backend, url, api_key=api_key,
+                                                             timeout=source.timeout))
+        sources.append(source)
+    return sources
+
+
+# ---------------------------------------------------------------------------
+
+_stages = None
+
+
+def _rerank_stages():
+    global _stages
+    if _stages is None:
+        from hybrid_search import FuzzyStage, PhoneticStage
+        _stages = [FuzzyStage()]
+        try:
+            _stages.append(PhoneticStage())
+        except ImportError:                      # abydos not installed: fuzzy only
+            pass
+    return _stages
+
+
+def rescore(query, texts):
+    """Mean of the rerank stages' 0-1 scores for each text."""
+    if not texts:
+        return []
+    stages = _rerank_stages()
+    return (sum(stage.normalize(stage.score(query, texts)) for stage in stages) / len(stages)).tolist()
+
+
+def _status(started, hits=None, exc=None):
+    entry = {"ms": round((time.perf_counter() - started) * 1000, 2)}
+    if exc is None:
+        entry.update(status="ok", count=len(hits))
+    elif isinstance(exc, (asyncio.TimeoutError, TimeoutError)):   # unrelated before 3.11; DeadlineExceeded
+        entry.update(status="timeout")
+    else:
+        entry.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    return entry
+
+
+def _merge(results):
+    """One candidate per distinct text, in source order; remembers which sources found it."""
+    merged = {}
+    for name, hits in results:
+        for hit in hits:
+            key = hit["text"].strip().lower()
+            if key not in merged:
+                merged[key] = {"text": hit["text"], "sources": {}}
+            merged[key]["sources"][name] = hit["id"]
+    return list(merged.values())
+
+
+def _result(query, candidates, scores, status, started, limit):
+    if scores is not None:
+        order = np.argsort(-np.asarray(scores), kind="stable")[:limit]
+        hits = [dict(candidates[i], score=round(scores[i], 4)) for i in order]
+    else:                                        # scoring ran out of time: source order, unscored
+        hits = [dict(c, score=None) for c in candidates[:limit]]
+    return {
+        "q": query,
+        "hits": hits,
+        "backends": status,
+        "partial": scores is None or any(s["status"] != "ok" for s in status.values()),
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+async def search(query, sources, limit=10, timeout=None):
+    """
+    Fan query out to every source concurrently; rescore the merged hits
+    within what is left of timeout (default settings.CHAPTERS_SEARCH_TIMEOUT).
+    Returns {"q", "hits": [{"text", "sources", "score"}], "backends":
+    {name: {"status", "ms", "count"}}, "partial", "ms"}.
+    """
+    timeout = getattr(settings, "CHAPTERS_SEARCH_TIMEOUT", 0.5) if timeout is None else timeout
+    started = time.perf_counter()
+    status = {}
+
+    async def one(source):
+        t0 = time.perf_counter()
+        try:
+            hits = await asyncio.wait_for(source.asearch(query, limit), min(source.timeout, timeout))
+        except Exception as exc:
+            status[source.name] = _status(t0, exc=exc)
+            return source.name, []
+        status[source.name] = _status(t0, hits)
+        return source.name, hits
+
+    candidates = _merge(await asyncio.gather(*(one(s) for s in sources)))
+    remaining = timeout - (time.perf_counter() - started)
+    try:
+        scores = await asyncio.wait_for(run_scoring(rescore, query, [c["text"] for c in candidates]),
+                                        max(remaining, 0.001))
+    except asyncio.TimeoutError:
+        scores = None
+    return _result(query, candidates, scores, {s.name: status[s.name] for s in sources}, started, limit)
+
+
+def search_serial(query, sources, limit=10):
+    """search() without concurrency: each source in turn, then scoring inline."""
+    started = time.perf_counter()
+    status, results = {}, []
+    for source in sources:
+        t0 = time.perf_counter()
+        try:
+            hits = source.search(query, limit)
+        except Exception as exc:
+            status[source.name] = _status(t0, exc=exc)
+            continue
+        status[source.name] = _status(t0, hits)
+        results.append((source.name, hits))
+    candidates = _merge(results)
+    return _result(query, candidates, rescore(query, [c["text"] for c in candidates]), status, started, limit)
+
+
+if __name__ == "__main__":
+    # Tail latency of a four-backend search, served three ways, against stubbed
+    # backends (two Typesense stubs at 50 ms, one with a 5% 400 ms tail, a local
+    # Milvus collection and the topic catalog; 150 ms per-backend timeouts):
+    #   serial  - the sync path: backends one after another, N worker threads (WSGI)
+    #   wsgi    - the async view through the WSGI handler, N worker threads
+    #   asgi    - the async view through the ASGI handler, N concurrent requests, one event loop
+    #   python -m chapters.fanout [requests] [concurrency]
+    import os
+    import sys
+    import threading
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "math_project.settings")
+    django.setup()
+    from django.test import AsyncClient, Client
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from milvus_bm25 import LocalCollection
+    from stub_servers import TypesenseStub
+    from typesense_loader import load
+
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    import pandas as pd
+    df = pd.read_csv("sample.csv")
+    df.insert(0, "id", df.index.astype(str))
+    texts = (df["ProductName"] + " " + df["Brand"] + " " + df["MPN"]).tolist()
+    queries = [t.split()[i % 3] for i, t in enumerate(texts)]
+
+    fast = TypesenseStub(latency=0.05).start()
+    tail = TypesenseStub(latency=0.05, slow_rate=0.05, slow_latency=0.4, seed=1).start()
+    for stub, name in ((fast, "ts-primary"), (tail, "ts-replica")):
+        load(backends.register(backends.TypesenseBackend(name, stub.url, pool_size=32)), df, "machinedata")
+    collection = LocalCollection()
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3)).fit(texts)
+    collection.insert([list(range(len(texts))), texts, vectorizer.transform(texts).toarray()])
+    collection.flush()
+    backends.register(backends.MilvusBackend("milvus", collection, vectorizer))
+
+    # exact-token search: the stubs share this process (and CPU) with the app,
+    # and their typo search would otherwise dominate the measurement
+    exact = {"num_typos": 0}
+    sources = [CatalogSource(), TypesenseSource("ts-primary", timeout=0.15, params=exact),
+               TypesenseSource("ts-replica", timeout=0.15, params=exact), MilvusSource(timeout=0.15)]
+    apps.get_app_config("chapters").sources = sources
+
+    def report(label, latencies, partial, elapsed):
+        ms = np.array(latencies) * 1000
+        print(f"{label:7s} {len(ms)} requests, {len(ms) / elapsed:6.1f} req/s, p50 {np.percentile(ms, 50):6.1f} ms, "
+              f"p99 {np.percentile(ms, 99):6.1f} ms, max {ms.max():6.1f} ms, {partial} partial")
+
+    def threaded(call):
+        latencies, partial, lock = [], [0], threading.Lock()
+        todo = iter(range(n_requests))
+
+        def worker():
+            for i in todo:
+                t0 = time.perf_counter()
+                result = call(queries[i % len(queries)])
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+                    partial[0] += result["partial"]
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return latencies, partial[0], time.perf_counter() - t0
+
+    settings.ALLOWED_HOSTS.append("testserver")              # the test clients' Host
+    client = Client()
+    client.get("/api/search/all/", {"q": queries[0]})        # warm up pools
+    for q in queries:                                        # and the phonetic encoder cache
+        search_serial(q, sources)
+    backends.histogram("ts-replica").reset()
+
+    report("serial", *threaded(lambda q: search_serial(q, sources)))
+    report("wsgi", *threaded(lambda q: client.get("/api/search/all/", {"q": q}).json()))
+
+    async def asgi():
+        aclient = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+        latencies, partial = [], 0
+
+        async def one(i):
+            nonlocal partial
+            async with gate:
+                t0 = time.perf_counter()
+                response = await aclient.get("/api/search/all/", {"q": queries[i % len(queries)]})
+                latencies.append(time.perf_counter() - t0)
+                partial += response.json()["partial"]
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        return latencies, partial, time.perf_counter() - t0
+
+    report("asgi", *asyncio.run(asgi()))
+    for name, snap in backends.latency_stats().items():
+        print(f"  {name}: {snap['count']} calls, {snap['errors']} errors, p99 <= {snap['p99_ms']} ms")
+    fast.stop()
+    tail.stop()
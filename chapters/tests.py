@@ -1,3 +1,368 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import time
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.apps import apps
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import backends
+from search_match import name_similarity
+
+from . import cache as page_cache
+from . import fanout
+from .catalog import TOPICS, TopicCatalog
+
+
+class TopicCatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = TopicCatalog(TOPICS)
+
+    def test_exact_names_resolve(self):
+        for query in ["Trigonometry", "trignometry", "TRIG", " trigs ", "algebra", "algeb"]:
+            topic, _ = self.catalog.lookup(query)
+            self.assertIsNotNone(topic, query)
+        self.assertEqual(self.catalog.lookup("trig")[0]["slug"], "trignometry")
+        self.assertEqual(self.catalog.lookup("Algebra")[0]["slug"], "algebra")
+
+    def test_close_misspelling_resolves(self):
+        topic, _ = self.catalog.lookup("algbra")
+        self.assertEqual(topic["slug"], "algebra")
+
+    def test_transposed_short_name_is_suggested(self):
+        # "tirg" shares no 3-gram with "trig"; the index must not drop it
+        self.assertEqual(name_similarity("tirg", "trig"), 75)
+        topic, suggestions = self.catalog.lookup("tirg")
+        self.assertIsNone(topic)
+        self.assertEqual([s["slug"] for s in suggestions], ["trignometry"])
+        self.assertEqual(suggestions[0]["score"], 75)
+
+    def test_unrelated_query_has_no_suggestions(self):
+        self.assertEqual(self.catalog.lookup("zzzz"), (None, []))
+        self.assertEqual(self.catalog.lookup(""), (None, []))
+
+    def test_suggest_matches_brute_force(self):
+        topics = TOPICS + [{"slug": f"t{i}", "title": title, "template": ""}
+                           for i, title in enumerate(["Geometry", "Geometric series", "Statistics",
+                                                      "Probability", "Calculus", "Linear algebra"])]
+        catalog = TopicCatalog(topics)
+        for query in ["geometri", "statstics", "probabilty", "calculas", "linear algbra", "tirg"]:
+            best = {}
+            for topic in topics:
+                for name in [topic["title"], topic["slug"], *topic.get("aliases", ())]:
+                    score = name_similarity(query, name)
+                    if score >= catalog.min_score:
+                        best[topic["slug"]] = max(best.get(topic["slug"], 0), score)
+            got = {s["slug"]: s["score"] for s in catalog.suggest(query, limit=len(topics))}
+            for slug, score in best.items():
+                self.assertEqual(got.get(slug), score, (query, slug))
+
+    def test_suggestions_are_ranked_and_limited(self):
+        topics = TOPICS + [{"slug": f"t{i}", "title": f"Topic {i}", "template": ""} for i in range(20)]
+        suggestions = TopicCatalog(topics).suggest("topic", limit=5)
+        self.assertEqual(len(suggestions), 5)
+        scores = [s["score"] for s in suggestions]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_complete(self):
+        self.assertEqual([t["slug"] for t in self.catalog.complete("tr")], ["trignometry"])
+        self.assertEqual([t["slug"] for t in self.catalog.complete("AL")], ["algebra"])
+        self.assertEqual(self.catalog.complete("x"), [])
+        self.assertEqual(self.catalog.complete(""), [])
+
+    def test_complete_past_prefix_table(self):
+        catalog = TopicCatalog(TOPICS, prefix_len=3)
+        self.assertEqual([t["slug"] for t in catalog.complete("trigono")], ["trignometry"])
+        self.assertEqual(catalog.complete("trigx"), [])
+
+    def test_complete_matches_later_words_after_whole_names(self):
+        topics = [{"slug": "linear", "title": "Linear algebra", "template": ""},
+                  {"slug": "algebra", "title": "Algebra", "template": ""}]
+        self.assertEqual([t["slug"] for t in TopicCatalog(topics).complete("alg")], ["algebra", "linear"])
+
+    def test_version_follows_topics(self):
+        other = TopicCatalog(TOPICS + [{"slug": "calculus", "title": "Calculus", "template": ""}])
+        self.assertEqual(self.catalog.version, TopicCatalog(TOPICS).version)
+        self.assertNotEqual(self.catalog.version, other.version)
+
+
+class ChapterViewTests(TestCase):
+    def test_home(self):
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "chapters/home.html")
+
+    def test_exact_topic(self):
+        response = self.client.get("/trignometry/", {"chapter": "trignometry"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "chapters/trigs.html")
+
+        response = self.client.get("/trignometry/", {"chapter": "Algebra"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "chapters/algeb.html")
+
+    def test_misspelled_topic(self):
+        response = self.client.get("/trignometry/", {"chapter": "algbra"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "chapters/algeb.html")
+
+    def test_missing_chapter(self):
+        for params in ({}, {"chapter": "  "}):
+            response = self.client.get("/trignometry/", params)
+            self.assertEqual(response.status_code, 400)
+            self.assertTemplateUsed(response, "chapters/home.html")
+            self.assertContains(response, "Enter a topic name", status_code=400)
+
+    def test_unknown_topic_suggests(self):
+        response = self.client.get("/trignometry/", {"chapter": "tirg"})
+        self.assertEqual(response.status_code, 404)
+        self.assertTemplateUsed(response, "chapters/suggestions.html")
+        self.assertContains(response, "Did you mean", status_code=404)
+        self.assertContains(response, "?chapter=trignometry", status_code=404)
+
+    def test_unknown_topic_without_suggestions(self):
+        response = self.client.get("/trignometry/", {"chapter": "zzzz"})
+        self.assertContains(response, 'No topic matches "zzzz"', status_code=404)
+
+
+@override_settings(CHAPTERS_PAGE_CACHE_SECONDS=60)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_found_page_is_served_from_cache(self):
+        first = self.client.get("/trignometry/", {"chapter": "algebra"})
+        self.assertTemplateUsed(first, "chapters/algeb.html")
+        with self.assertTemplateNotUsed("chapters/algeb.html"):
+            second = self.client.get("/trignometry/", {"chapter": "algebra"})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_not_found_pages_are_not_cached(self):
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            for q in ("zzzz", "zzzy", "zzzz"):
+                response = self.client.get("/trignometry/", {"chapter": q})
+                self.assertContains(response, f'No topic matches "{q}"', status_code=404)
+        cache_set.assert_not_called()
+
+    def _page(self, accept=None, **headers):
+        if accept is not None:
+            headers["HTTP_ACCEPT_ENCODING"] = accept
+        return self.client.get("/trignometry/", {"chapter": "algebra"}, **headers)
+
+    def test_encodings_follow_accept_encoding(self):
+        plain = self._page()
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        zipped = self._page("gzip, deflate")
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(zipped.content), plain.content)
+        self.assertNotIn("Content-Encoding", self._page("gzip;q=0"))
+        self.assertNotIn("Content-Encoding", self._page("deflate"))
+        if page_cache.brotli is not None:
+            compressed = self._page("gzip, br")
+            self.assertEqual(compressed["Content-Encoding"], "br")
+            self.assertEqual(page_cache.brotli.decompress(compressed.content), plain.content)
+
+    def test_each_encoding_has_its_own_etag(self):
+        etags = {self._page(accept)["ETag"] for accept in ("", "gzip", "br")}
+        self.assertEqual(len(etags), 3 if page_cache.brotli is not None else 2)
+        for accept in ("", "gzip"):
+            response = self._page(accept)
+            revalidated = self._page(accept, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(self._page(accept, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        gzip_etag = self._page("gzip")["ETag"]
+        self.assertEqual(self._page("", HTTP_IF_NONE_MATCH=gzip_etag).status_code, 200)
+
+    def test_small_bodies_are_not_compressed(self):
+        entry = page_cache._entry(HttpResponse(b"x" * (page_cache.MIN_COMPRESS - 1)))
+        self.assertEqual(list(entry["bodies"]), ["identity"])
+
+    @override_settings(CHAPTERS_PAGE_CACHE_SECONDS=0)
+    def test_zero_seconds_disables_the_cache(self):
+        with mock.patch.object(cache, "set") as cache_set:
+            response = self._page("gzip")
+        cache_set.assert_not_called()
+        self.assertNotIn("Content-Encoding", response)
+
+
+class SearchApiTests(TestCase):
+    def test_search_exact(self):
+        response = self.client.get("/api/search/", {"q": "trig"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertTrue(response.has_header("ETag"))
+        self.assertEqual(response.json(), {
+            "q": "trig",
+            "topic": {"slug": "trignometry", "title": "Trigonometry", "url": "/trignometry/?chapter=trignometry"},
+            "suggestions": [],
+        })
+
+    def test_search_suggestions(self):
+        payload = self.client.get("/api/search/", {"q": " tirg "}).json()
+        self.assertEqual(payload["q"], "tirg")
+        self.assertIsNone(payload["topic"])
+        self.assertEqual(payload["suggestions"], [{"slug": "trignometry", "title": "Trigonometry", "score": 75}])
+
+    def test_search_missing_q(self):
+        for params in ({}, {"q": "   "}):
+            response = self.client.get("/api/search/", params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "missing q"})
+
+    def test_get_only(self):
+        for url in ("/api/search/", "/api/autocomplete/"):
+            self.assertEqual(self.client.post(url, {"q": "trig"}).status_code, 405)
+
+    def test_autocomplete(self):
+        response = self.client.get("/api/autocomplete/", {"q": "Al"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        self.assertEqual(response.json(), {"q": "Al", "completions": [{"slug": "algebra", "title": "Algebra"}]})
+        self.assertEqual(self.client.get("/api/autocomplete/", {"q": "zz"}).json(), {"q": "zz", "completions": []})
+        self.assertEqual(self.client.get("/api/autocomplete/").json(), {"q": "", "completions": []})
+
+    def test_limit(self):
+        self.assertEqual(len(self.client.get("/api/autocomplete/", {"q": "t", "limit": "0"}).json()["completions"]), 1)
+        self.assertEqual(self.client.get("/api/autocomplete/", {"q": "t", "limit": "x"}).status_code, 200)
+
+    def test_if_none_match_returns_304(self):
+        for url, q in (("/api/search/", "trig"), ("/api/autocomplete/", "tr")):
+            etag = self.client.get(url, {"q": q})["ETag"]
+            response = self.client.get(url, {"q": q}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(self.client.get(url, {"q": q}, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_etag_changes_with_q(self):
+        for url in ("/api/search/", "/api/autocomplete/"):
+            etags = {}
+            for q in ("trig", "Trig", "trig ", "alg"):
+                response = self.client.get(url, {"q": q})
+                etags[q] = response["ETag"]
+            self.assertEqual(len(set(etags.values())), len(etags), url)
+            # an ETag is only ever answered with 304 for the q it was issued for
+            response = self.client.get(url, {"q": "Trig"}, HTTP_IF_NONE_MATCH=etags["trig "])
+            self.assertEqual(response.status_code, 200)
+
+    def test_etag_is_per_endpoint_and_limit(self):
+        a = self.client.get("/api/search/", {"q": "trig"})["ETag"]
+        b = self.client.get("/api/autocomplete/", {"q": "trig"})["ETag"]
+        c = self.client.get("/api/autocomplete/", {"q": "trig", "limit": 3})["ETag"]
+        self.assertEqual(len({a, b, c}), 3)
+
+
+class SearchAllConnectionTests(TestCase):
+    def setUp(self):
+        from stub_servers import TypesenseStub
+        from typesense_loader import load
+
+        from .fanout import TypesenseSource
+
+        self.stub = TypesenseStub().start()
+        self.addCleanup(self.stub.stop)
+        self.backend = backends.register(backends.TypesenseBackend("test-typesense", self.stub.url))
+        self.addCleanup(self.backend.close)
+        rows = pd.DataFrame([{"id": "1", "ProductName": "sensor", "Brand": "acme", "MPN": "17FU4"}])
+        load(self.backend, rows, "machinedata")
+        config = apps.get_app_config("chapters")
+        self.addCleanup(setattr, config, "sources", config.sources)
+        config.sources = [TypesenseSource("test-typesense", params={"num_typos": 0})]
+
+        self.pools = []
+        init = backends._AsyncPool.__init__
+
+        def record(pool, backend):
+            init(pool, backend)
+            self.pools.append(pool)
+
+        patcher = mock.patch.object(backends._AsyncPool, "__init__", record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_wsgi_request_closes_its_connections(self):
+        for _ in range(2):
+            payload = self.client.get("/api/search/all/", {"q": "sensor"}).json()
+            self.assertEqual(payload["backends"]["test-typesense"]["status"], "ok")
+        # a new event loop (and pool) per request, each emptied before the request ended
+        self.assertEqual(len(self.pools), 2)
+        self.assertTrue(all(pool.idle == [] for pool in self.pools))
+
+    async def test_asgi_requests_share_connections(self):
+        for _ in range(2):
+            response = await self.async_client.get("/api/search/all/", {"q": "sensor"})
+            self.assertEqual(response.json()["backends"]["test-typesense"]["status"], "ok")
+        self.assertEqual(len(self.pools), 1)
+        self.assertEqual(len(self.pools[0].idle), 1)
+        await backends.aclose_pools()
+        self.assertEqual(self.pools[0].idle, [])
+
+
+class _Source:
+    """Canned hits after delay seconds, or an exception."""
+
+    def __init__(self, name, texts=(), delay=0.0, exc=None, timeout=0.1):
+        self.name, self.texts, self.delay, self.exc, self.timeout = name, texts, delay, exc, timeout
+
+    def search(self, query, limit):
+        if self.exc is not None:
+            raise self.exc
+        return [{"id": f"{self.name}-{i}", "text": t, "score": 1} for i, t in enumerate(self.texts[:limit])]
+
+    async def asearch(self, query, limit):
+        await asyncio.sleep(self.delay)
+        return self.search(query, limit)
+
+
+class FanoutTests(SimpleTestCase):
+    def test_timeouts_are_reported_as_timeout(self):
+        started = time.perf_counter()
+        for exc in (asyncio.TimeoutError(), TimeoutError(), backends.DeadlineExceeded("late")):
+            self.assertEqual(fanout._status(started, exc=exc)["status"], "timeout")
+        entry = fanout._status(started, exc=backends.BackendError(503, "busy", "ts"))
+        self.assertEqual((entry["status"], entry["error"]), ("error", "BackendError: [503] busy"))
+        self.assertEqual(fanout._status(started, hits=[1, 2])["count"], 2)
+
+    async def test_slow_and_failing_sources_are_left_out(self):
+        sources = [_Source("fast", ["brass valve", "Steel Valve"]),
+                   _Source("slow", ["valve from slow"], delay=2.0, timeout=0.05),
+                   _Source("broken", exc=ConnectionRefusedError("refused")),
+                   _Source("other", ["steel valve ", "valve"])]
+        started = time.perf_counter()
+        result = await fanout.search("steel valve", sources, limit=10, timeout=1.0)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+        statuses = {name: entry["status"] for name, entry in result["backends"].items()}
+        self.assertEqual(statuses, {"fast": "ok", "slow": "timeout", "broken": "error", "other": "ok"})
+        self.assertTrue(result["partial"])
+        # "Steel Valve" and "steel valve " are one candidate found by two sources
+        self.assertEqual(len(result["hits"]), 3)
+        best = result["hits"][0]
+        self.assertEqual(best["text"], "Steel Valve")
+        self.assertEqual(best["sources"], {"fast": "fast-1", "other": "other-0"})
+        scores = [hit["score"] for hit in result["hits"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    async def test_scoring_past_the_deadline_returns_unscored_hits(self):
+        def slow_rescore(query, texts):
+            time.sleep(0.3)
+            return [1.0] * len(texts)
+
+        sources = [_Source("a", ["one", "two", "three"])]
+        with mock.patch.object(fanout, "rescore", slow_rescore):
+            result = await fanout.search("two", sources, limit=2, timeout=0.1)
+        self.assertEqual([(h["text"], h["score"]) for h in result["hits"]], [("one", None), ("two", None)])
+        self.assertTrue(result["partial"])
+        self.assertEqual(result["backends"]["a"]["status"], "ok")
+
+    async def test_serial_search_returns_the_same_hits(self):
+        sources = [_Source("a", ["brass valve", "steel valve"]), _Source("b", ["valve stem"])]
+        concurrent = await fanout.search("steel valve", sources, limit=2, timeout=1.0)
+        serial = fanout.search_serial("steel valve", sources, limit=2)
+        self.assertEqual(concurrent["hits"], serial["hits"])
+        self.assertFalse(concurrent["partial"] or serial["partial"])
@@ -1,16 +1,95 @@
-from django.http import HttpResponse
+import hashlib
+
+from django.apps import apps
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+
+import backends
+
+from . import fanout
+from .cache import cache_page
 # Create your views here.
 
+# topic pages are static: rendered once, then served (precompressed) from the cache
+@cache_page()
 def home(request):
     return render(request,'chapters/home.html')
 
+@cache_page()
 def view_chapter(request):
-    receive_req = request.GET.get("chapter")
-    if receive_req.lower() == "trignometry":
-        return render(request,'chapters/trigs.html')
-    if receive_req.lower() == "algebra":
-        return render(request,'chapters/algeb.html')
-
-    else:
-        return HttpResponse("Topic Not Found")
+    receive_req = request.GET.get("chapter", "").strip()
+    if not receive_req:
+        return render(request,'chapters/home.html',{"message": "Enter a topic name"},status=400)
+    # exact, prefix and misspelled names resolve through the catalog built in ChaptersConfig.ready()
+    topic, suggestions = apps.get_app_config('chapters').catalog.lookup(receive_req)
+    if topic is not None:
+        return render(request,topic["template"],{"topic": topic,"suggestions": suggestions})
+    return render(request,'chapters/suggestions.html',{"query": receive_req,"suggestions": suggestions},status=404)
+
+
+# JSON API for the search box: answers depend only on the catalog and the
+# query string, so the ETag is known before any work is done and repeated
+# keystrokes are answered with 304s.
+
+def _limit(request, default=8, most=20):
+    try:
+        return max(1, min(int(request.GET.get("limit", default)), most))
+    except ValueError:
+        return default
+
+def _api_etag(request):
+    # the raw q: the views echo it back, so "Trig" and "trig " are different bodies
+    catalog = apps.get_app_config('chapters').catalog
+    key = "%s|%s|%s|%s" % (catalog.version, request.path, request.GET.get("q", ""), _limit(request))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def _json(payload, status=200):
+    response = JsonResponse(payload, status=status, json_dumps_params={"separators": (",", ":")})
+    patch_cache_control(response, max_age=60)
+    return response
+
+def _brief(topic):
+    return {"slug": topic["slug"], "title": topic["title"]}
+
+@require_GET
+@condition(etag_func=_api_etag)
+def search_api(request):
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return _json({"error": "missing q"}, status=400)
+    topic, suggestions = apps.get_app_config('chapters').catalog.lookup(query, _limit(request, 5))
+    return _json({
+        "q": query,
+        "topic": dict(_brief(topic), url=reverse("chap") + "?chapter=" + topic["slug"]) if topic else None,
+        "suggestions": [dict(_brief(s), score=s["score"]) for s in suggestions],
+    })
+
+@require_GET
+@condition(etag_func=_api_etag)
+def autocomplete(request):
+    query = request.GET.get("q", "")
+    completions = apps.get_app_config('chapters').catalog.complete(query, _limit(request))
+    return _json({"q": query, "completions": [_brief(t) for t in completions]})
+
+
+# Async: served natively under ASGI (math_project.asgi), where one worker
+# interleaves many requests while they wait on their backends and keeps
+# their connections open between requests. Under WSGI each call runs on a
+# fresh event loop, so its backend connections are closed before it ends.
+
+async def search_all(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "GET only"}, status=405)
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "missing q"}, status=400)
+    try:
+        result = await fanout.search(query, apps.get_app_config('chapters').sources, _limit(request, 10))
+    finally:
+        if not isinstance(request, ASGIRequest):
+            await backends.aclose_pools()
+    return JsonResponse(result, json_dumps_params={"separators": (",", ":")})
@@ -0,0 +1,299 @@
+"""
+Retrieve-then-rerank search over the repo's scorers.
+
+    from hybrid_search import HybridSearch, BM25Stage, FuzzyStage, PhoneticStage
+    pipeline = HybridSearch(BM25Stage(), [FuzzyStage(), PhoneticStage()], fusion="rrf", k=50)
+    pipeline.search("X89 74 UX UIX", top_k=5, budget_ms=20)
+
+A cheap lexical stage (BM25, the embedded/remote Typesense collection or a
+NameIndex) returns the top-k candidates; the expensive scorers
+(search_match.name_similarity, ptic.compute_name_similarity) then score only
+those. After each stage the candidates it scored are re-ranked by the fused
+score of every stage so far:
+
+- weighted: sum of weight * score, with each stage's scores scaled to 0-1
+- rrf: sum of weight / (rrf_k + rank), reciprocal-rank fusion
+
+Rerankers score the current best candidates first, in chunks, and stop when
+the latency budget runs out; candidates they did not reach keep their
+previous order below the re-ranked ones, so a stage under load reranks a
+shorter prefix instead of blowing the budget. Per-stage times are returned
+with every result and recorded in backends.latency_stats().
+"""
+import time
+
+import numpy as np
+
+from backends import histogram
+
+
+def _minmax(scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    lo, hi = scores.min(), scores.max()
+    return np.ones_like(scores) if hi == lo else (scores - lo) / (hi - lo)
+
+
+# ---------------------------------------------------------------------------
+# Retrieval stages: retrieve(query, k) -> [(id, text, score), ...], best first
+
+class BM25Stage:
+    """
+    Candidates from a milvus_bm25.BM25Index (the module's index by default);
+    max_query_terms / min_idf are passed to BM25Index.search.
+    """
+
+    name = "bm25"
+
+    def __init__(self, index=None, max_query_terms=None, min_idf=0.0):
+        if index is None:
+            from milvus_bm25 import index
+        self.index = index
+        self.max_query_terms = max_query_terms
+        self.min_idf = min_idf
+
+    def retrieve(self, query, k):
+        hits = self.index.search(query, k, self.max_query_terms, self.min_idf)
+        return [(doc_id, self.index.documents[doc_id], score) for doc_id, score in hits]
+
+    def normalize(self, scores):
+        return _minmax(scores)
+
+
+class TypesenseStage:
+    """
+    Candidates from a Typesense collection: typesense_local.EmbeddedCollection,
+    backends.TypesenseBackend.collections[name] or typesense.Client's.
+    """
+
+    name = "typesense"
+
+    def __init__(self, collection, query_by, text_fields=None, params=None):
+        self.collection = collection
+        self.query_by = query_by
+        self.text_fields = text_fields or query_by.split(",")
+        self.params = dict(params or {})
+
+    def retrieve(self, query, k):
+        res = self.collection.documents.search(dict(self.params, q=query, query_by=self.query_by, per_page=k))
+        return [(hit["document"]["id"], " ".join(str(hit["document"].get(f) or "") for f in self.text_fields),
+                 hit["text_match"]) for hit in res["hits"]]
+
+    def normalize(self, scores):
+        return _minmax(scores)
+
+
+class NameIndexStage:
+    """Candidates from a name_index.NameIndex (q-gram blocking + name_similarity)."""
+
+    name = "name_index"
+
+    def __init__(self, index, min_score=None):
+        self.index = index
+        self.min_score = min_score
+
+    def retrieve(self, query, k):
+        return [(j, self.index.name(j), score) for j, score in self.index.search(query, self.min_score, k)]
+
+    def normalize(self, scores):
+        return np.asarray(scores, dtype=np.float64) / 100
+
+
+# ---------------------------------------------------------------------------
+# Rerank stages: score(query, texts) -> [score, ...]
+
+class FuzzyStage:
+    """search_match.name_similarity, 0-100."""
+
+    name = "fuzzy"
+
+    def __init__(self):
+        from search_match import name_similarity
+        self._score = name_similarity
+
+    def score(self, query, texts):
+        return [self._score(query, t) for t in texts]
+
+    def normalize(self, scores):
+        return np.asarray(scores, dtype=np.float64) / 100
+
+
+class PhoneticStage:
+    """ptic.compute_name_similarity (Beider-Morse), 0-1; inputs are lowercased and token-sorted."""
+
+    name = "phonetic"
+
+    def __init__(self, match_mode="approx"):
+        from ptic import compute_name_similarity
+        self._score = compute_name_similarity
+        self.match_mode = match_mode
+
+    @staticmethod
+    def _prep(text):
+        return " ".join(sorted(text.lower().split()))
+
+    def score(self, query, texts):
+        q = self._prep(query)
+        return [self._score(q, self._prep(t), self.match_mode) for t in texts]
+
+    def normalize(self, scores):
+        return np.asarray(scores, dtype=np.float64)
+
+
+# ---------------------------------------------------------------------------
+
+class HybridSearch:
+    """
+    retriever + rerankers with weighted or reciprocal-rank fusion.
+
+    weights maps stage name -> weight (default 1.0 each); k is how many
+    candidates the retriever returns; budget_ms (per search, optional) caps
+    the time the rerankers may spend; chunk is how many candidates a
+    reranker scores between budget checks.
+    """
+
+    def __init__(self, retriever, rerankers=(), fusion="weighted", weights=None, k=50,
+                 rrf_k=60, budget_ms=None, chunk=16):
+        if fusion not in ("weighted", "rrf"):
+            raise ValueError(f"fusion must be 'weighted' or 'rrf', not {fusion!r}")
+        self.retriever = retriever
+        self.rerankers = list(rerankers)
+        self.fusion = fusion
+        self.weights = dict(weights or {})
+        self.k = k
+        self.rrf_k = rrf_k
+        self.budget_ms = budget_ms
+        self.chunk = chunk
+
+    def _fuse(self, stages, scores, rows):
+        """Fused score for candidate rows from the stages that scored them."""
+        fused = np.zeros(len(rows))
+        for stage in stages:
+            w = self.weights.get(stage.name, 1.0)
+            values = np.asarray([scores[stage.name][r] for r in rows], dtype=np.float64)
+            if self.fusion == "weighted":
+                fused += w * stage.normalize(values)
+            else:
+                ranks = np.empty(len(rows))
+                ranks[np.argsort(-values, kind="stable")] = np.arange(1, len(rows) + 1)
+                fused += w / (self.rrf_k + ranks)
+        return fused
+
+    def search(self, query, top_k=10, budget_ms=None):
+        """
+        Returns {"hits": [{"id", "text", "score", "scores"}], "timings_ms":
+        {stage: ms}, "depth": {stage: candidates scored}, "truncated": bool}.
+        """
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000 if budget_ms is not None else None
+        timings, depth = {}, {}
+
+        t0 = time.perf_counter()
+        candidates = self.retriever.retrieve(query, self.k)
+        timings[self.retriever.name] = (time.perf_counter() - t0) * 1000
+        histogram(f"hybrid.{self.retriever.name}").observe(time.perf_counter() - t0)
+        depth[self.retriever.name] = len(candidates)
+
+        texts = [c[1] for c in candidates]
+        scores = {self.retriever.name: [c[2] for c in candidates]}
+        order = list(range(len(candidates)))     # current ranking, as rows of candidates
+        done = [self.retriever]
+        reach = len(order)                       # rows scored by every stage so far
+
+        for stage in self.rerankers:
+            t0 = time.perf_counter()
+            values = [None] * len(candidates)
+            scored = 0
+            while scored < reach:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                rows = order[scored:min(scored + self.chunk, reach)]
+                for r, v in zip(rows, stage.score(query, [texts[r] for r in rows])):
+                    values[r] = v
+                scored += len(rows)
+            elapsed = time.perf_counter() - t0
+            timings[stage.name] = elapsed * 1000
+            depth[stage.name] = scored
+            if not scored:
+                continue                         # out of budget: stage skipped
+            histogram(f"hybrid.{stage.name}").observe(elapsed)
+            scores[stage.name] = values
+            done.append(stage)
+            reach = scored
+            head = order[:reach]
+            fused = self._fuse(done, scores, head)
+            order = [head[i] for i in np.argsort(-fused, kind="stable")] + order[reach:]
+
+        fused = self._fuse(done, scores, order[:reach]).tolist() if reach else []
+        hits = []
+        for pos, r in enumerate(order[:top_k]):
+            hits.append({
+                "id": candidates[r][0],
+                "text": texts[r],
+                "score": fused[pos] if pos < reach else None,
+                "scores": {name: vals[r] for name, vals in scores.items() if vals[r] is not None},
+            })
+        timings["total"] = (time.perf_counter() - start) * 1000
+        truncated = any(depth.get(s.name, 0) < len(candidates) for s in self.rerankers)
+        return {"hits": hits, "timings_ms": timings, "depth": depth, "truncated": truncated}
+
+
+if __name__ == "__main__":
+    # BM25 top-k + fuzzy rerank vs. fuzzy-scoring the whole corpus, on
+    # synthetic names with one typo; then the same under a tight budget.
+    #   python hybrid_search.py [n_names] [n_queries]
+    import random
+    import string
+    import sys
+
+    from milvus_bm25 import BM25Index
+    from search_match import name_similarity
+
+    n_names = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+    names = [f"{word()} {word()} {rng.randint(1, 999)} {word()} street" for _ in range(n_names)]
+    queries = []
+    for _ in range(n_queries):
+        tokens = rng.choice(names).split()
+        i = rng.randrange(2)                     # one typo in the first or last name
+        w = tokens[i]
+        j = rng.randrange(len(w))
+        tokens[i] = w[:j] + rng.choice(string.ascii_lowercase) + w[j + 1:]
+        queries.append(" ".join(tokens))
+
+    # "street" is in every name: min_idf drops it instead of scoring 20k postings
+    bm25 = BM25Stage(BM25Index().fit(names), min_idf=1.0)
+    rerankers = [FuzzyStage()]
+    try:
+        rerankers.append(PhoneticStage())
+    except ImportError as exc:
+        print(f"phonetic stage skipped ({exc})")
+
+    t0 = time.perf_counter()
+    truth = []
+    for q in queries[:10]:
+        scores = [name_similarity(q, n) for n in names]
+        truth.append(int(np.argmax(scores)))
+    brute = (time.perf_counter() - t0) / 10
+    print(f"fuzzy over all {n_names} names: {brute * 1e3:.1f} ms/query")
+
+    for q in queries:                            # warm up the phonetic encoder cache
+        HybridSearch(bm25, rerankers, k=50).search(q)
+    for fusion in ("weighted", "rrf"):
+        for budget in (None, 0.8, 0.5):
+            pipeline = HybridSearch(bm25, rerankers, fusion=fusion, k=50, budget_ms=budget,
+                                    weights={"bm25": 0.5})
+            t0 = time.perf_counter()
+            results = [pipeline.search(q, top_k=1) for q in queries]
+            per_query = (time.perf_counter() - t0) / len(queries)
+            agree = np.mean([r["hits"][0]["id"] == t for r, t in zip(results, truth) if r["hits"]])
+            stage_ms = {s: np.mean([r["timings_ms"].get(s, 0) for r in results]) for s in results[0]["timings_ms"]}
+            depth = {s: np.mean([r["depth"].get(s, 0) for r in results]) for s in results[0]["depth"]}
+            print(f"{fusion:8s} budget={budget}: {per_query * 1e3:.2f} ms/query, top-1 = brute force "
+                  f"{agree:.0%}, stage ms {', '.join(f'{s}={v:.2f}' for s, v in stage_ms.items())}, "
+                  f"depth {', '.join(f'{s}={v:.0f}' for s, v in depth.items())}")
@@ -0,0 +1,156 @@
+"""
+Link the records of one CSV against another with search_match.
+
+    python link_records.py left.csv right.csv -o links.csv
+    python link_records.py left.csv right.csv -o links.csv --resume
+
+The right (reference) file is loaded once into a NameIndex; the left file is
+streamed record by record through _norm_tokens -> candidate generation ->
+name_similarity -> classify_match, and links are written as they are found,
+so memory does not grow with the left file. Every --checkpoint-every records
+the output is flushed and the left file's byte offset is saved next to it;
+--resume continues from there after a crash.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from name_index import NameIndex
+from search_match import PARTIAL_SCORE, classify_match
+
+DEFAULT_COLUMNS = ["ProductName", "Brand", "MPN"]
+FIELDS = ["left_row", "right_row", "left_text", "right_text", "score", "bucket"]
+
+
+def iter_csv(path, offset=0):
+    """
+    Yield (row dict, end offset) for each record of a CSV file, starting at
+    byte offset (0 or an offset previously yielded). The header is always
+    read from the top of the file.
+    """
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+        if offset > f.tell():
+            f.seek(offset)
+        pos = f.tell()
+
+        def lines():
+            nonlocal pos
+            for raw in iter(f.readline, b""):
+                pos += len(raw)
+                yield raw.decode("utf-8")
+
+        # csv.reader pulls exactly the lines of one record at a time, so pos
+        # is the end of the record just yielded
+        for row in csv.reader(lines()):
+            if row:
+                yield dict(zip(header, row)), pos
+
+
+def record_text(row, columns):
+    return " ".join(row.get(c) or "" for c in columns).strip()
+
+
+def load_reference(path, columns, **index_kwargs):
+    """Index every record of the reference file; returns the NameIndex."""
+    index = NameIndex(**index_kwargs)
+    for row, _ in iter_csv(path):
+        index.add(record_text(row, columns))
+    return index
+
+
+def link(records, index, columns, top_k=1, min_score=PARTIAL_SCORE, first_row=0):
+    """
+    Yield (link dicts, end offset) per left record; link dicts use FIELDS.
+    records is an iter_csv() generator.
+    """
+    for n, (row, offset) in enumerate(records, start=first_row):
+        text = record_text(row, columns)
+        links = [
+            {"left_row": n, "right_row": j, "left_text": text, "right_text": index.name(j),
+             "score": score, "bucket": classify_match(score)}
+            for j, score in index.search(text, min_score=min_score, top_k=top_k)
+        ]
+        yield links, offset
+
+
+class _Writer:
+    def __init__(self, f, fmt, write_header):
+        self.f = f
+        self.csv = csv.DictWriter(f, FIELDS) if fmt == "csv" else None
+        if self.csv and write_header:
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.f.write(json.dumps(row) + "\n")
+
+
+def _read_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)                  # atomic: never a half-written checkpoint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream-link two CSV files by name similarity.")
+    parser.add_argument("left", help="CSV streamed as queries")
+    parser.add_argument("right", help="reference CSV, indexed in memory")
+    parser.add_argument("-o", "--output", required=True, help="output .csv or .jsonl")
+    parser.add_argument("--columns", default=",".join(DEFAULT_COLUMNS),
+                        help="comma-separated columns joined into the compared text")
+    parser.add_argument("--top-k", type=int, default=1)
+    parser.add_argument("--min-score", type=int, default=PARTIAL_SCORE)
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    args = parser.parse_args(argv)
+
+    columns = args.columns.split(",")
+    fmt = "jsonl" if args.output.endswith((".jsonl", ".ndjson")) else "csv"
+    checkpoint = args.output + ".offset"
+
+    state = _read_checkpoint(checkpoint) if args.resume else None
+    if state:
+        out = open(args.output, "r+", newline="", encoding="utf-8")
+        out.truncate(state["output_bytes"])    # drop links written after the checkpoint
+        out.seek(0, os.SEEK_END)
+    else:
+        state = {"offset": 0, "rows": 0, "output_bytes": 0}
+        out = open(args.output, "w", newline="", encoding="utf-8")
+
+    index = load_reference(args.right, columns, min_score=args.min_score)
+    writer = _Writer(out, fmt, write_header=state["output_bytes"] == 0)
+    rows, offset = state["rows"], state["offset"]
+    try:
+        records = iter_csv(args.left, state["offset"])
+        for links, offset in link(records, index, columns, args.top_k, args.min_score, rows):
+            for row in links:
+                writer.write(row)
+            rows += 1
+            if rows % args.checkpoint_every == 0:
+                out.flush()
+                _write_checkpoint(checkpoint, {"offset": offset, "rows": rows,
+                                               "output_bytes": os.fstat(out.fileno()).st_size})
+        out.flush()
+        _write_checkpoint(checkpoint, {"offset": offset, "rows": rows,
+                                       "output_bytes": os.fstat(out.fileno()).st_size})
+    finally:
+        out.close()
+    print(f"linked {rows} records against {len(index)} reference records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Closed-loop HTTP load generator for the Django app.
+
+    python loadgen.py http://127.0.0.1:8000 / /trignometry/?chapter=algebra -c 8 -d 10
+    python loadgen.py --inprocess / /trignometry/?chapter=trignometry     # no server, WSGI handler only
+
+concurrency workers each send the next path (round-robin over the given
+ones) on a keep-alive connection as soon as the previous response is read,
+for duration seconds. --encoding sets Accept-Encoding, --revalidate
+resends the ETag the first response carried (If-None-Match). Prints
+requests/s, latency percentiles, status counts and mean body size.
+--inprocess calls the WSGI application directly (math_project.settings),
+which measures the view/middleware stack without socket or server
+overhead.
+"""
+import argparse
+import http.client
+import os
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+def _http_worker(base, paths, headers, stop, out, revalidate):
+    url = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=10)
+    etags = {}
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        i += 1
+        h = dict(headers)
+        if revalidate and path in etags:
+            h["If-None-Match"] = etags[path]
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=h)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            out.append((time.perf_counter() - t0, "error", 0))
+            continue
+        out.append((time.perf_counter() - t0, response.status, len(body)))
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    conn.close()
+
+
+def _inprocess_worker(client, paths, headers, stop, out, revalidate):
+    extra = {"HTTP_" + k.upper().replace("-", "_"): v for k, v in headers.items()}
+    etags = {}
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        i += 1
+        h = dict(extra)
+        if revalidate and path in etags:
+            h["HTTP_IF_NONE_MATCH"] = etags[path]
+        t0 = time.perf_counter()
+        response = client.get(path, **h)
+        out.append((time.perf_counter() - t0, response.status_code, len(response.content)))
+        if response.has_header("ETag"):
+            etags[path] = response["ETag"]
+
+
+def run(target, paths, concurrency=4, duration=5.0, headers=None, revalidate=False):
+    """Returns stats: requests, rps, p50_ms, p90_ms, p99_ms, status, mean_bytes."""
+    headers = headers or {}
+    if target is None:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "math_project.settings")
+        import django
+        django.setup()
+        from django.test import Client
+        client = Client(SERVER_NAME="localhost")
+        client.get(paths[0])                     # load urls, apps and templates before timing
+        worker, arg = _inprocess_worker, client
+    else:
+        worker, arg = _http_worker, target
+
+    stop = threading.Event()
+    results = [[] for _ in range(concurrency)]
+    threads = [threading.Thread(target=worker, args=(arg, paths, headers, stop, results[i], revalidate))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    samples = [s for r in results for s in r]
+    latency = np.array([s[0] for s in samples]) * 1000
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / elapsed,
+        "p50_ms": float(np.percentile(latency, 50)) if len(latency) else None,
+        "p90_ms": float(np.percentile(latency, 90)) if len(latency) else None,
+        "p99_ms": float(np.percentile(latency, 99)) if len(latency) else None,
+        "status": dict(Counter(s[1] for s in samples)),
+        "mean_bytes": float(np.mean([s[2] for s in samples])) if samples else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Closed-loop load generator.")
+    parser.add_argument("target", nargs="?", help="base URL, e.g. http://127.0.0.1:8000 (omit with --inprocess)")
+    parser.add_argument("paths", nargs="*", default=["/"])
+    parser.add_argument("--inprocess", action="store_true", help="drive the WSGI app in this process")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("-d", "--duration", type=float, default=5.0)
+    parser.add_argument("--encoding", default="gzip, br", help="Accept-Encoding header ('' for none)")
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match with the last ETag")
+    args = parser.parse_args(argv)
+
+    if args.inprocess and args.target is not None:
+        args.paths.insert(0, args.target)     # argparse took the first path as the target
+        args.target = None
+    if not args.inprocess and args.target is None:
+        parser.error("target URL required unless --inprocess")
+
+    headers = {"Accept-Encoding": args.encoding} if args.encoding else {}
+    stats = run(args.target, args.paths, args.concurrency, args.duration, headers, args.revalidate)
+    print(f"{stats['requests']} requests in {args.duration:.0f}s: {stats['rps']:,.0f} req/s, "
+          f"p50 {stats['p50_ms']:.2f} ms, p90 {stats['p90_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+          f"status {stats['status']}, {stats['mean_bytes']:,.0f} bytes/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,9 +24,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'v*lw!=c1zj(d0eogx@y8ko&6yqpw!$)b*2amfclgg$&g58%!l&'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DJANGO_DEBUG=0 switches to the production serving mode: cached template
+# loaders and cached, precompressed chapter pages.
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') != '0'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [] if DEBUG else os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
 
 # Application definition
@@ -38,10 +40,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'chapters',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # ETag / Last-Modified -> 304 for every page
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,12 +57,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'math_project.urls'
 
+_template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # parse and compile each template once per process
+    _template_loaders = [('django.template.loaders.cached.Loader', _template_loaders)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.getcwd()+"/templates/"],
-        'APP_DIRS': True,
+        'DIRS': [BASE_DIR / 'templates'],
         'OPTIONS': {
+            'loaders': _template_loaders,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -82,6 +95,43 @@ DATABASES = {
 }
 
 
+# Cache
+# local memory per process by default; DJANGO_CACHE_DIR shares the cache
+# between worker processes through files instead
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'chapters',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+if os.environ.get('DJANGO_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+    }
+
+# Seconds a rendered chapter page (with its gzip/brotli bodies) is served
+# from the cache; 0 renders every request.
+CHAPTERS_PAGE_CACHE_SECONDS = int(os.environ.get('CHAPTERS_PAGE_CACHE_SECONDS', 0 if DEBUG else 600))
+
+# Retrieval backends behind the async api/search/all/ view (chapters.fanout).
+# Each is queried concurrently under its own timeout (seconds); one that
+# misses it is dropped from that response (partial results) instead of
+# delaying it. CHAPTERS_SEARCH_TIMEOUT bounds the whole search, scoring
+# included; scoring runs on CHAPTERS_SCORING_WORKERS threads.
+CHAPTERS_SEARCH_SOURCES = [{'kind': 'catalog', 'timeout': 0.1}]
+if os.environ.get('TYPESENSE_URL'):
+    CHAPTERS_SEARCH_SOURCES.append({
+        'kind': 'typesense', 'name': 'typesense', 'url': os.environ['TYPESENSE_URL'],
+        'api_key': os.environ.get('TYPESENSE_API_KEY', 'xyz'), 'collection': 'machinedata',
+        'query_by': 'ProductName,Brand,MPN', 'timeout': float(os.environ.get('TYPESENSE_TIMEOUT', 0.3)),
+    })
+CHAPTERS_SEARCH_TIMEOUT = 0.5
+CHAPTERS_SCORING_WORKERS = 4
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -119,3 +169,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+
+# Optional JSON list of topics ({slug, title, template, aliases}) for the
+# chapters catalog; the built-in chapters.catalog.TOPICS are used otherwise.
+CHAPTERS_TOPICS = os.environ.get('CHAPTERS_TOPICS')
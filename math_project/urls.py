@@ -20,4 +20,7 @@ from chapters import views
 urlpatterns = [
     path('', views.home,name="home"),
     path('trignometry/', views.view_chapter,name="chap"),
+    path('api/search/', views.search_api,name="search_api"),
+    path('api/autocomplete/', views.autocomplete,name="autocomplete"),
+    path('api/search/all/', views.search_all,name="search_all"),
 ]
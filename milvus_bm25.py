@@ -1,19 +1,274 @@
-from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
+import heapq
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 
+from code_index import analyze_identifier
 
-def delete_collection(collection_name):
-    if utility.has_collection(collection_name):
-        utility.drop_collection(collection_name)
-        print(f"Collection '{collection_name}' has been deleted.")
-    else:
-        print(f"Collection '{collection_name}' does not exist.")
 
+# Same tokens as sklearn's TfidfVectorizer default: lowercase, 2+ word chars
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+def analyze(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _Segment:
+    """
+    Immutable block of postings for a batch of documents, CSR-style: for
+    global term id t at local row r = rows[t], doc ids and term frequencies
+    live in indices[indptr[r]:indptr[r + 1]] and tfs[...].
+    """
+
+    def __init__(self, postings):
+        # postings: {term id: ([doc ids], [tfs])}
+        self.rows = {}
+        indptr, indices, tfs = [0], [], []
+        for t, (ids, freqs) in postings.items():
+            self.rows[t] = len(self.rows)
+            indices.extend(ids)
+            tfs.extend(freqs)
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.tfs = np.array(tfs, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def postings(self, t):
+        r = self.rows.get(t)
+        if r is None:
+            return None
+        start, end = self.indptr[r], self.indptr[r + 1]
+        return self.indices[start:end], self.tfs[start:end]
+
+
+class BM25Index:
+    """
+    In-process BM25 ranking over an incrementally updated inverted index.
+
+    - vocabulary is append-only (term -> global term id), so new terms never
+      shift existing ids
+    - document frequencies, live document count and total length are updated
+      in place; idf and length norms are computed at query time
+    - each add_documents() call writes one new immutable segment, so ingesting
+      costs O(delta), not O(corpus)
+    - delete() tombstones documents; merge() (or the background merger)
+      folds segments together and drops tombstoned postings
+    """
+
+    def __init__(self, k1=1.5, b=0.75, analyzer=analyze, max_segments=8):
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer
+        self.max_segments = max_segments
+        self.version = 0                             # bumped whenever results can change
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()          # one merge at a time: each swap assumes its snapshot
+        self._merger = None
+        self._generation = 0                         # bumped by fit(); merges of older data are dropped
+        self._clear()
+
+    def _clear(self):
+        self.documents = []                          # doc id -> text (None once deleted)
+        self.vocabulary = {}                         # term -> term id
+        self._df = np.zeros(0, dtype=np.int64)
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._live = np.zeros(0, dtype=bool)
+        self._n_live = 0
+        self._total_len = 0.0
+        self._segments = []
+
+    def __len__(self):
+        return self._n_live
+
+    def fit(self, documents):
+        """(Re)build the index over documents."""
+        with self._lock:
+            # a background merge still running works on the old segments;
+            # the generation bump makes it discard its result
+            self._generation += 1
+            self._clear()
+            self.version += 1                        # never reuse a version: cached results would match
+            self.add_documents(documents)
+        return self
+
+    @staticmethod
+    def _grow(arr, n):
+        if n <= len(arr):
+            return arr
+        out = np.zeros(max(n, 2 * len(arr)), dtype=arr.dtype)
+        out[:len(arr)] = arr
+        return out
+
+    def add_documents(self, documents):
+        """Index documents as a new segment; returns their doc ids."""
+        with self._lock:
+            first = len(self.documents)
+            postings = {}
+            lengths = []
+            for doc_id, doc in enumerate(documents, start=first):
+                self.documents.append(doc)
+                terms = self.analyzer(doc)
+                lengths.append(len(terms))
+                counts = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, tf in counts.items():
+                    t = self.vocabulary.setdefault(term, len(self.vocabulary))
+                    ids, tfs = postings.setdefault(t, ([], []))
+                    ids.append(doc_id)
+                    tfs.append(tf)
+
+            n = len(self.documents)
+            if n == first:
+                return []
+            self._df = self._grow(self._df, len(self.vocabulary))
+            for t, (ids, _) in postings.items():
+                self._df[t] += len(ids)
+            self._doc_len = self._grow(self._doc_len, n)
+            self._doc_len[first:n] = lengths
+            self._live = self._grow(self._live, n)
+            self._live[first:n] = True
+            self._n_live += n - first
+            self._total_len += sum(lengths)
+            self._segments = self._segments + [_Segment(postings)]
+            self.version += 1
+            if len(self._segments) > self.max_segments:
+                self.merge(background=True)
+            return list(range(first, n))
+
+    def delete(self, doc_ids):
+        """Tombstone documents; their postings are dropped at the next merge."""
+        with self._lock:
+            for doc_id in doc_ids:
+                if not 0 <= doc_id < len(self.documents) or not self._live[doc_id]:
+                    continue
+                for term in set(self.analyzer(self.documents[doc_id])):
+                    self._df[self.vocabulary[term]] -= 1
+                self._live[doc_id] = False
+                self._n_live -= 1
+                self._total_len -= self._doc_len[doc_id]
+                self.documents[doc_id] = None
+            self.version += 1
+
+    def merge(self, background=False):
+        """
+        Fold all current segments into one without tombstoned postings.
+        With background=True this runs on a daemon thread; searches keep
+        using the old segments until the merged one is swapped in.
+        """
+        if background:
+            if self._merger is None or not self._merger.is_alive():
+                self._merger = threading.Thread(target=self.merge, daemon=True)
+                self._merger.start()
+            return
+        with self._merge_lock:
+            with self._lock:
+                segments = self._segments
+                live = self._live.copy()
+                generation = self._generation
+            merged = {}
+            for seg in segments:
+                for t in seg.rows:
+                    ids, tfs = seg.postings(t)
+                    keep = live[ids]
+                    if keep.any():
+                        entry = merged.setdefault(t, ([], []))
+                        entry[0].extend(ids[keep].tolist())
+                        entry[1].extend(tfs[keep].tolist())
+            new = _Segment(merged)
+            with self._lock:
+                if generation != self._generation:
+                    return                           # fit() replaced the index meanwhile
+                # segments added while merging stay as they are; docs deleted
+                # meanwhile are still filtered out by the live mask at search time
+                self._segments = [new] + self._segments[len(segments):]
 
-connections.connect("default", host="localhost", port="19530")
+    @property
+    def segments(self):
+        return len(self._segments)
+
+    def _idf(self, t):
+        df = self._df[t]
+        return np.log(1 + (self._n_live - df + 0.5) / (df + 0.5))
+
+    def _query_terms(self, query, max_query_terms=None, min_idf=0.0):
+        """
+        Query term ids with their query frequency and idf; drops unknown
+        terms and terms below min_idf, and keeps the max_query_terms rarest.
+        """
+        counts = {}
+        for term in self.analyzer(query):
+            t = self.vocabulary.get(term)
+            if t is not None and self._df[t] > 0:
+                counts[t] = counts.get(t, 0) + 1
+        terms = [(t, qtf, self._idf(t)) for t, qtf in counts.items()]
+        terms = sorted((x for x in terms if x[2] >= min_idf), key=lambda x: -x[2])
+        return terms[:max_query_terms] if max_query_terms else terms
+
+    def _term_contributions(self, t, segments, live, avgdl):
+        """Live doc ids containing term t and their tf part of the BM25 weight."""
+        ids, parts = [], []
+        for seg in segments:
+            hit = seg.postings(t)
+            if hit is None:
+                continue
+            doc_ids, tf = hit
+            keep = live[doc_ids]
+            doc_ids, tf = doc_ids[keep], tf[keep]
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_ids] / avgdl) if avgdl else self.k1
+            ids.append(doc_ids)
+            parts.append(tf * (self.k1 + 1) / (tf + norm))
+        if not ids:
+            return None
+        return np.concatenate(ids), np.concatenate(parts)
+
+    @staticmethod
+    def _top_k(ids, weights, top_k):
+        if not ids:
+            return []
+        doc_ids, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        best = heapq.nlargest(top_k, zip(scores.tolist(), doc_ids.tolist()))
+        return [(doc_id, score) for score, doc_id in best]
+
+    def search(self, query, top_k=1, max_query_terms=None, min_idf=0.0):
+        """Return [(doc id, score), ...], best first."""
+        return self.search_many([query], top_k, max_query_terms, min_idf)[0]
+
+    def search_many(self, queries, top_k=1, max_query_terms=None, min_idf=0.0):
+        """
+        search() for a batch of queries; each distinct term's postings are
+        read and weighted once for the whole batch.
+        """
+        segments, live = self._segments, self._live
+        avgdl = self._total_len / self._n_live if self._n_live else 0.0
+        parsed = [self._query_terms(q, max_query_terms, min_idf) for q in queries]
+        contributions = {}
+        for terms in parsed:
+            for t, _, _ in terms:
+                if t not in contributions:
+                    contributions[t] = self._term_contributions(t, segments, live, avgdl)
+
+        results = []
+        for terms in parsed:
+            ids, weights = [], []
+            for t, qtf, idf in terms:
+                hit = contributions[t]
+                if hit is not None:
+                    ids.append(hit[0])
+                    weights.append(qtf * idf * hit[1])
+            results.append(self._top_k(ids, weights, top_k))
+        return results
 
-delete_collection("text_documents")
 
 documents = [
     "The quick brown fox jumps over the lazy dog",
@@ -25,51 +280,328 @@ documents = [
     "x89_74_ux_uix code: signa converter are passed at operation parameters"
 ]
 
-# Create TF-IDF vectorizer
-vectorizer = TfidfVectorizer()
-tfidf_matrix = vectorizer.fit_transform(documents)
+# part codes like "x89_74_ux_uix" are split into their pieces plus one compact token
+index = BM25Index(analyzer=analyze_identifier).fit(documents)
 
 
-# Create a collection for our documents
-fields = [
-    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
-    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
-    FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR,dim=tfidf_matrix.toarray().shape[-1])
-]
-schema = CollectionSchema(fields, "A collection for text documents")
-collection = Collection("text_documents", schema)
+class QueryCache:
+    """
+    LRU of search results keyed by (normalized query, top_k). Entries carry
+    the index version they were computed at and count as misses once the
+    index has changed.
+    """
+
+    def __init__(self, maxsize=10_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, results):
+        with self._lock:
+            self._data[key] = (version, results)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                "maxsize": self.maxsize, "hit_rate": self.hits / total if total else 0.0}
 
-# Create an IVF_FLAT index on the embedding field
-index_params = {
-    "metric_type": "L2",
-    "index_type": "IVF_FLAT",
-    "params": {"nlist": 128}
-}
-collection.create_index("embedding", index_params)
+
+_cache = QueryCache()
+
+
+def _cache_key(query, top_k):
+    # BM25 ignores term order and case, so reordered / recased queries share an entry
+    return tuple(sorted(index.analyzer(query))), top_k
+
+
+# BM25 search function
+def bm25_search(query, top_k=1):
+    return bm25_search_many([query], top_k)[0]
+
+
+def bm25_search_many(queries, top_k=1):
+    """bm25_search for a batch: cached queries are answered from the LRU, the rest in one pass."""
+    version = index.version
+    keys = [_cache_key(q, top_k) for q in queries]
+    results = [_cache.get(key, version) for key in keys]
+    missing = {}
+    for i, (key, hit) in enumerate(zip(keys, results)):
+        if hit is None:
+            missing.setdefault(key, []).append(i)
+    if missing:
+        found = index.search_many([queries[idx[0]] for idx in missing.values()], top_k)
+        for (key, idx), hits in zip(missing.items(), found):
+            hits = [(index.documents[doc_id], score) for doc_id, score in hits]
+            _cache.put(key, version, hits)
+            for i in idx:
+                results[i] = hits
+    return results
+
+
+def cache_info():
+    return _cache.info()
+
+
+# Milvus store: dense TF-IDF vectors under L2, kept for deployments that
+# already run a Milvus server. Needs pymilvus + scikit-learn.
+def delete_collection(collection_name):
+    from pymilvus import utility
+    if utility.has_collection(collection_name):
+        utility.drop_collection(collection_name)
+        print(f"Collection '{collection_name}' has been deleted.")
+    else:
+        print(f"Collection '{collection_name}' does not exist.")
 
 
 # Function to convert TF-IDF vector to dense numpy array
 def tfidf_to_dense(tfidf_vector):
     return tfidf_vector.toarray().flatten()
 
-# Insert documents into Milvus
-for i, doc in enumerate(documents):
-    embedding = tfidf_to_dense(tfidf_matrix[i])
-    collection.insert([[i], [doc], [embedding]])
 
+class LocalCollection:
+    """
+    In-memory stand-in for a pymilvus Collection: the insert / flush /
+    search surface the loader and milvus_search use, with brute-force L2.
+    """
 
-# Flush the inserted data to make it visible for search
-collection.flush()
+    def __init__(self):
+        self.insert_calls = 0
+        self._pending = []
+        self._ids = np.empty(0, dtype=np.int64)
+        self._texts = []
+        self._vectors = None
+        self._lock = threading.Lock()
 
-# Load the collection
-collection.load()
+    @property
+    def num_entities(self):
+        return len(self._ids)
 
+    def insert(self, data):
+        """data is column-major, like pymilvus: [[ids], [texts], [vectors]]."""
+        ids, texts, vectors = data
+        with self._lock:
+            self.insert_calls += 1
+            self._pending.append((np.asarray(ids, dtype=np.int64), list(texts),
+                                  np.asarray(vectors, dtype=np.float32)))
 
-# BM25 search function
-def bm25_search(query, top_k=1):
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            ids, texts, vectors = zip(*self._pending)
+            self._pending = []
+            blocks = vectors if self._vectors is None else (self._vectors,) + vectors
+            self._ids = np.concatenate((self._ids,) + ids)
+            self._texts.extend(t for batch in texts for t in batch)
+            self._vectors = np.concatenate(blocks)
+
+    def load(self):
+        pass
+
+    def search(self, data, anns_field="embedding", param=None, limit=10, output_fields=()):
+        results = []
+        for query in np.asarray(data, dtype=np.float32):
+            if self._vectors is None:
+                results.append([])
+                continue
+            dist = ((self._vectors - query) ** 2).sum(axis=1)
+            top = np.argsort(dist, kind="stable")[:limit]
+            results.append([SimpleNamespace(id=int(self._ids[i]), distance=float(dist[i]),
+                                            entity={"text": self._texts[i]}) for i in top])
+        return results
+
+
+def iter_documents(path):
+    """Yield one document per non-empty line of a text file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ingest(collection, documents, vectorizer, start_id=0, chunk_size=1000,
+           batch_size=256, max_in_flight=4):
+    """
+    Vectorize documents chunk by chunk and insert them in batches of
+    batch_size, with at most max_in_flight inserts outstanding; flush once
+    at the end. Returns throughput and peak RSS stats (max_rss_mb is None
+    where the resource module is missing, e.g. on Windows).
+    """
+    start = time.perf_counter()
+    n = start_id
+    pending = deque()
+    with ThreadPoolExecutor(max_in_flight) as pool:
+        for chunk in _chunks(documents, chunk_size):
+            vectors = vectorizer.transform(chunk).toarray().astype(np.float32)
+            for i in range(0, len(chunk), batch_size):
+                if len(pending) >= max_in_flight:
+                    pending.popleft().result()       # backpressure: wait for the oldest insert
+                batch = slice(i, i + batch_size)
+                ids = list(range(n + i, n + i + len(chunk[batch])))
+                pending.append(pool.submit(collection.insert, [ids, chunk[batch], vectors[batch]]))
+            n += len(chunk)
+        while pending:
+            pending.popleft().result()
+    collection.flush()
+
+    elapsed = time.perf_counter() - start
+    docs = n - start_id
+    try:
+        import resource
+    except ImportError:
+        max_rss_mb = None
+    else:
+        max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"docs": docs, "seconds": elapsed, "docs_per_sec": docs / elapsed if elapsed else 0.0,
+            "max_rss_mb": max_rss_mb}
+
+
+def _peak_rss(stats):
+    return "n/a" if stats["max_rss_mb"] is None else f"{stats['max_rss_mb']:.0f} MB"
+
+
+def _next_id(collection):
+    """
+    One past the largest primary key in collection (0 when empty). Counting
+    rows is not enough: deletes plus compaction shrink num_entities below
+    the ids already handed out.
+    """
+    collection.load()
+    top = -1
+    it = collection.query_iterator(batch_size=10000, expr="id >= 0", output_fields=["id"])
+    try:
+        while True:
+            rows = it.next()
+            if not rows:
+                break
+            top = max(top, max(row["id"] for row in rows))
+    finally:
+        it.close()
+    return top + 1
+
+
+def build_milvus_collection(documents, host="localhost", port="19530", name="text_documents",
+                            batch_size=256, max_in_flight=4, incremental=False, n_features=2 ** 12):
+    """
+    Connect and bulk-insert documents (a list, or the path of a
+    one-document-per-line file); returns (collection, vectorizer).
+
+    By default the collection is dropped and rebuilt with a TF-IDF vectorizer
+    fitted on the whole corpus (dimension = vocabulary size). With
+    incremental=True a stateless HashingVectorizer fixes the dimension at
+    n_features, so an existing collection is kept and only the new documents
+    are vectorized and appended.
+    """
+    from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+    connections.connect("default", host=host, port=port)
+
+    def docs():
+        return iter_documents(documents) if isinstance(documents, str) else iter(documents)
+
+    if incremental:
+        vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+        dim = n_features
+    else:
+        delete_collection(name)
+        # Create TF-IDF vectorizer
+        vectorizer = TfidfVectorizer().fit(docs())
+        dim = len(vectorizer.vocabulary_)
+
+    if utility.has_collection(name):
+        collection = Collection(name)
+        existing = next(f.params["dim"] for f in collection.schema.fields if f.name == "embedding")
+        if existing != dim:
+            raise ValueError(f"collection {name!r} holds {existing}-dim vectors, "
+                             f"the vectorizer makes {dim}; rebuild it or pass n_features={existing}")
+        start_id = _next_id(collection)
+    else:
+        # Create a collection for our documents
+        fields = [
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+            FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim)
+        ]
+        schema = CollectionSchema(fields, "A collection for text documents")
+        collection = Collection(name, schema)
+
+        # Create an IVF_FLAT index on the embedding field
+        index_params = {
+            "metric_type": "L2",
+            "index_type": "IVF_FLAT",
+            "params": {"nlist": 128}
+        }
+        collection.create_index("embedding", index_params)
+        start_id = 0
+
+    # Bulk insert, flushed once at the end; new ids continue after the largest existing one
+    stats = ingest(collection, docs(), vectorizer, start_id=start_id,
+                   batch_size=batch_size, max_in_flight=max_in_flight)
+    print(f"Inserted {stats['docs']} documents at {stats['docs_per_sec']:,.0f} docs/s "
+          f"(peak RSS {_peak_rss(stats)})")
+
+    # Load the collection
+    collection.load()
+    return collection, vectorizer
+
+
+def delete_documents(collection, ids):
+    """Delete documents by primary key from a Milvus collection."""
+    collection.delete(f"id in {list(ids)}")
+    collection.flush()
+
+
+def milvus_search_many(collection, vectorizer, queries, top_k=1):
+    """milvus_search for a batch: one transform, one search round-trip."""
+    query_vectors = vectorizer.transform(queries).toarray().astype(np.float32)
+    search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
+    results = collection.search(
+        data=list(query_vectors),
+        anns_field="embedding",
+        param=search_params,
+        limit=top_k,
+        output_fields=["text"]
+    )
+    return [[(hit.entity.get('text'), hit.distance) for hit in hits] for hits in results]
+
+
+def milvus_search(collection, vectorizer, query, top_k=1):
     # Convert query to TF-IDF vector
     query_vector = tfidf_to_dense(vectorizer.transform([query]))
-    
+
     # Search in Milvus
     search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
     results = collection.search(
@@ -79,23 +611,38 @@ def bm25_search(query, top_k=1):
         limit=top_k,
         output_fields=["text"]
     )
-    
+
     return [(hit.entity.get('text'), hit.distance) for hit in results[0]]
 
 
+if __name__ == "__main__":
+    import sys
 
-# Example search
-query = "X89_74_UX_uix"
-results = bm25_search(query,top_k=2)
+    if sys.argv[1:2] == ["ingest"]:
+        # Loader throughput against the in-memory stand-in:
+        #   python milvus_bm25.py ingest [n_docs] [batch_size]
+        from sklearn.feature_extraction.text import TfidfVectorizer
 
-print(f"Query: {query}")
-print("Results:")
-for text, score in results:
-    print(f"Text: {text}")
-    print(f"Score: {score}")
-    print()
+        n_docs = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+        batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+        corpus = [documents[i % len(documents)] + f" doc{i % 500}" for i in range(n_docs)]
+        vectorizer = TfidfVectorizer().fit(corpus)
 
-# # Disconnect from Milvus
-# connections.disconnect("default")
+        stats = ingest(LocalCollection(), corpus, vectorizer, batch_size=1, max_in_flight=1)
+        print(f"row by row : {stats['docs_per_sec']:,.0f} docs/s, peak RSS {_peak_rss(stats)}")
+        collection = LocalCollection()
+        stats = ingest(collection, corpus, vectorizer, batch_size=batch_size)
+        print(f"batch {batch_size:<4} : {stats['docs_per_sec']:,.0f} docs/s, peak RSS {_peak_rss(stats)}, "
+              f"{collection.insert_calls} insert calls")
+        sys.exit()
 
+    # Example search
+    query = "X89_74_UX_uix"
+    results = bm25_search(query, top_k=2)
 
+    print(f"Query: {query}")
+    print("Results:")
+    for text, score in results:
+        print(f"Text: {text}")
+        print(f"Score: {score}")
+        print()
@@ -0,0 +1,279 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from search_match import PARTIAL_SCORE, _prepare, _score_prepared_at_least
+
+
+# the characters a sorted-token join can hold (search_match tokens are [a-z]+ / [0-9]+)
+_ALPHABET = " 0123456789abcdefghijklmnopqrstuvwxyz"
+_CHAR_CODE = np.zeros(256, dtype=np.intp)
+_CHAR_CODE[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+
+
+def _char_counts(s: str):
+    codes = _CHAR_CODE[np.frombuffer(s.encode(), dtype=np.uint8)]
+    return np.bincount(codes, minlength=len(_ALPHABET)).astype(np.uint16)
+
+
+def _qgrams(s: str, q: int):
+    """
+    q-grams of s as a set: repeated grams get an occurrence number,
+    so set overlap == multiset overlap.
+    """
+    seen = defaultdict(int)
+    grams = []
+    for i in range(len(s) - q + 1):
+        g = s[i:i + q]
+        grams.append((g, seen[g]))
+        seen[g] += 1
+    return grams
+
+
+class NameIndex:
+    """
+    Candidate blocking index for search_match.name_similarity.
+
+    Names are indexed by the q-grams of their sorted-token join (the string
+    name_similarity actually compares), their digit tokens and their exact
+    token set. A query only scores names that can still reach min_score:
+    - length filter: the Levenshtein ratio is at most 2*min(L1, L2)/(L1 + L2)
+    - q-gram count filter: when the cutoff is tight enough for the q-gram
+      lemma to require k >= 1 shared grams, only the posting lists of the
+      query's rarest grams are scanned
+    - otherwise no gram count can be proven; names of a possible length are
+      kept if their shared character counts (an upper bound on the LCS)
+      still allow the cutoff
+    - numeric rule: names whose digit tokens are disjoint from the query's
+      score 0 and are never scored
+    These filters are exact: search() returns the same hits as scoring
+    every name. min_shared >= 1 opts in to a heuristic for the unproven
+    case instead: candidates must share >= min_shared grams, skipping
+    grams whose posting list is longer than max_posting. It is much faster
+    on short names but drops real matches (typos in 4-5 letter words often
+    share no 3-gram at all).
+    """
+
+    def __init__(self, names=(), q: int = 3, min_score: int = PARTIAL_SCORE,
+                 min_shared: int = 0, max_posting=None):
+        self.q = q
+        self.min_score = min_score
+        self.min_shared = min_shared
+        self.max_posting = max_posting
+
+        self._names = []
+        self._prepared = []                  # search_match._prepare(name) per id
+        self._lengths = []
+        self._has_num = []
+        self._short = []                     # names with no q-grams at all
+        self._by_set = defaultdict(list)     # frozenset(tokens) -> ids
+        self._pending = defaultdict(list)    # gram -> ids not yet in _postings
+        self._pending_nums = defaultdict(list)
+        self._pending_chars = []             # character counts of the join, ids not yet in _char_arr
+        self._postings = {}                  # gram -> np.ndarray of ids
+        self._num_postings = {}              # digit token -> np.ndarray of ids
+        self._len_arr = np.empty(0, dtype=np.int32)
+        self._char_arr = np.empty((0, len(_ALPHABET)), dtype=np.uint16)
+        self._has_num_arr = np.empty(0, dtype=bool)
+        self._by_len = np.empty(0, dtype=np.int32)     # ids sorted by length
+        self._sorted_len = np.empty(0, dtype=np.int32)
+
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name: str) -> int:
+        """Index one name; returns its id."""
+        i = len(self._names)
+        p = _prepare(name)
+        _, set1, nums, joined = p
+        self._names.append(name)
+        self._prepared.append(p)
+        self._lengths.append(len(joined))
+        self._pending_chars.append(_char_counts(joined))
+        self._has_num.append(bool(nums))
+        if set1:
+            self._by_set[frozenset(set1)].append(i)
+        grams = _qgrams(joined, self.q)
+        if not grams:
+            self._short.append(i)
+        for g in grams:
+            self._pending[g].append(i)
+        for n in nums:
+            self._pending_nums[n].append(i)
+        return i
+
+    def _flush(self):
+        """Move pending ids into the numpy posting arrays."""
+        if len(self._len_arr) == len(self._names):
+            return
+        for pending, target in ((self._pending, self._postings),
+                                (self._pending_nums, self._num_postings)):
+            for key, ids in pending.items():
+                new = np.array(ids, dtype=np.int32)
+                old = target.get(key)
+                target[key] = new if old is None else np.concatenate((old, new))
+            pending.clear()
+        self._len_arr = np.array(self._lengths, dtype=np.int32)
+        self._char_arr = np.concatenate((self._char_arr, np.array(self._pending_chars, dtype=np.uint16)))
+        self._pending_chars.clear()
+        self._has_num_arr = np.array(self._has_num, dtype=bool)
+        self._by_len = np.argsort(self._len_arr, kind="stable").astype(np.int32)
+        self._sorted_len = self._len_arr[self._by_len]
+
+    def _length_range(self, l1: int, cutoff: float):
+        """Candidate lengths whose best possible ratio still reaches cutoff."""
+        lo = math.ceil(l1 * cutoff / (2 - cutoff) - 1e-9)
+        hi = math.floor(l1 * (2 - cutoff) / cutoff + 1e-9)
+        return lo, hi
+
+    def _min_shared_grams(self, l1: int, lo: int, hi: int, cutoff: float) -> int:
+        """
+        q-gram lemma: edit distance k => at least max(L1, L2) - q + 1 - q*k
+        shared grams. Indel distance bounds k, and ratio >= cutoff bounds the
+        indel distance; return the smallest requirement over [lo, hi].
+        """
+        q = self.q
+        need = None
+        for l2 in range(lo, hi + 1):
+            k = math.floor((1 - cutoff) * (l1 + l2) + 1e-9)
+            t = max(l1, l2) - q + 1 - q * k
+            need = t if need is None else min(need, t)
+        return need if need is not None else 0
+
+    def candidates(self, name: str, min_score=None) -> np.ndarray:
+        """Ids worth scoring against name (unverified, unsorted)."""
+        self._flush()
+        min_score = self.min_score if min_score is None else min_score
+        t1, set1, nums1, joined = _prepare(name)
+        n = len(self._names)
+        if not t1 or not n:
+            return np.empty(0, dtype=np.int32)
+
+        # score >= min_score needs final (and so base) >= (min_score - 0.5) / 100
+        cutoff = (min_score - 0.5) / 100
+        if cutoff <= 0:
+            return np.arange(n, dtype=np.int32)
+
+        l1 = len(joined)
+        lo, hi = self._length_range(l1, cutoff)
+        grams = [g for g in _qgrams(joined, self.q) if g in self._postings]
+        need = self._min_shared_grams(l1, lo, hi, cutoff)
+
+        if need >= 1:
+            # prefix filter: any name sharing >= need grams shares one of
+            # the (len(query grams) - need + 1) rarest ones
+            n_grams = max(len(joined) - self.q + 1, 0)
+            grams.sort(key=lambda g: len(self._postings[g]))
+            prefix = grams[:max(n_grams - need + 1, 0)]
+            lists = [self._postings[g] for g in prefix]
+            cand = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int32)
+        elif self.min_shared < 1:
+            # no shared gram can be proven: bound the ratio by the shared
+            # characters instead, 2 * LCS <= 2 * sum(min(count1, count2))
+            start, stop = np.searchsorted(self._sorted_len, (lo, hi + 1))
+            cand = self._by_len[start:stop]
+            shared = np.minimum(self._char_arr[cand], _char_counts(joined)).sum(axis=1, dtype=np.int64)
+            cand = cand[2 * shared >= cutoff * (l1 + self._len_arr[cand]) - 1e-9]
+        else:
+            lists = [self._postings[g] for g in grams
+                     if self.max_posting is None or len(self._postings[g]) <= self.max_posting]
+            if lists:
+                ids, counts = np.unique(np.concatenate(lists), return_counts=True)
+                cand = ids[counts >= self.min_shared]
+            else:
+                cand = np.empty(0, dtype=np.int32)
+            if self._short:
+                cand = np.union1d(cand, np.array(self._short, dtype=np.int32))
+
+        lengths = self._len_arr[cand]
+        cand = cand[(lengths >= lo) & (lengths <= hi)]
+
+        if nums1:
+            lists = [self._num_postings[t] for t in nums1 if t in self._num_postings]
+            shared = np.concatenate(lists) if lists else np.empty(0, dtype=np.int32)
+            cand = cand[~self._has_num_arr[cand] | np.isin(cand, shared)]
+
+        same = self._by_set.get(frozenset(set1))
+        if same:
+            cand = np.union1d(cand, np.array(same, dtype=np.int32))
+        return cand
+
+    def search(self, name: str, min_score=None, top_k=None):
+        """
+        Return [(id, score), ...] for indexed names scoring >= min_score,
+        sorted by score (desc) then id.
+        """
+        min_score = self.min_score if min_score is None else min_score
+        p = _prepare(name)
+        hits = []
+        for j in self.candidates(name, min_score).tolist():
+            score = _score_prepared_at_least(p, self._prepared[j], min_score)
+            if score >= min_score:
+                hits.append((j, score))
+        hits.sort(key=lambda x: (-x[1], x[0]))
+        return hits[:top_k] if top_k is not None else hits
+
+    def name(self, i: int) -> str:
+        return self._names[i]
+
+
+if __name__ == "__main__":
+    # Recall vs. brute force and speedup on a synthetic corpus.
+    # usage: python name_index.py [n_names] [n_queries]
+    import random
+    import string
+    import sys
+    import time
+
+    from search_match import match_many
+
+    n_names = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+    firsts = [word() for _ in range(3000)]
+    lasts = [word() for _ in range(30000)]
+    streets = [word() + " " + rng.choice(["street", "road", "lane", "avenue"]) for _ in range(5000)]
+
+    def fake_name():
+        parts = [rng.choice(firsts), rng.choice(lasts)]
+        if rng.random() < 0.5:
+            parts += [str(rng.randint(1, 999)), rng.choice(streets)]
+        return " ".join(parts)
+
+    def typo(s):
+        i = rng.randrange(len(s))
+        return s[:i] + rng.choice("aeiou") + s[i + 1:]
+
+    corpus = [fake_name() for _ in range(n_names)]
+    queries = [typo(rng.choice(corpus)) for _ in range(n_queries)]
+
+    t0 = time.perf_counter()
+    index = NameIndex(corpus)
+    index._flush()
+    t_build = time.perf_counter() - t0
+    heuristic = NameIndex(corpus, min_shared=1, max_posting=n_names // 20)
+
+    t0 = time.perf_counter()
+    truth = match_many(queries, corpus, min_score=PARTIAL_SCORE, workers=-1)
+    t_brute = time.perf_counter() - t0
+
+    relevant = sum(len(t) for t in truth)
+    print(f"corpus {n_names:,} names, {n_queries} queries, build {t_build:.1f}s")
+    print(f"brute force (match_many): {t_brute / n_queries * 1000:.1f} ms/query")
+    for label, idx in (("exact", index), ("min_shared=1", heuristic)):
+        idx.search(queries[0])
+        t0 = time.perf_counter()
+        found = [idx.search(q) for q in queries]
+        t_index = time.perf_counter() - t0
+        hit = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+        print(f"NameIndex.search {label:12s}: {t_index / n_queries * 1000:.1f} ms/query  x{t_brute / t_index:.1f}, "
+              f"recall @ score >= {PARTIAL_SCORE}: {hit}/{relevant} = {hit / max(relevant, 1):.4f}")
@@ -0,0 +1,213 @@
+"""
+Name Match scoring core, shared by the Streamlit app (stapp.py) and
+batch_score.py.
+
+    calculate_match_score(["John", "A", "Smith"], ["Jon", "", "Smith"])          # 0-100
+    calculate_match_score(a_parts, b_parts, weights=NAME_PART_WEIGHTS)            # first/middle/last weighted
+    calculate_match_scores(a_parts, [b_parts, c_parts, ...])                      # one name vs. many
+    calculate_pair_scores([(a_parts, b_parts), (c_parts, d_parts), ...])         # many pairs
+    calculate_match_score(a_parts, b_parts, compat=True)                          # the old difflib numbers
+
+Scores are the Indel (InDel-distance) ratio 2 * LCS / (len1 + len2) of
+the lowercased names, computed by rapidfuzz in C with a bit-parallel LCS:
+linear in practice, no junk/autojunk heuristics, so the score depends only
+on the two strings. It is the same ratio as Levenshtein.ratio and the base
+of search_match.name_similarity. difflib.SequenceMatcher approximates the
+same quantity (it never exceeds it) and is kept behind compat=True.
+"""
+from difflib import SequenceMatcher
+
+from rapidfuzz.distance import Indel
+from rapidfuzz.process import cdist, cpdist
+
+# first, middle, last: surnames carry the most evidence, middle names the
+# least (they are often missing or reduced to an initial)
+NAME_PART_WEIGHTS = (0.35, 0.15, 0.5)
+
+
+def _join(parts):
+    return " ".join(filter(None, parts)).strip().lower()
+
+
+def _part(parts, i):
+    return (parts[i] if i < len(parts) and parts[i] else "").strip().lower()
+
+
+def _difflib_ratio(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _weighted(name1_parts, name2_parts, weights, ratio):
+    """Weighted mean ratio over the parts filled in on both sides."""
+    total = score = 0.0
+    for i, w in enumerate(weights):
+        a, b = _part(name1_parts, i), _part(name2_parts, i)
+        if a and b:
+            total += w
+            score += w * ratio(a, b)
+    return score / total if total else None
+
+
+def calculate_match_score(name1_parts, name2_parts, weights=None, compat=False):
+    """
+    Similarity 0-100 (2 decimals) between two names given as parts.
+
+    - weights: per-part weights (e.g. NAME_PART_WEIGHTS for first, middle,
+      last); parts empty on either side are left out and the rest
+      renormalized. None compares the joined names.
+    - compat: score with difflib.SequenceMatcher like the original app.
+    """
+    ratio = _difflib_ratio if compat else Indel.normalized_similarity
+    if weights is not None:
+        score = _weighted(name1_parts, name2_parts, weights, ratio)
+        if score is not None:
+            return round(score * 100, 2)
+        # no part filled in on both sides: fall back to the joined names
+    name1, name2 = _join(name1_parts), _join(name2_parts)
+    if not name1 or not name2:
+        return 0
+    return round(ratio(name1, name2) * 100, 2)
+
+
+def calculate_match_scores(name_parts, candidates, weights=None, compat=False):
+    """
+    calculate_match_score(name_parts, c, weights, compat) for every c in
+    candidates (lists of parts), scored in one rapidfuzz cdist call per
+    part instead of a Python loop.
+    """
+    if compat:
+        return [calculate_match_score(name_parts, c, weights, compat=True) for c in candidates]
+    if not candidates:
+        return []
+
+    if weights is None:
+        name = _join(name_parts)
+        joined = [_join(c) for c in candidates]
+        row = cdist([name], joined, scorer=Indel.normalized_similarity)[0]
+        return [round(float(r) * 100, 2) if name and j else 0 for r, j in zip(row, joined)]
+
+    total = [0.0] * len(candidates)
+    score = [0.0] * len(candidates)
+    for i, w in enumerate(weights):
+        a = _part(name_parts, i)
+        if not a:
+            continue
+        parts = [_part(c, i) for c in candidates]
+        row = cdist([a], parts, scorer=Indel.normalized_similarity)[0]
+        for k, p in enumerate(parts):
+            if p:
+                total[k] += w
+                score[k] += w * float(row[k])
+    out = []
+    for k, c in enumerate(candidates):
+        if total[k]:
+            out.append(round(score[k] / total[k] * 100, 2))
+        else:
+            out.append(calculate_match_score(name_parts, c))
+    return out
+
+
+def calculate_pair_scores(pairs, weights=None, compat=False):
+    """
+    calculate_match_score(a, b, weights, compat) for every (a, b) in pairs,
+    scored element-wise with one rapidfuzz cpdist call per part.
+    """
+    pairs = list(pairs)
+    if compat or not pairs:
+        return [calculate_match_score(a, b, weights, compat) for a, b in pairs]
+
+    if weights is None:
+        left = [_join(a) for a, _ in pairs]
+        right = [_join(b) for _, b in pairs]
+        ratios = cpdist(left, right, scorer=Indel.normalized_similarity)
+        return [round(float(r) * 100, 2) if a and b else 0 for r, a, b in zip(ratios, left, right)]
+
+    total = [0.0] * len(pairs)
+    score = [0.0] * len(pairs)
+    for i, w in enumerate(weights):
+        left = [_part(a, i) for a, _ in pairs]
+        right = [_part(b, i) for _, b in pairs]
+        ratios = cpdist(left, right, scorer=Indel.normalized_similarity)
+        for k, (a, b) in enumerate(zip(left, right)):
+            if a and b:
+                total[k] += w
+                score[k] += w * float(ratios[k])
+    return [round(score[k] / total[k] * 100, 2) if total[k] else calculate_match_score(a, b)
+            for k, (a, b) in enumerate(pairs)]
+
+
+if __name__ == "__main__":
+    # difflib vs. the Indel core on long address strings, pair by pair and in
+    # batch, plus agreement of compat=True with difflib.
+    #   python name_score.py [n_pairs] [length]
+    import random
+    import string
+    import sys
+    import time
+
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(0)
+
+    def address():
+        words = []
+        while sum(len(w) + 1 for w in words) < length:
+            words.append(rng.choice([str(rng.randint(1, 9999)),
+                                     "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))]))
+        return " ".join(words)
+
+    def mutate(s):
+        chars = list(s)
+        for _ in range(max(1, len(chars) // 20)):
+            j = rng.randrange(len(chars))
+            chars[j] = rng.choice(string.ascii_lowercase)
+        return "".join(chars)
+
+    left = [address() for _ in range(n_pairs)]
+    related = [rng.random() < 0.5 for _ in left]
+    right = [mutate(a) if r else address() for a, r in zip(left, related)]
+
+    t0 = time.perf_counter()
+    old = [calculate_match_score([a], [b], compat=True) for a, b in zip(left, right)]
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = [calculate_match_score([a], [b]) for a, b in zip(left, right)]
+    t_new = time.perf_counter() - t0
+    exact = sum(o == round(SequenceMatcher(None, a.lower(), b.lower()).ratio() * 100, 2)
+                for o, a, b in zip(old, left, right))
+    print(f"{n_pairs} pairs of ~{length}-char addresses: difflib {t_old / n_pairs * 1e6:.0f} us/pair, "
+          f"Indel {t_new / n_pairs * 1e6:.1f} us/pair ({t_old / t_new:.0f}x)")
+    print(f"compat=True == difflib on {exact}/{n_pairs} pairs")
+    for label, want in (("near-duplicates", True), ("unrelated", False)):
+        diff = [n - o for n, o, r in zip(new, old, related) if r == want]
+        mean_new = sum(n for n, r in zip(new, related) if r == want) / len(diff)
+        mean_old = sum(o for o, r in zip(old, related) if r == want) / len(diff)
+        print(f"  {label}: difflib mean {mean_old:.1f}, Indel mean {mean_new:.1f}, "
+              f"max difference {max(diff):.1f} points")
+
+    query, candidates = [left[0]], [[r] for r in right]
+    calculate_match_scores(query, candidates[:2])                # first cdist call initializes rapidfuzz
+    t0 = time.perf_counter()
+    batch = calculate_match_scores(query, candidates)
+    t_batch = time.perf_counter() - t0
+    assert batch == [calculate_match_score(query, c) for c in candidates]
+    t0 = time.perf_counter()
+    calculate_match_scores(query, candidates, compat=True)
+    t_batch_old = time.perf_counter() - t0
+    print(f"one address vs {n_pairs}: difflib {t_batch_old * 1e3:.1f} ms, batch {t_batch * 1e3:.2f} ms "
+          f"({t_batch_old / t_batch:.0f}x)")
+
+    pairs = [([a], [b]) for a, b in zip(left, right)]
+    calculate_pair_scores(pairs[:2])
+    t0 = time.perf_counter()
+    assert calculate_pair_scores(pairs) == new
+    print(f"{n_pairs} pairs element-wise: {(time.perf_counter() - t0) / n_pairs * 1e6:.1f} us/pair")
+
+    people = [[rng.choice(["john", "jon", "joan"]), rng.choice(["", "a", "alan"]), rng.choice(["smith", "smyth"])]
+              for _ in range(1000)]
+    assert calculate_pair_scores(list(zip(people, people[::-1])), NAME_PART_WEIGHTS) == \
+        [calculate_match_score(a, b, NAME_PART_WEIGHTS) for a, b in zip(people, people[::-1])]
+    weighted = calculate_match_scores(people[0], people, weights=NAME_PART_WEIGHTS)
+    assert weighted == [calculate_match_score(people[0], p, weights=NAME_PART_WEIGHTS) for p in people]
+    print(f"weighted {people[0]} vs {people[1]}: {weighted[1]} "
+          f"(unweighted {calculate_match_score(people[0], people[1])})")
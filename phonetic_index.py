@@ -0,0 +1,102 @@
+import gzip
+import heapq
+import json
+from collections import Counter, defaultdict
+
+from ptic import _codes_similarity, encode_name
+
+
+class PhoneticIndex:
+    """
+    Inverted index of Beider-Morse codes -> name ids.
+
+    Each name's tokens are encoded once (through the ptic encoding cache) and
+    kept as per-token code sets. A query collects the names sharing at least
+    one code with it and rescores only those with ptic's Jaccard/Levenshtein
+    token similarity, instead of scanning every stored name.
+    """
+
+    def __init__(self, match_mode='approx'):
+        self.match_mode = match_mode
+        self._names = {}                     # id -> name
+        self._codes = {}                     # id -> [frozenset of codes per token]
+        self._postings = defaultdict(set)    # code -> ids
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name_id):
+        return name_id in self._names
+
+    def add(self, name, name_id=None, codes=None):
+        """Index a (preprocessed) name; returns its id. Re-adding an id replaces it."""
+        if name_id is None:
+            name_id = self._next_id
+        if name_id in self._names:
+            self.remove(name_id)
+        if isinstance(name_id, int):
+            self._next_id = max(self._next_id, name_id + 1)
+        if codes is None:
+            codes = encode_name(name, self.match_mode)
+        self._names[name_id] = name
+        self._codes[name_id] = codes
+        for code in set().union(*codes):
+            self._postings[code].add(name_id)
+        return name_id
+
+    def remove(self, name_id):
+        """Drop a name from the index; unknown ids raise KeyError."""
+        codes = self._codes.pop(name_id)
+        del self._names[name_id]
+        for code in set().union(*codes):
+            ids = self._postings[code]
+            ids.discard(name_id)
+            if not ids:
+                del self._postings[code]
+
+    def name(self, name_id):
+        return self._names[name_id]
+
+    def candidates(self, name, min_shared=1):
+        """Ids of names sharing at least min_shared distinct codes with name."""
+        query_codes = set().union(*encode_name(name, self.match_mode))
+        shared = Counter()
+        for code in query_codes:
+            shared.update(self._postings.get(code, ()))
+        return {i for i, n in shared.items() if n >= min_shared}
+
+    def search(self, name, top_k=10, min_score=0.0, min_shared=1):
+        """Return [(id, score), ...] of the best phonetic matches, best first."""
+        query = encode_name(name, self.match_mode)
+        scored = ((i, _codes_similarity(query, self._codes[i]))
+                  for i in self.candidates(name, min_shared))
+        scored = [(i, s) for i, s in scored if s >= min_score]
+        return heapq.nlargest(top_k, scored, key=lambda x: x[1])
+
+    def save(self, path):
+        """
+        Write a gzipped JSON file: a table of distinct codes plus, per name,
+        its id, text and per-token code indexes into that table.
+        """
+        table = {}
+        rows = []
+        for name_id, name in self._names.items():
+            tokens = [sorted(table.setdefault(c, len(table)) for c in enc)
+                      for enc in self._codes[name_id]]
+            rows.append([name_id, name, tokens])
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"version": 1, "match_mode": self.match_mode,
+                       "codes": list(table), "names": rows}, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """Rebuild an index written by save() without re-encoding anything."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(match_mode=data["match_mode"])
+        table = data["codes"]
+        for name_id, name, tokens in data["names"]:
+            codes = [frozenset(table[c] for c in enc) for enc in tokens]
+            index.add(name, name_id=name_id, codes=codes)
+        return index
@@ -1,6 +1,21 @@
 # pip install python-Levenshtein
 import re
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
 from Levenshtein import ratio as lev_ratio  # similarity in [0, 1]
+from rapidfuzz.distance import Indel        # same ratio as lev_ratio; installed with Levenshtein
+from rapidfuzz.process import cdist
+
+# classify_match thresholds
+HIGH_SCORE = 85
+PARTIAL_SCORE = 60
+
+
+# one pass over the lowercased string: maximal runs of letters or of digits;
+# everything else (spaces, punctuation, non-ASCII) separates tokens
+_TOKEN_RE = re.compile(r'[a-z]+|[0-9]+')
 
 
 def _norm_tokens(s: str):
@@ -11,62 +26,211 @@ def _norm_tokens(s: str):
     - remove non [a-z0-9 ] chars
     - collapse spaces
     """
-    s = (s or "").lower()
-    s = re.sub(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])', ' ', s)
-    s = re.sub(r'[^a-z0-9\s]', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s.split() if s else []
+    return _TOKEN_RE.findall((s or "").lower())
 
 
-def name_similarity(a: str, b: str) -> int:
+def normalize_many(values):
     """
-    Return similarity 0–100 between two names/addresses.
-    - ignores word order
-    - numeric logic:
-        * if both have numbers and NONE match -> 0
-        * if some numbers match -> adjust score based on match ratio
+    _norm_tokens over a list (returns a list) or a pandas Series (returns a
+    Series with the same index). Other values are converted with str()
+    (12345 -> ['12345']); missing values (None, NaN) give [].
     """
-    t1 = _norm_tokens(a)
-    t2 = _norm_tokens(b)
+    def missing(s):
+        try:
+            return s is None or bool(s != s)    # NaN is the only value unequal to itself
+        except TypeError:                       # pandas.NA has no truth value
+            return True
 
-    if not t1 and not t2:
-        return 0
+    def norm(s):
+        if missing(s):
+            return []
+        return _TOKEN_RE.findall((s if isinstance(s, str) else str(s)).lower())
+
+    if hasattr(values, "map") and hasattr(values, "index"):
+        return values.map(norm)
+    return [norm(s) for s in values]
+
+
+def _prepare(s: str):
+    """
+    Precompute everything name_similarity needs from one string, so it can
+    be reused across many comparisons:
+    (tokens, token set, digit-token set, sorted-token join)
+    """
+    toks = _norm_tokens(s)
+    return toks, set(toks), {t for t in toks if t.isdigit()}, " ".join(sorted(toks))
 
-    set1, set2 = set(t1), set(t2)
 
-    # numeric tokens
-    nums1 = {t for t in t1 if t.isdigit()}
-    nums2 = {t for t in t2 if t.isdigit()}
+def _numeric_weight(nums1, nums2):
+    """
+    Weight applied to the base score when both sides carry numbers.
+    Returns 0.0 for a hard numeric mismatch (no common numbers).
+    """
     common_nums = nums1 & nums2
+    if not common_nums:
+        return 0.0
+    # ratio of common numbers to max count on either side
+    num_ratio = len(common_nums) / max(len(nums1), len(nums2))
+    # weight in [0.5, 1.0]:
+    #   0.5 when only some numbers match,
+    #   1.0 when all numbers match
+    return 0.5 + 0.5 * num_ratio
+
+
+def _score_prepared(p1, p2) -> int:
+    """name_similarity on two _prepare() results."""
+    t1, set1, nums1, s1 = p1
+    t2, set2, nums2, s2 = p2
+
+    if not t1 and not t2:
+        return 0
 
     # hard mismatch: both have numbers but no common ones
-    if nums1 and nums2 and not common_nums:
+    if nums1 and nums2 and not (nums1 & nums2):
         return 0
 
     # exact same tokens (order may differ)
     if set1 and set1 == set2:
         return 100
 
-    # base similarity (order-insensitive: sort tokens first)
-    s1 = " ".join(sorted(t1))
-    s2 = " ".join(sorted(t2))
+    # base similarity (order-insensitive: tokens are sorted in _prepare)
     base = lev_ratio(s1, s2)  # 0..1
 
     # adjust based on numeric overlap
     if nums1 and nums2:
-        # ratio of common numbers to max count on either side
-        num_ratio = len(common_nums) / max(len(nums1), len(nums2))
-        # weight in [0.5, 1.0]:
-        #   0.5 when only some numbers match,
-        #   1.0 when all numbers match
-        weight = 0.5 + 0.5 * num_ratio
-        final = base * weight
+        final = base * _numeric_weight(nums1, nums2)
     else:
         final = base
 
     return int(round(final * 100))
 
 
+def _score_prepared_at_least(p1, p2, cutoff: int) -> int:
+    """
+    _score_prepared, but gives up (returns 0) as soon as the score provably
+    can't reach cutoff; scores >= cutoff are exact.
+    """
+    t1, set1, nums1, s1 = p1
+    t2, set2, nums2, s2 = p2
+
+    if not t1 and not t2:
+        return 0
+
+    weight = 1.0
+    if nums1 and nums2:
+        weight = _numeric_weight(nums1, nums2)
+        if not weight:
+            return 0        # hard numeric mismatch
+
+    if set1 and set1 == set2:
+        return 100
+
+    # int(round(final * 100)) >= cutoff needs final >= (cutoff - 0.5) / 100,
+    # and final = base * weight with base <= 2 * min(len) / (len1 + len2)
+    need = (cutoff - 0.5) / 100 / weight
+    if need > 0:
+        if 2 * min(len(s1), len(s2)) < need * (len(s1) + len(s2)) - 1e-9:
+            return 0
+        # cutoff-aware edit distance: 0.0 as soon as the ratio can't reach need
+        base = lev_ratio(s1, s2, score_cutoff=max(need - 1e-9, 0.0))
+    else:
+        base = lev_ratio(s1, s2)
+
+    final = base * weight if nums1 and nums2 else base
+    score = int(round(final * 100))
+    return score if score >= cutoff else 0
+
+
+def name_similarity(a: str, b: str) -> int:
+    """
+    Return similarity 0–100 between two names/addresses.
+    - ignores word order
+    - numeric logic:
+        * if both have numbers and NONE match -> 0
+        * if some numbers match -> adjust score based on match ratio
+    """
+    return _score_prepared(_prepare(a), _prepare(b))
+
+
+# dedup jobs compare the same names over and over; keep their prepared forms
+_prepare_cached = lru_cache(maxsize=1 << 16)(_prepare)
+
+
+def name_similarity_at_least(a: str, b: str, cutoff: int) -> bool:
+    """
+    name_similarity(a, b) >= cutoff, without computing the full score for
+    pairs that cheap bounds (length ratio, numeric weight) already rule out.
+    """
+    return _score_prepared_at_least(_prepare_cached(a), _prepare_cached(b), cutoff) >= cutoff
+
+
+def classify_fast(a: str, b: str) -> str:
+    """classify_match(name_similarity(a, b)), abandoning 'none' pairs early."""
+    return classify_match(_score_prepared_at_least(_prepare_cached(a), _prepare_cached(b), PARTIAL_SCORE))
+
+
+def match_many(queries, candidates, top_k=None, min_score=0, max_cells=1 << 22, workers=1):
+    """
+    Score every query against every candidate; same scores as calling
+    name_similarity(query, candidate) in a double loop.
+    - each string is normalized once (_prepare)
+    - base Levenshtein ratios are computed a block of queries at a time
+      (at most max_cells pairs per block) with rapidfuzz's cdist
+    - numeric weighting is only applied to pairs where both sides have numbers
+
+    Returns one list per query of (candidate_index, score), sorted by score
+    (desc) then candidate index, keeping scores >= min_score and at most
+    top_k entries.
+    """
+    cands = [_prepare(c) for c in candidates]
+    n_cands = len(cands)
+    if not n_cands:
+        return [[] for _ in queries]
+
+    cand_joined = [p[3] for p in cands]
+    cand_empty = np.array([not p[0] for p in cands])
+    cand_num_idx = np.array([j for j, p in enumerate(cands) if p[2]], dtype=np.intp)
+
+    # candidates with exactly the same token set always score 100
+    by_set = defaultdict(list)
+    for j, p in enumerate(cands):
+        if p[1]:
+            by_set[frozenset(p[1])].append(j)
+
+    block = max(1, max_cells // n_cands)
+    results = []
+    for start in range(0, len(queries), block):
+        qs = [_prepare(q) for q in queries[start:start + block]]
+        base = cdist([q[3] for q in qs], cand_joined,
+                     scorer=Indel.normalized_similarity, dtype=np.float64, workers=workers)
+
+        for q, row in zip(qs, base):
+            scores = np.rint(row * 100).astype(np.int64)
+
+            if not q[0]:
+                # empty vs empty is 0, not a perfect ratio
+                scores[cand_empty] = 0
+            elif q[2] and len(cand_num_idx):
+                # only reweight pairs that could still reach min_score
+                idx = cand_num_idx[scores[cand_num_idx] >= min_score]
+                for j in idx.tolist():
+                    weight = _numeric_weight(q[2], cands[j][2])
+                    scores[j] = int(round(row[j] * weight * 100))
+
+            if q[1]:
+                same = by_set.get(frozenset(q[1]))
+                if same:
+                    scores[same] = 100
+
+            keep = np.flatnonzero(scores >= min_score)
+            order = keep[np.lexsort((keep, -scores[keep]))]
+            if top_k is not None:
+                order = order[:top_k]
+            results.append([(int(j), int(scores[j])) for j in order])
+
+    return results
+
+
 def classify_match(score: int) -> str:
     """
     Map similarity score (0–100) into 3 buckets:
@@ -74,9 +238,108 @@ def classify_match(score: int) -> str:
     - 'partial' : maybe same, needs review
     - 'none'    : treat as not same
     """
-    if score >= 85:
+    if score >= HIGH_SCORE:
         return "high"      # highly correct
-    elif score >= 60:
+    elif score >= PARTIAL_SCORE:
         return "partial"   # may be partially correct
     else:
         return "none"      # no confidence they are same
+
+
+if __name__ == "__main__":
+    # Benchmarks:
+    #   python search_match.py [n_queries] [n_candidates]  match_many vs. naive double loop
+    #   python search_match.py tokens                       single-pass vs. three-pass _norm_tokens
+    #   python search_match.py classify [n_pairs]           classify_fast vs. full scoring
+    import random
+    import sys
+    import time
+
+    rng = random.Random(0)
+
+    if sys.argv[1:2] == ["tokens"]:
+        import timeit
+        import tracemalloc
+
+        def three_pass(s):
+            """_norm_tokens before the single-pass regex."""
+            s = (s or "").lower()
+            s = re.sub(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])', ' ', s)
+            s = re.sub(r'[^a-z0-9\s]', ' ', s)
+            s = re.sub(r'\s+', ' ', s).strip()
+            return s.split() if s else []
+
+        alphabet = "abcXYZ019 _-./#\t\u00a0\u0663\u00e9\u0130\u212a"
+        fuzz = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(100_000)]
+        fuzz += ["", None, "No.23 Main-St", "Flat 4B, 221b Baker Street"]
+        for s in fuzz:
+            assert _norm_tokens(s) == three_pass(s), repr(s)
+        print(f"fuzz corpus: {len(fuzz)} strings, identical tokens")
+
+        sample = "Flat 4B, 221b Baker Street / London NW1 6XE"
+        for label, fn in (("three-pass", three_pass), ("single-pass", _norm_tokens)):
+            n = 200_000
+            per_call = timeit.timeit(lambda: fn(sample), number=n) / n
+            tracemalloc.start()
+            fn(sample)                                  # warm regex caches
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(sample)
+            peak = tracemalloc.get_traced_memory()[1] - base
+            tracemalloc.stop()
+            print(f"{label:12s}: {per_call * 1e6:.2f} us/call, {peak} bytes allocated at peak per call")
+        sys.exit()
+
+    if sys.argv[1:2] == ["classify"]:
+        # dedup-style workload: almost every pair is a non-match
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+        syll = ["an", "ber", "car", "dan", "el", "fer", "gar", "is", "jo", "lor", "mi", "san"]
+        names = [" ".join("".join(rng.sample(syll, 3)) for _ in range(rng.randint(1, 8)))
+                 + (f" {rng.randint(1, 99)}" if rng.random() < 0.5 else "") for _ in range(2000)]
+        pairs = [(rng.choice(names), rng.choice(names)) for _ in range(n)]
+
+        t0 = time.perf_counter()
+        slow = [classify_match(name_similarity(a, b)) for a, b in pairs]
+        t_slow = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fast = [classify_fast(a, b) for a, b in pairs]
+        t_fast = time.perf_counter() - t0
+
+        assert slow == fast
+        print(f"{n} pairs, {fast.count('none') / n:.1%} 'none' (buckets identical)")
+        print(f"classify_match(name_similarity): {t_slow:.3f}s")
+        print(f"classify_fast                  : {t_fast:.3f}s  x{t_slow / t_fast:.1f}")
+        sys.exit()
+
+    n_q = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_c = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    words = ["main", "street", "road", "park", "avenue", "north", "south", "lane",
+             "john", "smith", "mary", "jones", "acme", "corp", "house", "flat", "no"]
+
+    def fake_name():
+        toks = rng.sample(words, rng.randint(2, 5))
+        if rng.random() < 0.6:
+            toks.append(str(rng.randint(1, 60)))
+        if rng.random() < 0.3:
+            toks[0] = toks[0][:-1] + rng.choice("aeiou")
+        return " ".join(toks).title()
+
+    queries = [fake_name() for _ in range(n_q)]
+    candidates = [fake_name() for _ in range(n_c)]
+
+    t0 = time.perf_counter()
+    naive = [[name_similarity(q, c) for c in candidates] for q in queries]
+    t_naive = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = match_many(queries, candidates)
+    t_batch = time.perf_counter() - t0
+
+    for row, got in zip(naive, batch):
+        assert sorted(((j, s) for j, s in enumerate(row)), key=lambda x: (-x[1], x[0])) == got
+
+    pairs = n_q * n_c
+    print(f"{n_q} x {n_c} = {pairs} pairs (results identical)")
+    print(f"naive loop : {t_naive:.3f}s  ({pairs / t_naive:,.0f} pairs/s)")
+    print(f"match_many : {t_batch:.3f}s  ({pairs / t_batch:,.0f} pairs/s)  x{t_naive / t_batch:.1f}")
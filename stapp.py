@@ -1,7 +1,14 @@
+import io
+
+import pandas as pd
 import streamlit as st
-from difflib import SequenceMatcher
 import plotly.graph_objects as go
 
+from name_score import NAME_PART_WEIGHTS, calculate_match_score, calculate_pair_scores
+
+CHUNK_SIZE = 1000        # batch rows scored (and cached) per step
+PREVIEW_ROWS = 1000      # batch rows shown on the page; the download has all of them
+
 # Page config
 st.set_page_config(page_title="Name Match API", page_icon="🔍", layout="centered")
 
@@ -53,45 +60,35 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def calculate_match_score(name1_parts, name2_parts):
-    """Calculate similarity score between two names using difflib"""
-    # Combine name parts
-    name1 = " ".join(filter(None, name1_parts)).strip().lower()
-    name2 = " ".join(filter(None, name2_parts)).strip().lower()
-    
-    if not name1 or not name2:
-        return 0
-    
-    # Calculate similarity ratio
-    ratio = SequenceMatcher(None, name1, name2).ratio()
-    return round(ratio * 100, 2)
+# (lowest score, label, color), best first
+CONFIDENCE_LEVELS = [
+    (90, "Excellent Match", "#4CAF50"),
+    (75, "Good Match", "#8BC34A"),
+    (60, "Moderate Match", "#FFC107"),
+    (40, "Low Match", "#FF9800"),
+    (0, "Poor Match", "#F44336"),
+]
 
 def get_confidence_level(score):
     """Return confidence level based on score"""
-    if score >= 90:
-        return "Excellent Match", "#4CAF50"
-    elif score >= 75:
-        return "Good Match", "#8BC34A"
-    elif score >= 60:
-        return "Moderate Match", "#FFC107"
-    elif score >= 40:
-        return "Low Match", "#FF9800"
-    else:
-        return "Poor Match", "#F44336"
+    for threshold, label, color in CONFIDENCE_LEVELS:
+        if score >= threshold:
+            return label, color
+    return CONFIDENCE_LEVELS[-1][1:]
 
-def create_gauge_chart(score):
-    """Create a professional gauge chart for the score"""
-    confidence, color = get_confidence_level(score)
-    
+# Streamlit re-runs this whole script on every widget change: everything
+# below that does not depend on the inputs is built once and reused.
+
+@st.cache_resource
+def gauge_template():
+    """The gauge's static parts (axis, bands, threshold, layout), built once per server process"""
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
-        value = score,
+        value = 0,
         domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': confidence, 'font': {'size': 24, 'color': color}},
         number = {'suffix': "%", 'font': {'size': 50}},
         gauge = {
             'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': "darkgray"},
-            'bar': {'color': color},
             'bgcolor': "white",
             'borderwidth': 2,
             'bordercolor': "gray",
@@ -109,135 +106,241 @@ def create_gauge_chart(score):
             }
         }
     ))
-    
+
     fig.update_layout(
         height=300,
         margin=dict(l=20, r=20, t=60, b=20),
         paper_bgcolor="rgba(0,0,0,0)",
         font={'family': "Arial, sans-serif"}
     )
-    
+
+    return fig
+
+def create_gauge_chart(score):
+    """Create a professional gauge chart for the score"""
+    confidence, color = get_confidence_level(score)
+    fig = go.Figure(gauge_template())   # a copy: the cached template is shared by every session
+    fig.update_traces(
+        value=score,
+        title={'text': confidence, 'font': {'size': 24, 'color': color}},
+        gauge={'bar': {'color': color}},
+    )
     return fig
 
+@st.cache_data(max_entries=10_000, show_spinner=False)
+def score_pair(name1_parts, name2_parts, weighted, legacy):
+    return calculate_match_score(list(name1_parts), list(name2_parts),
+                                 weights=NAME_PART_WEIGHTS if weighted else None, compat=legacy)
+
+@st.cache_data(show_spinner=False)
+def read_pairs(data):
+    """Uploaded CSV bytes -> DataFrame of strings (empty cells as "")"""
+    return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def score_chunk(left, right, weighted, legacy):
+    """Scores for one chunk of rows; left/right hold each name's part columns"""
+    pairs = list(zip(left.values.tolist(), right.values.tolist()))
+    return calculate_pair_scores(pairs, weights=NAME_PART_WEIGHTS if weighted else None, compat=legacy)
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+@st.cache_data(show_spinner=False)
+def confidence_histogram(scores):
+    """(labels, % of pairs, pair counts, colors) per confidence level, best first"""
+    counts = dict.fromkeys((label for _, label, _ in CONFIDENCE_LEVELS), 0)
+    for score in scores:
+        counts[get_confidence_level(score)[0]] += 1
+    total = max(len(scores), 1)
+    return ([label for _, label, _ in CONFIDENCE_LEVELS],
+            [round(100 * counts[label] / total, 1) for _, label, _ in CONFIDENCE_LEVELS],
+            [counts[label] for _, label, _ in CONFIDENCE_LEVELS],
+            [color for _, _, color in CONFIDENCE_LEVELS])
+
+def _default_columns(columns, prefix, position):
+    """name1_first/_middle/_last, else name1, else the position-th column"""
+    parts = [f"{prefix}_{p}" for p in ("first", "middle", "last")]
+    if all(c in columns for c in parts):
+        return parts
+    if prefix in columns:
+        return [prefix]
+    return columns[position:position + 1]
+
 # Header
 st.title("🔍 Name Match API")
 st.markdown("**Compare two names and calculate their similarity score**")
 st.markdown("---")
 
-# Create two columns for the input forms
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("📋 Name 1")
-    name1_first = st.text_input("First Name", key="name1_first", placeholder="Enter first name")
-    name1_middle = st.text_input("Middle Name", key="name1_middle", placeholder="Enter middle name")
-    name1_last = st.text_input("Last Name", key="name1_last", placeholder="Enter last name")
-
-with col2:
-    st.subheader("📋 Name 2")
-    name2_first = st.text_input("First Name", key="name2_first", placeholder="Enter first name")
-    name2_middle = st.text_input("Middle Name", key="name2_middle", placeholder="Enter middle name")
-    name2_last = st.text_input("Last Name", key="name2_last", placeholder="Enter last name")
-
-# Submit button
-if st.button("🔄 Calculate Match Score"):
-    # Validate inputs
-    name1_parts = [name1_first, name1_middle, name1_last]
-    name2_parts = [name2_first, name2_middle, name2_last]
-    
-    if not any(name1_parts) or not any(name2_parts):
-        st.error("⚠️ Please enter at least one name field for both Name 1 and Name 2")
-    else:
-        # Calculate score
-        score = calculate_match_score(name1_parts, name2_parts)
-        
-        # Display full names being compared
-        full_name1 = " ".join(filter(None, name1_parts))
-        full_name2 = " ".join(filter(None, name2_parts))
-        
-        st.markdown("---")
-        st.markdown("### 📊 Comparison Results")
-        
-        # Show names being compared
-        comp_col1, comp_col2 = st.columns(2)
-        with comp_col1:
-            st.info(f"**Name 1:** {full_name1}")
-        with comp_col2:
-            st.info(f"**Name 2:** {full_name2}")
-        
-        # Display gauge chart
-        fig = create_gauge_chart(score)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Additional insights
-        confidence, color = get_confidence_level(score)
-        
-        if score >= 90:
-            st.success("✅ The names are nearly identical or very similar.")
-        elif score >= 75:
-            st.success("✓ The names show strong similarity.")
-        elif score >= 60:
-            st.warning("⚠️ The names have moderate similarity.")
-        elif score >= 40:
-            st.warning("⚠️ The names have low similarity.")
+# Scoring options (shared by both tabs)
+weighted = st.checkbox("Weight first / middle / last name (last name counts most)", value=False)
+legacy = st.checkbox("Legacy difflib scores", value=False,
+                     help="Reproduce the scores of the original difflib-based matcher")
+
+tab_single, tab_batch = st.tabs(["👥 Single pair", "📁 Batch CSV"])
+
+with tab_single:
+    # Create two columns for the input forms
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("📋 Name 1")
+        name1_first = st.text_input("First Name", key="name1_first", placeholder="Enter first name")
+        name1_middle = st.text_input("Middle Name", key="name1_middle", placeholder="Enter middle name")
+        name1_last = st.text_input("Last Name", key="name1_last", placeholder="Enter last name")
+
+    with col2:
+        st.subheader("📋 Name 2")
+        name2_first = st.text_input("First Name", key="name2_first", placeholder="Enter first name")
+        name2_middle = st.text_input("Middle Name", key="name2_middle", placeholder="Enter middle name")
+        name2_last = st.text_input("Last Name", key="name2_last", placeholder="Enter last name")
+
+    # Submit button
+    if st.button("🔄 Calculate Match Score"):
+        # Validate inputs
+        name1_parts = [name1_first, name1_middle, name1_last]
+        name2_parts = [name2_first, name2_middle, name2_last]
+
+        if not any(name1_parts) or not any(name2_parts):
+            st.error("⚠️ Please enter at least one name field for both Name 1 and Name 2")
         else:
-            st.error("❌ The names are significantly different.")
+            # Calculate score
+            score = score_pair(tuple(name1_parts), tuple(name2_parts), weighted, legacy)
+
+            # Display full names being compared
+            full_name1 = " ".join(filter(None, name1_parts))
+            full_name2 = " ".join(filter(None, name2_parts))
+
+            st.markdown("---")
+            st.markdown("### 📊 Comparison Results")
+
+            # Show names being compared
+            comp_col1, comp_col2 = st.columns(2)
+            with comp_col1:
+                st.info(f"**Name 1:** {full_name1}")
+            with comp_col2:
+                st.info(f"**Name 2:** {full_name2}")
+
+            # Display gauge chart
+            fig = create_gauge_chart(score)
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Additional insights
+            if score >= 90:
+                st.success("✅ The names are nearly identical or very similar.")
+            elif score >= 75:
+                st.success("✓ The names show strong similarity.")
+            elif score >= 60:
+                st.warning("⚠️ The names have moderate similarity.")
+            elif score >= 40:
+                st.warning("⚠️ The names have low similarity.")
+            else:
+                st.error("❌ The names are significantly different.")
+
+with tab_batch:
+    st.markdown("Upload a CSV with one name pair per row: either `name1`/`name2` columns or "
+                "`name1_first`, `name1_middle`, `name1_last` and the same for `name2`.")
+    uploaded = st.file_uploader("CSV of name pairs", type=["csv"])
+
+    if uploaded is not None:
+        data = uploaded.getvalue()
+        pairs_df = read_pairs(data)
+        columns = list(pairs_df.columns)
+        cols1 = st.multiselect("Name 1 columns (first, middle, last order)", columns,
+                               default=_default_columns(columns, "name1", 0), max_selections=3)
+        cols2 = st.multiselect("Name 2 columns (first, middle, last order)", columns,
+                               default=_default_columns(columns, "name2", 1), max_selections=3)
+        # part weights only line up when both sides are split into first / middle / last
+        use_weights = weighted and len(cols1) == 3 and len(cols2) == 3
+        if weighted and not use_weights:
+            st.caption("Part weighting needs three columns per name; scoring the joined names instead.")
+
+        batch_key = (uploaded.file_id, tuple(cols1), tuple(cols2), use_weights, legacy)
+        if st.button("🔄 Score File", disabled=not cols1 or not cols2):
+            n = len(pairs_df)
+            progress = st.progress(0.0, text=f"Scoring {n:,} pairs…")
+            scores = []
+            for start in range(0, n, CHUNK_SIZE):
+                chunk = pairs_df.iloc[start:start + CHUNK_SIZE]
+                scores.extend(score_chunk(chunk[cols1], chunk[cols2], use_weights, legacy))
+                done = min(start + CHUNK_SIZE, n)
+                progress.progress(done / n, text=f"Scored {done:,} / {n:,} pairs")
+            progress.empty()
+            result = pairs_df.copy()
+            result["score"] = scores
+            result["confidence"] = [get_confidence_level(s)[0] for s in scores]
+            st.session_state["batch"] = (batch_key, result)
+
+        batch = st.session_state.get("batch")
+        if batch is not None and batch[0] == batch_key:
+            result = batch[1]
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Pairs", f"{len(result):,}")
+            m2.metric("Mean score", f"{result['score'].mean():.1f}" if len(result) else "–")
+            m3.metric("Good or better", f"{(result['score'] >= 75).mean():.0%}" if len(result) else "–")
+            st.dataframe(result.head(PREVIEW_ROWS), use_container_width=True)
+            st.download_button("⬇️ Download Results", to_csv_bytes(result), file_name="name_match_scores.csv",
+                               mime="text/csv")
 
 # Footer
 st.markdown("---")
 st.markdown("""
     <div style='text-align: center; color: #666; font-size: 14px;'>
-        <p>Powered by Python's difflib SequenceMatcher Algorithm</p>
+        <p>Powered by the Levenshtein (Indel) ratio, via rapidfuzz</p>
     </div>
 """, unsafe_allow_html=True)
 
 
 ########################################## bar chart ############################################
-import plotly.graph_objects as go
-# Create the bar chart with Plotly
-fig = go.Figure()
-
-fig.add_trace(go.Bar(
-    x=y,
-    y=x,
-    text=x,
-    textposition='outside',
-    texttemplate='%{text}%',
-    marker=dict(
-        color=x,
-        colorscale='Viridis',
-        showscale=False,
-        line=dict(color='rgba(255,255,255,0.8)', width=2)
-    ),
-    hovertemplate='<b>%{x}</b><br>Confidence: %{y}%<extra></extra>'
-))
-
-# Update layout for aesthetics
-fig.update_layout(
-    title=dict(
-        text='Confidence Distribution',
-        font=dict(size=20, color='#2c3e50')
-    ),
-    xaxis=dict(
-        title='Categories',
-        titlefont=dict(size=14, color='#34495e'),
-        tickfont=dict(size=12),
-        showgrid=False
-    ),
-    yaxis=dict(
-        title='Confidence Score (%)',
-        titlefont=dict(size=14, color='#34495e'),
-        tickfont=dict(size=12),
-        range=[0, 100],
-        showgrid=True,
-        gridcolor='rgba(200,200,200,0.3)'
-    ),
-    plot_bgcolor='rgba(240,242,245,0.5)',
-    paper_bgcolor='white',
-    height=500,
-    margin=dict(t=80, b=60, l=60, r=40),
-    hovermode='x'
-)
-
-# Display the chart
-st.plotly_chart(fig, use_container_width=True)
+# Confidence distribution of the last scored batch: share of pairs per level
+batch = st.session_state.get("batch")
+if batch is None or not len(batch[1]):
+    st.caption("Score a CSV in the Batch tab to see the confidence distribution.")
+else:
+    x, y, counts, colors = confidence_histogram(tuple(batch[1]["score"]))
+
+    # Create the bar chart with Plotly
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=x,
+        y=y,
+        text=y,
+        customdata=counts,
+        textposition='outside',
+        texttemplate='%{text}%',
+        marker=dict(
+            color=colors,
+            line=dict(color='rgba(255,255,255,0.8)', width=2)
+        ),
+        hovertemplate='<b>%{x}</b><br>%{y}% of pairs (%{customdata:,})<extra></extra>'
+    ))
+
+    # Update layout for aesthetics
+    fig.update_layout(
+        title=dict(
+            text='Confidence Distribution',
+            font=dict(size=20, color='#2c3e50')
+        ),
+        xaxis=dict(
+            title=dict(text='Confidence Level', font=dict(size=14, color='#34495e')),
+            tickfont=dict(size=12),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title=dict(text='Share of Pairs (%)', font=dict(size=14, color='#34495e')),
+            tickfont=dict(size=12),
+            range=[0, 110],
+            showgrid=True,
+            gridcolor='rgba(200,200,200,0.3)'
+        ),
+        plot_bgcolor='rgba(240,242,245,0.5)',
+        paper_bgcolor='white',
+        height=500,
+        margin=dict(t=80, b=60, l=60, r=40),
+        hovermode='x'
+    )
+
+    # Display the chart
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,202 @@
+"""
+Local HTTP stand-ins for the search backends, for offline loading and
+client benchmarks.
+
+    python stub_servers.py --port 8108             # Typesense-compatible API
+
+TypesenseStub serves the subset of the Typesense REST API the repo uses
+(collections, documents, documents/import, documents/search) on top of the
+in-process collections of typesense_local, over keep-alive HTTP/1.1.
+latency adds a fixed delay per request (a stand-in for network + server
+time); slow_rate makes that fraction of requests take slow_latency instead
+(a latency tail, for timeout and fan-out tests); fail_rate rejects that
+fraction of imported documents with a retryable 503, to exercise the
+loader's retry path.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from typesense_local import LocalClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"            # keep-alive, so pooled clients reuse sockets
+    disable_nagle_algorithm = True           # headers and body go out as separate writes
+
+    def log_message(self, format, *args):    # quiet
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def _dispatch(self, method):
+        stub = self.server.stub
+        stub.requests += 1
+        delay = stub.delay()
+        if delay:
+            time.sleep(delay)
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = dict(parse_qsl(url.query))
+        try:
+            status, body = stub.handle(method, parts, params, self._body() if method in ("POST", "PUT", "PATCH") else b"")
+        except KeyError as exc:
+            status, body = 404, {"message": str(exc).strip("'\"")}
+        except ValueError as exc:
+            status, body = 400, {"message": str(exc)}
+        self._send(status, body, "text/plain" if isinstance(body, str) else "application/json")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128                 # the default 5 drops SYNs under fan-out
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return                           # client hung up (e.g. its deadline passed)
+        super().handle_error(request, client_address)
+
+
+class TypesenseStub:
+    """
+    Typesense-compatible HTTP server on a background thread:
+
+        with TypesenseStub() as stub:
+            client = typesense.Client({"nodes": [{"host": stub.host, "port": stub.port, "protocol": "http"}], ...})
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, seed=0,
+                 slow_rate=0.0, slow_latency=0.0):
+        self.local = LocalClient()
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()        # the embedded collections are not thread-safe
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def delay(self):
+        """Seconds to hold the next request."""
+        if self.slow_rate and self._rng.random() < self.slow_rate:
+            return self.slow_latency
+        return self.latency
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, method, parts, params, body):
+        """Route one request; returns (status, JSON-able body or JSONL str)."""
+        collections = self.local.collections
+        if parts == ["health"]:
+            return 200, {"ok": True}
+        if parts[:1] != ["collections"]:
+            return 404, {"message": "Not Found"}
+        if len(parts) == 1 and method == "POST":
+            schema = json.loads(body)
+            with self._lock:
+                if schema["name"] in collections:
+                    return 409, {"message": f"A collection with name `{schema['name']}` already exists."}
+                return 201, collections.create(schema)
+        name = parts[1]
+        with self._lock:
+            col = collections[name]
+        if len(parts) == 2:
+            if method == "DELETE":
+                with self._lock:
+                    del collections[name]
+            return 200, {"name": name, "num_documents": len(col.docs)}
+        if parts[2:] == ["documents"] and method == "POST":
+            try:
+                with self._lock:
+                    col.add(json.loads(body), action=params.get("action", "create"))
+            except KeyError as exc:              # the id exists: a conflict, not a missing resource
+                return 409, {"message": str(exc).strip("'\"")}
+            return 201, json.loads(body)
+        if parts[2:] == ["documents", "import"]:
+            return 200, self._import(col, body.decode("utf-8"), params.get("action", "create"))
+        if parts[2:] == ["documents", "search"]:
+            with self._lock:
+                return 200, col.search(params)
+        return 404, {"message": "Not Found"}
+
+    def _import(self, col, jsonl, action):
+        lines = [line for line in jsonl.split("\n") if line.strip()]
+        results = [None] * len(lines)
+        accepted = []
+        for i, line in enumerate(lines):
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                results[i] = {"success": False, "error": "Service Unavailable", "code": 503, "document": line}
+            else:
+                accepted.append(i)
+        with self._lock:
+            out = col.documents.import_([lines[i] for i in accepted], {"action": action})
+        for i, r in zip(accepted, out):
+            results[i] = r
+        return "\n".join(json.dumps(r) for r in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Typesense-compatible stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8108)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of imported docs rejected with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="seconds a slow request takes")
+    args = parser.parse_args()
+
+    stub = TypesenseStub(args.host, args.port, args.latency, args.fail_rate,
+                         slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    print(f"Typesense stub on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
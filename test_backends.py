@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from backends import BackendError, DeadlineExceeded, TypesenseBackend
+from stub_servers import TypesenseStub
+
+QUERY = {"q": "sensor", "query_by": "name"}
+
+
+@pytest.fixture
+def stub():
+    with TypesenseStub() as stub:
+        stub.local.collections.create({"name": "items", "fields": [{"name": "name", "type": "string"}]})
+        stub.local.collections["items"].add({"id": "1", "name": "sensor"})
+        yield stub
+
+
+@pytest.fixture
+def backend(stub, request):
+    backend = TypesenseBackend(f"test-{request.node.name}", stub.url, retries=2, backoff=0.001)
+    yield backend
+    backend.close()
+
+
+def _fail_next(stub, *statuses):
+    """Answer the next requests with statuses, then route normally."""
+    queue, handle = list(statuses), stub.handle
+
+    def handle_or_fail(method, parts, params, body):
+        if queue:
+            return queue.pop(0), {"message": "busy"}
+        return handle(method, parts, params, body)
+
+    stub.handle = handle_or_fail
+
+
+def _documents(backend):
+    return backend.collections["items"].documents
+
+
+def test_keep_alive_connections_are_reused(stub, backend):
+    for _ in range(5):
+        assert _documents(backend).search(QUERY)["found"] == 1
+    assert len(backend._idle) == 1
+    assert backend.histogram.snapshot()["count"] == 5
+
+
+def test_idempotent_requests_retry_transient_statuses(stub, backend):
+    _fail_next(stub, 503, 429)
+    assert _documents(backend).search(QUERY)["found"] == 1
+    assert stub.requests == 3
+
+    _fail_next(stub, 503, 503, 503)
+    with pytest.raises(BackendError) as exc:
+        _documents(backend).search(QUERY)
+    assert exc.value.status == 503 and backend.histogram.snapshot()["errors"] == 1
+
+
+def test_non_idempotent_requests_are_not_retried(stub, backend):
+    _fail_next(stub, 503)
+    with pytest.raises(BackendError):
+        _documents(backend).create({"id": "2", "name": "pump"})
+    assert stub.requests == 1
+    _fail_next(stub, 503)
+    _documents(backend).upsert({"id": "2", "name": "pump"})      # upserts are safe to resend
+    assert stub.requests == 3
+
+
+def test_client_errors_are_not_retried(stub, backend):
+    with pytest.raises(BackendError) as exc:
+        backend.collections["missing"].retrieve()
+    assert exc.value.status == 404 and stub.requests == 1
+
+
+def test_deadline_bounds_slow_requests_and_retries(stub, backend):
+    stub.latency = 0.3
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        _documents(backend).search(QUERY, timeout=0.1)
+    assert time.perf_counter() - start < 0.25
+    stub.latency = 0.0
+    assert _documents(backend).search(QUERY, timeout=0.5)["found"] == 1   # the timed-out socket was dropped
+
+
+def test_deadline_while_waiting_for_a_connection(stub):
+    backend = TypesenseBackend("test-pool-wait", stub.url, pool_size=1)
+    backend._slots.acquire()                     # the only connection is busy
+    try:
+        with pytest.raises(DeadlineExceeded, match="no free connection"):
+            _documents(backend).search(QUERY, timeout=0.05)
+    finally:
+        backend._slots.release()
+        backend.close()
+
+
+def test_async_requests_retry_and_time_out(stub, backend):
+    async def run():
+        _fail_next(stub, 502)
+        found = await asyncio.gather(*(_documents(backend).asearch(QUERY) for _ in range(4)))
+        stub.latency = 0.3
+        with pytest.raises(DeadlineExceeded):
+            await _documents(backend).asearch(QUERY, timeout=0.1)
+        stub.latency = 0.0
+        backend.close()                          # on the loop that owns the async pool
+        return found
+
+    assert [r["found"] for r in asyncio.run(run())] == [1] * 4
+    assert stub.requests == 6
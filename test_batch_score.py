@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+import pytest
+
+from batch_score import main, read_pairs, score_pairs, write_scores
+from search_match import name_similarity
+
+PAIRS = [(f"john smith {i}", f"jon smyth {i % 7}") for i in range(60)] + [("", "x"), ("a b", "")]
+
+
+def _chunks(sizes):
+    out, i = [], 0
+    for n in sizes:
+        out.append(PAIRS[i:i + n])
+        i += n
+    return out
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 3, None])
+def test_results_come_back_in_input_order(max_in_flight):
+    # uneven chunks finish out of order across workers
+    chunks = _chunks([40, 1, 10, 2, 9])
+    stats = {}
+    results = list(score_pairs(iter(chunks), workers=2, max_in_flight=max_in_flight, stats=stats))
+    assert [pairs for pairs, _ in results] == chunks
+    assert [s for _, scores in results for s in scores] == [name_similarity(a, b) for a, b in PAIRS]
+    assert sum(n for n, _ in stats.values()) == len(PAIRS)
+
+
+def test_unknown_scorer():
+    with pytest.raises(ValueError, match="unknown scorer"):
+        list(score_pairs([PAIRS], scorer="nope"))
+
+
+def test_read_pairs_chunks_csv_and_jsonl(tmp_path):
+    with open(tmp_path / "pairs.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["a", "b"])
+        writer.writerows(PAIRS)
+    with open(tmp_path / "pairs.jsonl", "w", encoding="utf-8") as f:
+        for a, b in PAIRS:
+            f.write(json.dumps({"a": a, "b": b or None}) + "\n")
+    for name in ("pairs.csv", "pairs.jsonl"):
+        chunks = list(read_pairs(str(tmp_path / name), "a", "b", chunk_size=25))
+        assert [len(c) for c in chunks] == [25, 25, 12]
+        assert [p for c in chunks for p in c] == PAIRS
+
+
+def test_write_scores_formats():
+    results = [(PAIRS[:2], [1, 2]), (PAIRS[2:3], [3])]
+    out = io.StringIO()
+    assert write_scores(results, out, "jsonl") == 3
+    assert [json.loads(line)["score"] for line in out.getvalue().splitlines()] == [1, 2, 3]
+    out = io.StringIO()
+    write_scores(results, out)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ["name1", "name2", "score"]
+    assert rows[1:] == [[a, b, str(s)] for (a, b), s in zip(PAIRS[:3], [1, 2, 3])]
+
+
+def test_main_writes_scores_in_input_order(tmp_path):
+    with open(tmp_path / "pairs.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name1", "name2"])
+        writer.writerows(PAIRS)
+    main([str(tmp_path / "pairs.csv"), "-o", str(tmp_path / "scores.jsonl"),
+          "--workers", "2", "--chunk-size", "7"])
+    with open(tmp_path / "scores.jsonl", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [(r["name1"], r["name2"]) for r in rows] == PAIRS
+    assert [r["score"] for r in rows] == [name_similarity(a, b) for a, b in PAIRS]
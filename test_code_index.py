@@ -0,0 +1,52 @@
+import pytest
+
+from code_index import CodeIndex, analyze_identifier, compact
+
+QUERIES = ["17FU4", "17F", "X1J0", "847VD", "53rvr-pui", "PTG4", "u4iw", "zz", "1", ""]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CodeIndex.from_csv("sample.csv")
+
+
+def _scan(index, query, test):
+    q = compact(query)
+    if not q:
+        return []
+    return sorted(i for i, values in enumerate(index._values) if any(test(v, q) for v in values.values()))
+
+
+def test_analyzers():
+    assert compact("X89_74-UX") == "x8974ux"
+    assert analyze_identifier("x89_74_ux_uix code") == ["x", "89", "74", "ux", "uix", "code", "x8974uxuix"]
+    assert analyze_identifier("") == [] and analyze_identifier(None) == []
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_prefix_matches_a_linear_scan(index, query):
+    assert sorted(index.prefix(query, limit=None)) == _scan(index, query, str.startswith)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_contains_matches_a_linear_scan(index, query):
+    test = str.__contains__ if len(compact(query)) >= 3 else str.startswith
+    assert sorted(index.contains(query, limit=None)) == _scan(index, query, test)
+
+
+def test_field_restriction_and_long_prefixes():
+    index = CodeIndex(max_prefix=4)
+    index.add({"MPN": "AB-1234-XYZ", "ProductName": "pump", "Brand": "ab"})
+    index.add({"MPN": "AB-1299", "ProductName": "ab12 valve", "Brand": "cd"})
+    assert index.prefix("ab-1234-x") == [0]                    # past max_prefix, verified
+    assert index.prefix("ab12", fields=["ProductName"]) == [1]
+    assert index.contains("234x") == [0]
+    assert index.contains("234x", fields=["Brand"]) == []
+
+
+def test_exact_and_shorter_values_rank_first():
+    index = CodeIndex(fields=["MPN"])
+    for mpn in ["ab123456", "ab12", "xab12", "ab1234"]:
+        index.add({"MPN": mpn})
+    assert index.contains("ab12") == [1, 2, 3, 0]
+    assert index.prefix("ab12", limit=2) == [1, 3]
@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+import pytest
+
+from hybrid_search import BM25Stage, FuzzyStage, HybridSearch, TypesenseStage
+from milvus_bm25 import BM25Index
+from typesense_local import EmbeddedCollection
+
+
+class Fixed:
+    """Retriever with canned (id, text, score) candidates."""
+
+    name = "fixed"
+
+    def __init__(self, scores):
+        self.candidates = [(i, f"doc{i}", s) for i, s in enumerate(scores)]
+
+    def retrieve(self, query, k):
+        return self.candidates[:k]
+
+    def normalize(self, scores):
+        return np.asarray(scores, dtype=np.float64) / 10
+
+
+class Lookup:
+    """Reranker scoring docN from a table, optionally slowly; records what it scored."""
+
+    name = "lookup"
+
+    def __init__(self, table, delay=0.0):
+        self.table = table
+        self.delay = delay
+        self.seen = []
+
+    def score(self, query, texts):
+        time.sleep(self.delay)
+        self.seen.extend(texts)
+        return [self.table[int(t[3:])] for t in texts]
+
+    def normalize(self, scores):
+        return np.asarray(scores, dtype=np.float64)
+
+
+RETRIEVED = [9, 8, 7, 6, 5]
+RERANKED = [0.0, 0.1, 1.0, 0.2, 0.9]
+
+
+def test_weighted_fusion():
+    pipeline = HybridSearch(Fixed(RETRIEVED), [Lookup(RERANKED)], weights={"lookup": 2.0})
+    result = pipeline.search("q", top_k=5)
+    expected = [r / 10 + 2.0 * s for r, s in zip(RETRIEVED, RERANKED)]
+    assert [h["id"] for h in result["hits"]] == sorted(range(5), key=lambda i: -expected[i])
+    assert [h["score"] for h in result["hits"]] == pytest.approx(sorted(expected, reverse=True))
+    assert result["hits"][0]["scores"] == {"fixed": 7, "lookup": 1.0}
+    assert result["depth"] == {"fixed": 5, "lookup": 5} and not result["truncated"]
+
+
+def test_rrf_fusion():
+    pipeline = HybridSearch(Fixed(RETRIEVED), [Lookup(RERANKED)], fusion="rrf", rrf_k=10)
+    result = pipeline.search("q", top_k=5)
+    ranks = {2: 1, 4: 2, 3: 3, 1: 4, 0: 5}                  # by the reranker
+    expected = {i: 1 / (10 + i + 1) + 1 / (10 + ranks[i]) for i in range(5)}
+    assert [h["id"] for h in result["hits"]] == sorted(expected, key=lambda i: -expected[i])
+    assert [h["score"] for h in result["hits"]] == pytest.approx(sorted(expected.values(), reverse=True))
+    with pytest.raises(ValueError):
+        HybridSearch(Fixed(RETRIEVED), fusion="max")
+
+
+def test_budget_reranks_the_best_prefix_only():
+    scores = list(range(40, 0, -1))
+    slow = Lookup([1.0] * 40, delay=0.02)
+    pipeline = HybridSearch(Fixed(scores), [slow], k=40, chunk=4, budget_ms=50)
+    result = pipeline.search("q", top_k=40)
+    depth = result["depth"]["lookup"]
+    assert 0 < depth < 40 and depth % 4 == 0 and result["truncated"]
+    assert slow.seen == [f"doc{i}" for i in range(depth)]          # best candidates first
+    # candidates the reranker did not reach keep their order, below the reranked ones
+    assert [h["id"] for h in result["hits"][depth:]] == list(range(depth, 40))
+    assert all(h["score"] is None for h in result["hits"][depth:])
+
+
+def test_exhausted_budget_skips_the_stage():
+    pipeline = HybridSearch(Fixed(RETRIEVED), [Lookup(RERANKED)])
+    result = pipeline.search("q", top_k=3, budget_ms=0)
+    assert result["depth"]["lookup"] == 0 and result["truncated"]
+    assert [h["id"] for h in result["hits"]] == [0, 1, 2]
+    assert [h["scores"] for h in result["hits"]] == [{"fixed": 9}, {"fixed": 8}, {"fixed": 7}]
+
+
+def test_bm25_and_fuzzy_find_a_misspelled_name():
+    names = ["acme pressure sensor x89", "acme pressure switch x98", "brass valve 12", "steel valve 21"]
+    index = BM25Index().fit(names)
+    pipeline = HybridSearch(BM25Stage(index), [FuzzyStage()], k=4)
+    hits = pipeline.search("acme presure sensor x89", top_k=2)["hits"]
+    assert hits[0]["text"] == names[0] and hits[0]["scores"]["fuzzy"] > hits[1]["scores"]["fuzzy"]
+
+
+def test_typesense_stage_over_the_embedded_collection():
+    col = EmbeddedCollection("items", ["name", "brand"])
+    col.add({"id": "a", "name": "brass valve", "brand": "acme"})
+    col.add({"id": "b", "name": "steel valve", "brand": "bolt"})
+    stage = TypesenseStage(col, "name,brand", params={"num_typos": 0})
+    assert [(i, text) for i, text, _ in stage.retrieve("valve acme", 5)] == [("a", "brass valve acme")]
@@ -0,0 +1,64 @@
+import csv
+import json
+
+import pytest
+
+import link_records
+from link_records import iter_csv, main
+
+COLUMNS = ["ProductName", "Brand", "MPN"]
+
+
+@pytest.fixture
+def files(tmp_path):
+    with open("sample.csv", newline="", encoding="utf-8") as f:
+        rows = [{c: row[c] for c in COLUMNS} for row in csv.DictReader(f)]
+    right, left = tmp_path / "right.csv", tmp_path / "left.csv"
+    for path, data in ((right, rows), (left, rows[:25])):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            writer.writerows(data)
+    # a quoted field spanning lines must not break the byte offsets
+    with open(left, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(["multi\nline " + rows[30]["ProductName"], rows[30]["Brand"], rows[30]["MPN"]])
+    return str(left), str(right), tmp_path
+
+
+def test_iter_csv_resumes_from_any_offset(files):
+    left, _, _ = files
+    records = list(iter_csv(left))
+    assert len(records) == 26 and records[-1][0]["ProductName"].startswith("multi\nline ")
+    for i, (_, offset) in enumerate(records):
+        assert [row for row, _ in iter_csv(left, offset)] == [row for row, _ in records[i + 1:]]
+
+
+@pytest.mark.parametrize("ext", ["csv", "jsonl"])
+def test_resume_after_a_crash_matches_a_clean_run(files, monkeypatch, ext):
+    left, right, tmp_path = files
+    clean, resumed = str(tmp_path / f"clean.{ext}"), str(tmp_path / f"resumed.{ext}")
+    main([left, right, "-o", clean])
+    with open(clean, encoding="utf-8") as f:
+        expected = f.read()
+
+    real_link = link_records.link
+
+    def crashing_link(*args, **kwargs):
+        for n, item in enumerate(real_link(*args, **kwargs)):
+            if n == 11:
+                raise KeyboardInterrupt
+            yield item
+
+    monkeypatch.setattr(link_records, "link", crashing_link)
+    with pytest.raises(KeyboardInterrupt):
+        main([left, right, "-o", resumed, "--checkpoint-every", "5"])
+    with open(resumed + ".offset", encoding="utf-8") as f:
+        assert json.load(f)["rows"] == 10
+    monkeypatch.setattr(link_records, "link", real_link)
+
+    main([left, right, "-o", resumed, "--checkpoint-every", "5", "--resume"])
+    with open(resumed, encoding="utf-8") as f:
+        assert f.read() == expected
+    with open(clean, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if ext == "csv" else map(json.loads, f)
+        assert {int(row["left_row"]) for row in rows} == set(range(26))
@@ -0,0 +1,183 @@
+import math
+import random
+import threading
+import time
+
+import pytest
+
+import milvus_bm25
+from milvus_bm25 import BM25Index, analyze
+
+
+def _docs(start, n):
+    return [f"doc{i} shared words {'even' if i % 2 else 'odd'}" for i in range(start, start + n)]
+
+
+def _found(index, i):
+    return [doc_id for doc_id, _ in index.search(f"doc{i}", top_k=3)]
+
+
+CORPUS = milvus_bm25.documents + [
+    "the fox and the dog are friends",
+    "a single brown dog",
+    "gold is gold and the question is gold",
+]
+
+
+def _okapi(docs, query, k1=1.5, b=0.75):
+    """Textbook BM25 over docs, with the same idf as BM25Index: {doc id: score} for docs sharing a term."""
+    terms = [analyze(d) for d in docs]
+    avgdl = sum(map(len, terms)) / len(terms)
+    scores = {}
+    for q in analyze(query):
+        df = sum(q in t for t in terms)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i, t in enumerate(terms):
+            tf = t.count(q)
+            if tf:
+                norm = k1 * (1 - b + b * len(t) / avgdl)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+QUERIES = ["brown dog", "the the question", "gold", "fox miles step", "nothing matches", "will way"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_scores_match_textbook_bm25(query):
+    index = BM25Index().fit(CORPUS)
+    expected = _okapi(CORPUS, query)
+    found = dict(index.search(query, top_k=len(CORPUS)))
+    assert found.keys() == expected.keys()
+    for doc_id, score in expected.items():
+        assert found[doc_id] == pytest.approx(score)
+    best = index.search(query, top_k=2)
+    assert [s for _, s in best] == pytest.approx(sorted(expected.values(), reverse=True)[:2])
+
+
+def test_search_many_equals_search():
+    index = BM25Index().fit(CORPUS)
+    queries = QUERIES + QUERIES[:2]
+    assert index.search_many(queries, top_k=3) == [index.search(q, top_k=3) for q in queries]
+
+
+def test_max_query_terms_keeps_the_rarest():
+    index = BM25Index().fit(CORPUS)
+    # "the" is common, "glitters" appears once
+    assert index.search("the glitters", top_k=5, max_query_terms=1) == index.search("glitters", top_k=5)
+    assert index.search("the", min_idf=10.0) == []
+
+
+def test_merge_during_background_merge_keeps_new_segments(monkeypatch):
+    index = BM25Index(max_segments=100)
+    for start in range(0, 30, 10):
+        index.add_documents(_docs(start, 10))
+
+    # the first merge is slow to build its segment; a second merge and a new
+    # segment land while it runs
+    segment, armed = milvus_bm25._Segment, [True]
+
+    def slow_segment(postings):
+        if armed[0]:
+            armed[0] = False
+            time.sleep(0.2)
+        return segment(postings)
+
+    monkeypatch.setattr(milvus_bm25, "_Segment", slow_segment)
+    first = threading.Thread(target=index.merge)
+    first.start()
+    time.sleep(0.05)
+    index.add_documents(_docs(30, 10))
+    index.merge()
+    first.join()
+
+    assert index.segments == 1
+    for i in range(40):
+        assert _found(index, i) == [i]
+
+
+def test_delete_ignores_negative_and_unknown_ids():
+    index = BM25Index().fit(_docs(0, 5))
+    index.delete([-1, -5, 5, 99])
+    assert len(index) == 5
+    assert _found(index, 4) == [4]
+    index.delete([4])
+    assert len(index) == 4 and _found(index, 4) == []
+
+
+@pytest.mark.parametrize("max_segments", [1, 3, 100])
+def test_incremental_updates_match_a_fresh_fit(max_segments):
+    rng = random.Random(12)
+    words = ["pump", "valve", "seal", "motor", "gear", "shaft", "x89", "ux", "brass", "steel"]
+    docs = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 8))) for _ in range(120)]
+
+    index = BM25Index(max_segments=max_segments)
+    live = {}
+    for start in range(0, len(docs), 15):
+        for doc_id, doc in zip(index.add_documents(docs[start:start + 15]), docs[start:start + 15]):
+            live[doc_id] = doc
+        dead = rng.sample(sorted(live), 4)
+        index.delete(dead)
+        for doc_id in dead:
+            del live[doc_id]
+        if start % 45 == 0:
+            index.merge()
+    if index._merger is not None:
+        index._merger.join()
+
+    ids = sorted(live)
+    fresh = BM25Index().fit([live[i] for i in ids])
+    assert len(index) == len(fresh) == len(ids)
+    for query in ["pump", "seal motor", "x89 ux brass", "steel steel gear", "missing"]:
+        got = dict(index.search(query, top_k=len(docs)))
+        want = {ids[i]: score for i, score in fresh.search(query, top_k=len(docs))}
+        assert got.keys() == want.keys()
+        for doc_id, score in want.items():
+            assert got[doc_id] == pytest.approx(score)
+
+
+@pytest.fixture
+def module_index(monkeypatch):
+    index = BM25Index(analyzer=milvus_bm25.analyze_identifier).fit(milvus_bm25.documents)
+    monkeypatch.setattr(milvus_bm25, "index", index)
+    monkeypatch.setattr(milvus_bm25, "_cache", milvus_bm25.QueryCache(maxsize=4))
+    return index
+
+
+def test_query_cache_hits_and_shares_reordered_queries(module_index):
+    first = milvus_bm25.bm25_search("brown fox", top_k=2)
+    assert first[0][0] == milvus_bm25.documents[0]
+    assert milvus_bm25.bm25_search("Fox  BROWN", top_k=2) == first
+    assert milvus_bm25.cache_info()["hits"] == 1
+    milvus_bm25.bm25_search("brown fox", top_k=3)             # top_k is part of the key
+    assert milvus_bm25.cache_info()["misses"] == 2
+
+
+def test_query_cache_follows_index_version(module_index):
+    assert milvus_bm25.bm25_search("turbine") == []
+    module_index.add_documents(["turbine blade"])
+    (text, score), = milvus_bm25.bm25_search("turbine")
+    assert text == "turbine blade" and score == pytest.approx(module_index.search("turbine")[0][1])
+    module_index.delete([len(module_index.documents) - 1])
+    assert milvus_bm25.bm25_search("turbine") == []
+    # fit() never reuses a version, even when it ends where it started
+    milvus_bm25.bm25_search("gold")
+    version = module_index.version
+    module_index.fit(["gold gold"])
+    assert module_index.version > version
+    assert milvus_bm25.bm25_search("gold")[0][0] == "gold gold"
+
+
+def test_search_many_batches_misses_and_keeps_order(module_index, monkeypatch):
+    queries = ["gold", "x89_74_ux_uix", "gold", "question be", "nothing here"]
+    expected = [milvus_bm25.bm25_search(q, top_k=2) for q in queries]
+    milvus_bm25._cache.clear()
+    calls = []
+    search_many = module_index.search_many
+    monkeypatch.setattr(module_index, "search_many", lambda qs, k: calls.append(qs) or search_many(qs, k))
+    assert milvus_bm25.bm25_search_many(queries, top_k=2) == expected
+    assert calls == [["gold", "x89_74_ux_uix", "question be", "nothing here"]]
+    assert milvus_bm25.bm25_search_many(queries, top_k=2) == expected
+    assert len(calls) == 1                                  # all four distinct queries were cached
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+import pytest
+
+from milvus_bm25 import LocalCollection, ingest, iter_documents
+
+HashingVectorizer = pytest.importorskip("sklearn.feature_extraction.text").HashingVectorizer
+
+DOCS = [f"document {i} about {'pumps' if i % 3 else 'valves'} model x{i}" for i in range(230)]
+
+
+@pytest.fixture
+def vectorizer():
+    return HashingVectorizer(n_features=256, alternate_sign=False)
+
+
+def test_ingest_batches_and_ids(vectorizer):
+    collection = LocalCollection()
+    stats = ingest(collection, iter(DOCS), vectorizer, start_id=1000, chunk_size=100, batch_size=30)
+    assert stats["docs"] == len(DOCS)
+    # chunks of 100, 100, 30 -> 4 + 4 + 1 inserts of at most 30 rows
+    assert collection.insert_calls == 9
+    assert collection.num_entities == len(DOCS)
+    assert collection._ids.tolist() == list(range(1000, 1000 + len(DOCS)))
+    assert collection._texts == DOCS
+
+    expected = vectorizer.transform(DOCS[5:6]).toarray().astype(np.float32)
+    hit = collection.search(expected, limit=3)[0][0]
+    assert hit.id == 1005 and hit.distance == 0.0 and hit.entity["text"] == DOCS[5]
+
+
+def test_ingest_appends_after_existing_ids(vectorizer):
+    collection = LocalCollection()
+    ingest(collection, DOCS[:50], vectorizer)
+    ingest(collection, DOCS[50:], vectorizer, start_id=50)
+    assert collection._ids.tolist() == list(range(len(DOCS)))
+
+
+def test_ingest_reads_ahead_at_most_max_in_flight_batches(vectorizer):
+    collection = LocalCollection()
+    insert = collection.insert
+    done, ahead = [0], []
+
+    def slow_insert(data):
+        time.sleep(0.005)
+        insert(data)
+        done[0] += len(data[0])
+
+    def documents():
+        for i, doc in enumerate(DOCS):
+            ahead.append(i - done[0])            # read but not yet inserted
+            yield doc
+
+    collection.insert = slow_insert
+    ingest(collection, documents(), vectorizer, chunk_size=10, batch_size=10, max_in_flight=2)
+    assert collection.num_entities == len(DOCS)
+    # two batches in flight plus the chunk being read
+    assert max(ahead) < 3 * 10
+
+
+def test_iter_documents_skips_blank_lines(tmp_path):
+    path = tmp_path / "docs.txt"
+    path.write_text("first\n\n  second  \n\n", encoding="utf-8")
+    assert list(iter_documents(path)) == ["first", "second"]
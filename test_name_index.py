@@ -0,0 +1,46 @@
+import random
+import string
+
+import pytest
+
+from name_index import NameIndex
+from search_match import match_many
+
+
+def _names(n, seed):
+    rng = random.Random(seed)
+    words = ["john", "jon", "smith", "smyth", "acme", "pump", "valve", "road", "lane"]
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 7)))
+
+    out = []
+    for _ in range(n):
+        parts = [rng.choice(words + [word()]) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.3:
+            parts.insert(rng.randrange(len(parts) + 1), str(rng.randint(1, 30)))
+        out.append(" ".join(parts))
+    return out + ["", "john smith", "smith john", "Jon  SMITH"]
+
+
+NAMES = _names(400, seed=3)
+QUERIES = NAMES[:25] + ["john smth", "acme 12 pump", "x", "", "valve road 7"]
+
+
+@pytest.mark.parametrize("min_score", [40, 70, 90])
+def test_search_equals_brute_force(min_score):
+    index = NameIndex(NAMES)
+    expected = match_many(QUERIES, NAMES, min_score=min_score)
+    assert [index.search(q, min_score) for q in QUERIES] == expected
+    expected = match_many(QUERIES, NAMES, top_k=3, min_score=min_score)
+    assert [index.search(q, min_score, top_k=3) for q in QUERIES] == expected
+
+
+def test_add_after_build_is_searchable():
+    index = NameIndex(NAMES[:200])
+    index.search(QUERIES[0])
+    assert [index.add(name) for name in NAMES[200:]] == list(range(200, len(NAMES)))
+    assert len(index) == len(NAMES)
+    expected = match_many(QUERIES, NAMES, min_score=70)
+    assert [index.search(q, 70) for q in QUERIES] == expected
+    assert index.name(5) == NAMES[5]
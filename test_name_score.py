@@ -0,0 +1,91 @@
+import random
+import string
+from difflib import SequenceMatcher
+
+import pytest
+
+from name_score import NAME_PART_WEIGHTS, calculate_match_score, calculate_match_scores, calculate_pair_scores
+
+
+def _original_score(name1_parts, name2_parts):
+    """calculate_match_score as the app shipped it, before the Indel core."""
+    name1 = " ".join(filter(None, name1_parts)).strip().lower()
+    name2 = " ".join(filter(None, name2_parts)).strip().lower()
+    if not name1 or not name2:
+        return 0
+    return round(SequenceMatcher(None, name1, name2).ratio() * 100, 2)
+
+
+def _names(n, seed, length=(2, 9)):
+    rng = random.Random(seed)
+    firsts = ["John", "Jon", "Joan", "Johann", "Mary", "Marie", "Ann", "Anne"]
+    lasts = ["Smith", "Smyth", "Schmidt", "Brown", "Braun", "O'Neil", "ONeill"]
+
+    def word():
+        return "".join(rng.choice(string.ascii_letters) for _ in range(rng.randint(*length)))
+
+    out = []
+    for _ in range(n):
+        out.append([rng.choice(firsts + [word()]),
+                    rng.choice(["", "", None, "A", "a.", "Lee", "  ", word()]),
+                    rng.choice(lasts + [word(), ""])])
+    return out
+
+
+PEOPLE = _names(300, seed=0)
+PAIRS = list(zip(PEOPLE, PEOPLE[1:] + PEOPLE[:1])) + [(p, p) for p in PEOPLE[:20]] + [
+    (["", None, ""], ["John", "", "Smith"]),
+    ([], []),
+    (["John"], ["", "", "Smith"]),
+]
+
+
+def test_compat_matches_original_difflib_scores():
+    for a, b in PAIRS:
+        assert calculate_match_score(a, b, compat=True) == _original_score(a, b), (a, b)
+
+
+def test_compat_matches_difflib_on_long_strings():
+    # past 200 characters difflib's autojunk heuristic kicks in; compat keeps it
+    rng = random.Random(1)
+    for _ in range(100):
+        a = " ".join("".join(rng.choice("abcdefgh") for _ in range(rng.randint(3, 9))) for _ in range(40))
+        b = "".join(c if rng.random() > 0.05 else "x" for c in a)
+        assert calculate_match_score([a], [b], compat=True) == _original_score([a], [b])
+
+
+def test_indel_never_below_difflib():
+    for a, b in PAIRS:
+        assert calculate_match_score(a, b) >= calculate_match_score(a, b, compat=True), (a, b)
+
+
+def test_indel_ratio():
+    assert calculate_match_score(["John", "", "Smith"], ["john", None, "smith"]) == 100
+    assert calculate_match_score(["abcd"], ["abce"]) == 75
+    assert calculate_match_score([""], ["John"]) == 0
+
+
+def test_weighted_renormalizes_over_shared_parts():
+    # middle is empty on one side: first and last weigh 0.35 and 0.5
+    expected = round((0.35 * 6 / 7 + 0.5 * 1.0) / 0.85 * 100, 2)
+    assert calculate_match_score(["John", "A", "Smith"], ["Jon", "", "Smith"], NAME_PART_WEIGHTS) == expected
+    # no part filled in on both sides: the joined names are compared
+    assert calculate_match_score(["John", "", ""], ["", "", "John"], NAME_PART_WEIGHTS) == 100
+    assert calculate_match_score(["", "", ""], ["", "", "John"], NAME_PART_WEIGHTS) == 0
+
+
+@pytest.mark.parametrize("weights", [None, NAME_PART_WEIGHTS, (1, 1, 1)])
+@pytest.mark.parametrize("compat", [False, True])
+def test_batch_equals_single(weights, compat):
+    for query in PEOPLE[:10] + [["", "", ""]]:
+        expected = [calculate_match_score(query, c, weights, compat) for c in PEOPLE]
+        assert calculate_match_scores(query, PEOPLE, weights, compat) == expected
+    expected = [calculate_match_score(a, b, weights, compat) for a, b in PAIRS]
+    assert calculate_pair_scores(PAIRS, weights, compat) == expected
+    assert calculate_pair_scores(iter(PAIRS), weights, compat) == expected
+
+
+def test_batch_empty():
+    assert calculate_match_scores(["John"], []) == []
+    assert calculate_pair_scores([]) == []
+    assert calculate_pair_scores([], NAME_PART_WEIGHTS) == []
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("abydos.distance", exc_type=ImportError)    # abydos breaks on NumPy 2
+
+from phonetic_index import PhoneticIndex
+from ptic import _codes_similarity, encode_name
+
+NAMES = ["john smith", "jon smyth", "joan schmidt", "mary miller", "marie mueller", "anne braun",
+         "ann brown", "peter kowalczyk", "piotr kovalchik", "arnold schwarzenegger", "zed quux"]
+QUERIES = ["jon smith", "mary muller", "piotr kowalczyk", "anna brown", "xavier"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = PhoneticIndex()
+    for name in NAMES:
+        index.add(name)
+    return index
+
+
+def _brute_force(query, top_k=10, min_score=0.0):
+    codes = encode_name(query)
+    query_codes = set().union(*codes)
+    scored = [(i, _codes_similarity(codes, encode_name(name))) for i, name in enumerate(NAMES)
+              if query_codes & set().union(*encode_name(name))]
+    scored = [(i, s) for i, s in scored if s >= min_score]
+    return sorted(scored, key=lambda x: -x[1])[:top_k]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(index, query):
+    assert sorted(index.search(query, top_k=len(NAMES))) == sorted(_brute_force(query, len(NAMES)))
+    best = index.search(query, top_k=3, min_score=0.3)
+    assert [s for _, s in best] == [s for _, s in _brute_force(query, 3, 0.3)]
+
+
+def test_remove_and_replace():
+    index = PhoneticIndex()
+    ids = [index.add(name) for name in NAMES[:3]]
+    assert ids == [0, 1, 2]
+    index.remove(1)
+    assert 1 not in index and len(index) == 2
+    assert 1 not in index.candidates("jon smyth")
+    index.add("zed quux", name_id=0)
+    assert index.name(0) == "zed quux"
+    assert 0 not in index.candidates("john smith")
+    assert index.add("mary miller") == 3
+    with pytest.raises(KeyError):
+        index.remove(1)
+
+
+def test_save_and_load(index, tmp_path):
+    index.save(tmp_path / "names.json.gz")
+    loaded = PhoneticIndex.load(tmp_path / "names.json.gz")
+    assert len(loaded) == len(index)
+    for query in QUERIES:
+        assert sorted(loaded.search(query)) == sorted(index.search(query))
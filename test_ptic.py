@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("abydos.distance", exc_type=ImportError)    # abydos breaks on NumPy 2
+
+import ptic
+from ptic import EncodingCache, get_encoder
+
+TOKENS = ["schwarzenegger", "szwarcenegger", "washington", "wasington", "kowalczyk", "kovalchik"]
+
+
+def test_encoders_are_shared_per_mode():
+    assert get_encoder() is get_encoder("approx")
+    assert get_encoder("exact") is get_encoder("exact")
+    assert get_encoder("exact") is not get_encoder("approx")
+
+
+def test_cache_returns_the_encoder_codes():
+    cache = EncodingCache()
+    for token in TOKENS:
+        assert cache.get(token) == frozenset(get_encoder().encode(token).split())
+    assert cache.info()["misses"] == len(TOKENS)
+    for token in TOKENS:
+        cache.get(token)
+    assert cache.info()["hits"] == len(TOKENS) and len(cache) == len(TOKENS)
+    cache.get(TOKENS[0], "exact")
+    assert len(cache) == len(TOKENS) + 1        # keyed by match mode as well
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EncodingCache(maxsize=2)
+    cache.get("miller")
+    cache.get("mueller")
+    cache.get("miller")                         # now most recently used
+    cache.get("muller")
+    assert len(cache) == 2
+    misses = cache.misses
+    cache.get("miller")
+    assert cache.misses == misses
+    cache.get("mueller")
+    assert cache.misses == misses + 1
+    cache.resize(1)
+    assert len(cache) == 1
+
+
+def test_cache_save_and_load(tmp_path):
+    cache = EncodingCache()
+    for token in TOKENS:
+        cache.get(token)
+    cache.save(tmp_path / "codes.json")
+
+    loaded = EncodingCache()
+    assert loaded.load(tmp_path / "codes.json") == len(TOKENS)
+    for token in TOKENS:
+        assert loaded.get(token) == cache.get(token)
+    assert loaded.info()["misses"] == 0
+
+
+def test_similarity_uses_the_module_cache():
+    ptic.compute_name_similarity("john smith", "jon smyth")
+    before = ptic.cache_info()
+    ptic.compute_name_similarity("john smith", "jon smyth")
+    after = ptic.cache_info()
+    assert after["misses"] == before["misses"]
+    assert after["hits"] == before["hits"] + 4
+
+
+def _levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+def test_all_pairs_kernel_matches_scalar_levenshtein():
+    codes1 = ["", "a", "kitten", "sitting", "flaw", "lawn", "abc"]
+    codes2 = ["", "b", "sitting", "kitten", "lawn", "flaw", "cba", "abcabc"]
+    dist, la, lb = ptic._levenshtein_all_pairs(codes1, codes2)
+    expected = [_levenshtein(a, b) for a in codes1 for b in codes2]
+    assert dist.tolist() == expected
+    assert la.tolist() == [len(a) for a in codes1 for _ in codes2]
+    assert lb.tolist() == [len(b) for _ in codes1 for b in codes2]
+
+
+def test_max_code_similarity_matches_the_nested_loop():
+    codes = [ptic.encode_token(t) for t in TOKENS + ["mueller", "miller"]]
+    for c1 in codes:
+        for c2 in codes:
+            loop = max(ptic._LEV.sim(e1, e2) for e1 in c1 for e2 in c2)
+            assert ptic._max_code_similarity(c1, c2) == pytest.approx(loop, abs=1e-12)
+    assert ptic._max_code_similarity(frozenset(), codes[0]) == 0.0
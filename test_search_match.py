@@ -0,0 +1,154 @@
+import random
+import re
+import string
+
+import pytest
+
+from search_match import (HIGH_SCORE, PARTIAL_SCORE, classify_fast, classify_match, match_many,
+                          name_similarity, name_similarity_at_least, normalize_many, _norm_tokens)
+
+
+def _corpus(n, seed):
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdeilmnorst") for _ in range(rng.randint(2, 7))) for _ in range(40)]
+
+    def name():
+        parts = rng.sample(words, rng.randint(1, 3))
+        if rng.random() < 0.4:
+            parts.append(str(rng.randint(1, 30)))
+        if rng.random() < 0.2:
+            parts.append(rng.choice(["no%d" % rng.randint(1, 30), "#%d-b" % rng.randint(1, 30)]))
+        return rng.choice([" ", ", ", "-"]).join(parts)
+
+    def typo(s):
+        i = rng.randrange(len(s))
+        return s[:i] + rng.choice(string.ascii_lowercase) + s[i + 1:]
+
+    names = [name() for _ in range(n)]
+    # empties, punctuation only, reordered tokens and near-duplicates
+    names += ["", "  ", "--", names[0].upper(), " ".join(reversed(names[1].split())),
+              typo(names[2]), typo(names[3])]
+    return names
+
+
+def _brute(queries, candidates, top_k=None, min_score=0):
+    out = []
+    for q in queries:
+        hits = [(j, name_similarity(q, c)) for j, c in enumerate(candidates)]
+        hits = sorted((h for h in hits if h[1] >= min_score), key=lambda h: (-h[1], h[0]))
+        out.append(hits[:top_k] if top_k is not None else hits)
+    return out
+
+
+QUERIES = _corpus(40, seed=1)
+CANDIDATES = _corpus(150, seed=2) + QUERIES[:10]
+
+
+def test_match_many_equals_name_similarity():
+    assert match_many(QUERIES, CANDIDATES) == _brute(QUERIES, CANDIDATES)
+
+
+@pytest.mark.parametrize("top_k,min_score", [(1, 0), (5, 0), (None, PARTIAL_SCORE), (3, HIGH_SCORE),
+                                             (10, 100), (0, 0)])
+def test_match_many_top_k_min_score(top_k, min_score):
+    expected = _brute(QUERIES, CANDIDATES, top_k, min_score)
+    assert match_many(QUERIES, CANDIDATES, top_k=top_k, min_score=min_score) == expected
+
+
+def test_match_many_blocks_and_workers():
+    expected = _brute(QUERIES, CANDIDATES, top_k=5, min_score=PARTIAL_SCORE)
+    # max_cells below one row forces one query per cdist block
+    assert match_many(QUERIES, CANDIDATES, top_k=5, min_score=PARTIAL_SCORE, max_cells=1) == expected
+    assert match_many(QUERIES, CANDIDATES, top_k=5, min_score=PARTIAL_SCORE, workers=2) == expected
+    assert match_many(QUERIES, CANDIDATES, top_k=5, min_score=PARTIAL_SCORE, workers=-1, max_cells=500) == expected
+
+
+def test_match_many_empty_inputs():
+    assert match_many([], CANDIDATES) == []
+    assert match_many(["a", "b"], []) == [[], []]
+    assert match_many([""], ["", "abc"]) == [[(0, 0), (1, 0)]]
+
+
+def _pairs(n, seed):
+    """Unrelated pairs and pairs one to three edits apart (scores around 60-85)."""
+    rng = random.Random(seed)
+    names = [s for s in _corpus(300, seed) if s.strip(" -")]
+
+    def edit(s):
+        i = rng.randrange(len(s) + 1)
+        return rng.choice([s[:i] + rng.choice("aeinost") + s[i:], s[:i] + s[i + 1:]])
+
+    pairs = []
+    for _ in range(n):
+        a = rng.choice(names)
+        if rng.random() < 0.5:
+            b = rng.choice(names)
+        else:
+            b = a
+            for _ in range(rng.randint(1, 3)):
+                b = edit(b)
+        pairs.append((a, b))
+    return pairs
+
+
+def test_classify_fast_equals_classify_match():
+    for a, b in _pairs(5000, seed=3):
+        assert classify_fast(a, b) == classify_match(name_similarity(a, b)), (a, b)
+
+
+@pytest.mark.parametrize("edge", [PARTIAL_SCORE - 1, PARTIAL_SCORE, HIGH_SCORE - 1, HIGH_SCORE])
+def test_classify_fast_bucket_edges(edge):
+    pairs = [(a, b) for a, b in _pairs(20000, seed=4) if name_similarity(a, b) == edge]
+    assert pairs, f"no pair scores {edge}"
+    for a, b in pairs:
+        assert classify_fast(a, b) == classify_match(edge)
+        assert name_similarity_at_least(a, b, edge)
+        assert not name_similarity_at_least(a, b, edge + 1)
+
+
+@pytest.mark.parametrize("cutoff", [0, 1, 30, 59, 60, 61, 84, 85, 86, 99, 100, 101])
+def test_at_least_equals_full_score(cutoff):
+    pairs = _pairs(2000, seed=9) + [("", ""), ("", "abc"), ("12 main st", "13 main st"),
+                                    ("flat 12 5 main st", "flat 12 main st"), ("no 23", "no23")]
+    for a, b in pairs:
+        assert name_similarity_at_least(a, b, cutoff) == (name_similarity(a, b) >= cutoff), (a, b)
+
+
+def test_classify_match_thresholds():
+    assert [classify_match(s) for s in (0, 59, 60, 84, 85, 100)] == \
+        ["none", "none", "partial", "partial", "high", "high"]
+
+
+def test_numeric_rules():
+    assert name_similarity("12 main street", "13 main street") == 0
+    assert classify_fast("12 main street", "13 main street") == "none"
+    assert name_similarity("street main 12", "12 main street") == 100
+    assert name_similarity("flat 12 5 main st", "flat 12 main st") < name_similarity("flat 12 main st", "flat 12 main st")
+
+
+def test_normalize_many_coerces_non_strings():
+    values = ["AB-12x", 12345, 3.5, None, float("nan"), ""]
+    expected = [["ab", "12", "x"], ["12345"], ["3", "5"], [], [], []]
+    assert normalize_many(values) == expected
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(values, index=list("abcdef"), dtype=object)
+    assert normalize_many(series).to_dict() == dict(zip("abcdef", expected))
+    assert normalize_many(pd.Series(["X1", pd.NA], dtype="string")).tolist() == [["x", "1"], []]
+
+
+def _three_pass_tokens(s):
+    """_norm_tokens as it was before the single-pass regex."""
+    s = (s or "").lower()
+    s = re.sub(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])', ' ', s)
+    s = re.sub(r'[^a-z0-9\s]', ' ', s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s.split() if s else []
+
+
+def test_norm_tokens_matches_the_three_pass_version():
+    rng = random.Random(8)
+    alphabet = "abcXYZ019 _-./#\t\u00a0\u0663\u00e9\u0130\u212a"
+    fuzz = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(5000)]
+    for s in fuzz + ["", None, "No.23 Main-St", "Flat 4B, 221b Baker Street"]:
+        assert _norm_tokens(s) == _three_pass_tokens(s), repr(s)
+    assert _norm_tokens("No.23 Main-St") == ["no", "23", "main", "st"]
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+from name_score import NAME_PART_WEIGHTS, calculate_match_score
+
+PAIRS = [("John Smith", "Jon Smyth"), ("Mary Ann", "Marie Anne"), ("abc", "xyz")]
+
+
+@pytest.fixture
+def app():
+    return AppTest.from_file("stapp.py", default_timeout=60).run()
+
+
+def _csv(frame):
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+def _score_file(app, frame):
+    app.file_uploader[0].upload("pairs.csv", _csv(frame), "text/csv").run()
+    app.button[1].click().run()
+    assert not app.exception
+    return app.session_state["batch"][1]
+
+
+def test_single_pair(app):
+    app.button[0].click().run()
+    assert app.error[0].value.startswith("Please enter at least one name field")
+
+    for key, value in [("name1_first", "John"), ("name1_last", "Smith"), ("name2_first", "Jon"),
+                       ("name2_last", "Smyth")]:
+        app.text_input(key=key).input(value)
+    app.button[0].click().run()
+    assert not app.exception and not app.error
+    assert [i.value for i in app.info] == ["**Name 1:** John Smith", "**Name 2:** Jon Smyth"]
+    assert app.success[0].value == "✓ The names show strong similarity."
+
+
+def test_batch_scores_match_the_scorer(app):
+    frame = pd.DataFrame(PAIRS, columns=["name1", "name2"])
+    assert app.caption[-1].value.startswith("Score a CSV")
+    result = _score_file(app, frame)
+    assert [m.value for m in app.multiselect] == [["name1"], ["name2"]]
+    assert result["score"].tolist() == [calculate_match_score([a], [b]) for a, b in PAIRS]
+    assert result["confidence"].tolist() == ["Good Match", "Good Match", "Poor Match"]
+    assert [(m.label, m.value) for m in app.metric] == [("Pairs", "3"), ("Mean score", "54.0"),
+                                                        ("Good or better", "67%")]
+    assert not any(c.value.startswith("Score a CSV") for c in app.caption)    # the chart replaced it
+
+
+def test_batch_weights_split_names(app):
+    rows = [("John", "", "Smith", "Jon", "A", "Smith"), ("Mary", "Ann", "Lee", "Marie", "", "Li")] * 3
+    columns = [f"name{i}_{p}" for i in (1, 2) for p in ("first", "middle", "last")]
+    frame = pd.DataFrame(rows, columns=columns)
+    app.checkbox[0].check().run()
+    result = _score_file(app, frame)
+    expected = [calculate_match_score(list(r[:3]), list(r[3:]), NAME_PART_WEIGHTS) for r in rows]
+    assert result["score"].tolist() == expected
+    assert not any(c.value.startswith("Part weighting needs") for c in app.caption)
+
+
+def test_changing_columns_hides_a_stale_result(app):
+    frame = pd.DataFrame([(a, b, b) for a, b in PAIRS], columns=["name1", "name2", "other"])
+    _score_file(app, frame)
+    assert len(app.metric) == 3
+    app.multiselect[1].set_value(["other"]).run()
+    assert len(app.metric) == 0
@@ -0,0 +1,39 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from stub_servers import TypesenseStub
+
+
+@pytest.fixture
+def stub():
+    with TypesenseStub() as stub:
+        yield stub
+
+
+def _call(stub, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    request = urllib.request.Request(stub.url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_status_codes(stub):
+    schema = {"name": "items", "fields": [{"name": ".*", "type": "auto"}]}
+    assert _call(stub, "POST", "/collections", schema)[0] == 201
+    assert _call(stub, "POST", "/collections", schema)[0] == 409
+
+    assert _call(stub, "POST", "/collections/items/documents", {"id": "1", "name": "a"})[0] == 201
+    status, body = _call(stub, "POST", "/collections/items/documents", {"id": "1", "name": "b"})
+    assert status == 409 and "already exists" in body["message"]
+    upsert = "/collections/items/documents?action=upsert"
+    assert _call(stub, "POST", upsert, {"id": "1", "name": "b"})[0] == 201
+
+    assert _call(stub, "POST", "/collections/missing/documents", {"id": "1"})[0] == 404
+    assert _call(stub, "GET", "/collections/missing")[0] == 404
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backends import TypesenseBackend
+from stub_servers import TypesenseStub
+from typesense_local import LocalClient
+from typesense_loader import import_batch, infer_schema, iter_batches, load
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = pd.read_csv("sample.csv")
+    df.insert(0, "id", df.index.astype(str))
+    return df
+
+
+@pytest.fixture
+def remote():
+    with TypesenseStub(fail_rate=0.3, seed=1) as stub:
+        backend = TypesenseBackend("loader-test", stub.url)
+        yield stub, backend
+        backend.close()
+
+
+def test_infer_schema():
+    df = pd.DataFrame({"id": ["1"], "name": ["a"], "n": [1], "x": [np.nan], "ok": [True]})
+    assert infer_schema(df, "t")["fields"] == [
+        {"name": "name", "type": "string"},
+        {"name": "n", "type": "int64", "facet": True},
+        {"name": "x", "type": "float", "facet": True, "optional": True},
+        {"name": "ok", "type": "bool"},
+    ]
+
+
+def test_iter_batches_from_frame_and_csv(frame):
+    from_frame = [doc for batch in iter_batches(frame, 64) for doc in batch]
+    assert [len(b) for b in iter_batches("sample.csv", 64)] == [64, 64, 64, 8]
+    assert len(from_frame) == len(frame) and from_frame[3]["id"] == "3"
+    frame = frame.copy()
+    frame.loc[0, "Attribute_1"] = np.nan
+    assert next(iter_batches(frame, 2))[0]["Attribute_1"] is None
+
+
+def test_load_into_local_client(frame):
+    client = LocalClient()
+    stats = load(client, frame, "machinedata", batch_size=50, concurrency=2)
+    assert stats["docs"] == stats["imported"] == len(frame) and stats["failed"] == 0
+    assert stats["batches"] == 4
+    col = client.collections["machinedata"]
+    assert len(col.docs) == len(frame)
+    hits = col.documents.search({"q": frame.loc[7, "MPN"], "query_by": "MPN"})["hits"]
+    assert hits[0]["document"]["id"] == "7"
+
+
+def test_load_retries_transient_rejections(frame, remote):
+    stub, backend = remote
+    stats = load(backend, frame, "machinedata", batch_size=40, concurrency=3, max_retries=10, backoff=0.001)
+    assert stats["imported"] == len(frame) and stats["failed"] == 0
+    assert stats["retries"] > 0
+    assert backend.collections["machinedata"].retrieve()["num_documents"] == len(frame)
+
+
+def test_import_batch_does_not_retry_bad_documents():
+    client = LocalClient()
+    client.collections.create({"name": "t", "fields": [{"name": "name", "type": "string"},
+                                                       {"name": "n", "type": "float"}]})
+    docs = [{"id": "1", "name": "a", "n": 1}, {"id": "2", "name": "b", "n": "x"}]
+    assert import_batch(client.collections["t"], docs, backoff=0) == (1, 1, 0)
+    assert import_batch(client.collections["t"], docs[:1], action="create", backoff=0) == (0, 1, 0)
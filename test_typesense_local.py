@@ -0,0 +1,234 @@
+import random
+
+import numpy as np
+import pytest
+
+from code_index import compact
+from typesense_local import EmbeddedCollection, LocalClient, Trie, tokenize
+
+
+def _ids(result):
+    return [hit["document"]["id"] for hit in result["hits"]]
+
+
+def _browse(collection, **params):
+    return collection.search(dict({"q": "*", "query_by": "name", "per_page": 100}, **params))
+
+
+def _levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+@pytest.mark.parametrize("prefix", [False, True])
+@pytest.mark.parametrize("max_typos", [0, 1, 2])
+def test_trie_search_matches_brute_force(prefix, max_typos):
+    rng = random.Random(15)
+    words = {"".join(rng.choice("abcd") for _ in range(rng.randint(1, 7))) for _ in range(300)}
+    trie = Trie()
+    for i, word in enumerate(sorted(words)):
+        trie.insert(word, "f", i)
+    for query in ["a", "abc", "dcba", "abcdab", "bbbbbbbb"]:
+        expected = {}
+        for word in words:
+            if prefix:
+                typos = min(_levenshtein(query, word[:k]) for k in range(len(word) + 1))
+            else:
+                typos = _levenshtein(query, word)
+            if typos <= max_typos:
+                expected[word] = typos
+        found = {word: typos for word, typos, _ in trie.search(query, max_typos, prefix)}
+        assert found == expected, query
+
+
+def test_search_ranks_typos_prefix_then_field():
+    col = EmbeddedCollection("items", ["name", "brand"])
+    col.add({"id": "exact", "name": "valve", "brand": "acme"})
+    col.add({"id": "prefix", "name": "valves", "brand": "acme"})
+    col.add({"id": "typo", "name": "valbe", "brand": "acme"})
+    col.add({"id": "brand", "name": "pump", "brand": "valve"})
+    query = {"q": "valve", "query_by": "name,brand", "num_typos": 1}
+    assert _ids(col.search(query)) == ["exact", "brand", "prefix", "typo"]
+    assert _ids(col.search(dict(query, prefix="false", num_typos=0))) == ["exact", "brand"]
+    assert _ids(col.search(dict(query, num_typos="0,1", prefix="true,false"))) == ["exact", "brand", "prefix"]
+    hit = col.search(query)["hits"][0]
+    assert hit["highlights"] == [{"field": "name", "snippet": "valve", "matched_tokens": ["valve"]}]
+
+
+def test_search_drops_tokens_from_the_right_and_pages():
+    col = EmbeddedCollection("items", ["name"])
+    for i in range(5):
+        col.add({"id": str(i), "name": f"brass valve {i}"})
+    result = col.search({"q": "brass valve zzz", "query_by": "name", "per_page": 2, "page": 2})
+    assert result["found"] == 5 and _ids(result) == ["2", "3"]
+    assert col.search({"q": "zzz brass", "query_by": "name"})["found"] == 0
+
+
+def test_local_client_over_sample_csv():
+    client = LocalClient.from_csv("sample.csv", "machinedata")
+    col = client.collections["machinedata"]
+    assert col.string_fields == ["ProductName", "Brand", "MPN"]
+    assert len(col.numeric_fields) == 27
+    result = col.documents.search({"q": "17FU4", "query_by": "ProductName,Brand,MPN", "num_typos": 0})
+    assert result["found"] >= 1
+    for hit in result["hits"]:
+        tokens = [t for f in col.string_fields for t in tokenize(hit["document"][f])]
+        assert any(t.startswith("17fu4") for t in tokens)
+    with pytest.raises(KeyError):
+        client.collections["missing"]
+
+
+def test_import_with_one_bad_row_leaves_index_aligned():
+    col = EmbeddedCollection("items")
+    col.documents.import_([{"id": "0", "name": "alpha", "a": 1, "b": 1},
+                           {"id": "1", "name": "beta", "a": 2, "b": 2}])
+    results = col.documents.import_([{"id": "2", "name": "gamma", "a": 3, "b": "oops"},
+                                     {"id": "3", "name": "delta", "a": 4, "b": 3}])
+    assert results[0]["success"] is False and results[0]["code"] == 400
+    assert results[1] == {"success": True}
+
+    assert len(col.docs) == 3
+    assert {f: len(v) for f, v in col._columns.items()} == {"a": 3, "b": 3}
+    assert _ids(col.search({"q": "gamma", "query_by": "name"})) == []
+    assert _ids(_browse(col, filter_by="b:=3")) == ["3"]
+    assert _ids(_browse(col, filter_by="a:>=4")) == ["3"]
+
+    # the corrected row is a new document, not a conflict
+    assert col.documents.import_([{"id": "2", "name": "gamma", "a": 3, "b": 5}]) == [{"success": True}]
+    assert _ids(_browse(col, filter_by="b:=5")) == ["2"]
+
+
+def test_bad_upsert_keeps_previous_version():
+    col = EmbeddedCollection("items", ["name"], numeric_fields=["price"])
+    col.add({"id": "x", "name": "old", "price": 1})
+    with pytest.raises(ValueError):
+        col.add({"id": "x", "name": "new", "price": "n/a"}, action="upsert")
+    assert col.docs[0]["name"] == "old"
+    assert _ids(col.search({"q": "old", "query_by": "name"})) == ["x"]
+    assert _ids(col.search({"q": "new", "query_by": "name"})) == []
+
+
+def test_upsert_adding_a_numeric_field_sizes_the_column():
+    col = EmbeddedCollection("items")
+    for i in range(4):
+        col.add({"id": str(i), "name": f"item {i}"})
+    col.add({"id": "1", "name": "item 1", "weight": 2.5}, action="upsert")
+    values, _, _ = col.column("weight")
+    assert len(values) == len(col.docs)
+    assert np.isnan(values[[0, 2, 3]]).all() and values[1] == 2.5
+    assert _ids(_browse(col, filter_by="weight:>1")) == ["1"]
+    assert _ids(_browse(col, sort_by="weight:desc"))[0] == "1"
+
+
+@pytest.fixture(scope="module")
+def sample():
+    return EmbeddedCollection.from_csv("sample.csv", "machinedata")
+
+
+@pytest.mark.parametrize("q", ["4IWP", "17FU4", "u4-iwp", "PTG4", "X1J0", "zzzz"])
+def test_infix_agrees_with_a_linear_scan(sample, q):
+    result = _browse(sample, q=q, query_by="MPN", infix="always", prefix="false", num_typos=0)
+    expected = {d["id"] for d in sample.docs if compact(q) in compact(d["MPN"])}
+    assert set(_ids(result)) == expected
+    assert result["found"] == len(expected)
+    assert len(sample.code_index()) == len(sample.docs)
+
+
+def test_infix_modes():
+    col = EmbeddedCollection("parts", ["name", "mpn"])
+    col.add({"id": "a", "name": "bolt", "mpn": "17FU4-IWPCM"})
+    col.add({"id": "b", "name": "4iwp adapter", "mpn": "X1J0"})
+    query = {"q": "4iwp", "query_by": "name,mpn", "prefix": "false", "num_typos": 0}
+
+    assert _ids(col.search(query)) == ["b"]
+    assert _ids(col.search(dict(query, infix="fallback"))) == ["b"]
+    # the token match on name outranks the infix match on mpn
+    assert _ids(col.search(dict(query, infix="always"))) == ["b", "a"]
+    assert _ids(col.search(dict(query, infix="off,always"))) == ["b", "a"]
+    assert _ids(col.search(dict(query, q="fu4iw"))) == []
+    assert _ids(col.search(dict(query, q="fu4iw", infix="fallback"))) == ["a"]
+    assert _ids(col.search(dict(query, q="fu4iw", infix="always", filter_by="name:bolt"))) == ["a"]
+    assert _ids(col.search(dict(query, q="fu4iw", infix="always", filter_by="name:adapter"))) == []
+
+
+def test_infix_index_follows_writes():
+    col = EmbeddedCollection("parts", ["mpn"])
+    col.add({"id": "a", "mpn": "17FU4-IWPCM"})
+    query = {"q": "wpc", "query_by": "mpn", "infix": "always"}
+    assert _ids(col.search(query)) == ["a"]
+
+    col.add({"id": "b", "mpn": "AB-WPC-9"})
+    assert _ids(col.search(query)) == ["b", "a"]        # b also matches the token "wpc"
+    col.add({"id": "a", "mpn": "17FU4"}, action="upsert")
+    assert _ids(col.search(query)) == ["b"]
+    assert _ids(col.search(dict(query, q="fu4"))) == ["a"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    pd = pytest.importorskip("pandas")
+    df = pd.read_csv("sample.csv")
+    df["id"] = df.index.astype(str)
+    return df
+
+
+FILTERS = [
+    ("Attribute_3:[10..20]", lambda df: df.Attribute_3.between(10, 20)),
+    ("Attribute_1:>50 && Attribute_2:<=30", lambda df: (df.Attribute_1 > 50) & (df.Attribute_2 <= 30)),
+    ("Attribute_1:<5 || Attribute_1:>=95", lambda df: (df.Attribute_1 < 5) | (df.Attribute_1 >= 95)),
+    ("Attribute_4:[0..10, 90..100]",
+     lambda df: df.Attribute_4.between(0, 10) | df.Attribute_4.between(90, 100)),
+    ("MPN:17F*", lambda df: df.MPN.str.lower().str.startswith("17f")),
+    ("Brand:!=847VDJ && Attribute_5:>20", lambda df: (df.Brand != "847VDJ") & (df.Attribute_5 > 20)),
+]
+
+
+@pytest.mark.parametrize("filter_by, expected", FILTERS)
+def test_filter_by_matches_pandas(sample, frame, filter_by, expected):
+    result = _browse(sample, query_by="ProductName", per_page=250, filter_by=filter_by)
+    assert sorted(_ids(result), key=int) == frame.id[expected(frame)].tolist()
+
+
+def test_equality_and_not_equal_on_numbers(sample, frame):
+    value = frame.Attribute_6[17]
+    assert _ids(_browse(sample, query_by="MPN", per_page=250, filter_by=f"Attribute_6:={value!r}")) == ["17"]
+    rest = _browse(sample, query_by="MPN", filter_by=f"Attribute_6:!={value!r}")
+    assert rest["found"] == len(frame) - 1
+
+
+def test_sort_by_matches_pandas(sample, frame):
+    result = _browse(sample, query_by="ProductName", per_page=250, sort_by="Attribute_7:asc")
+    assert _ids(result) == frame.sort_values("Attribute_7", kind="stable").id.tolist()
+    result = _browse(sample, query_by="ProductName", per_page=5, filter_by="Attribute_3:<50",
+                     sort_by="Attribute_1:desc")
+    expected = frame[frame.Attribute_3 < 50].sort_values("Attribute_1", ascending=False)
+    assert _ids(result) == expected.id[:5].tolist()
+    with pytest.raises(ValueError):
+        _browse(sample, sort_by="ProductName:asc")
+
+
+def test_facets(sample, frame):
+    result = _browse(sample, query_by="ProductName", filter_by="Attribute_3:<50",
+                     facet_by="Attribute_3,Brand")
+    numeric, brand = result["facet_counts"]
+    values = frame.Attribute_3[frame.Attribute_3 < 50]
+    assert numeric["field_name"] == "Attribute_3"
+    assert numeric["stats"]["total_values"] == values.nunique()
+    assert numeric["stats"]["min"] == pytest.approx(values.min())     # pandas' float parser may round
+    assert numeric["stats"]["max"] == pytest.approx(values.max())
+    assert numeric["stats"]["avg"] == pytest.approx(values.mean())
+    counts = frame.Brand[frame.Attribute_3 < 50].value_counts()
+    assert brand["stats"]["total_values"] == len(counts)
+    assert brand["counts"][0]["count"] == counts.iloc[0]
+    with pytest.raises(ValueError):
+        _browse(sample, facet_by="nope")
+
+
+def test_bad_filters_raise(sample):
+    for filter_by in ["Attribute_1", "nope:>1", "Attribute_1:>abc"]:
+        with pytest.raises(ValueError):
+            _browse(sample, filter_by=filter_by)
@@ -1,46 +1,31 @@
 import pandas as pd
 import numpy as np
-import typesense
 import json
-
-# Configure the Typesense client
-client = typesense.Client({
-  'nodes': [{
-    'host': 'localhost',  # Replace with your Typesense server address
-    'port': '8108',       # Replace with your Typesense port
-    'protocol': 'http'    # Use 'https' if you have SSL enabled
-  }],
-  'api_key': 'Icm3xooVhTLe3WkeIDQGukk5QnUkZI3sVYetYQrotucHBwkv',
-  'connection_timeout_seconds': 2
-})
+import os
+
+# TYPESENSE_MODE=local searches sample.csv in-process (no server needed)
+if os.environ.get("TYPESENSE_MODE") == "local":
+  from typesense_local import LocalClient
+  client = LocalClient.from_csv("sample.csv", "machinedata")
+else:
+  from backends import TypesenseBackend, register
+  # Pooled keep-alive client, shared with the rest of the app as backends.get("typesense")
+  client = register(TypesenseBackend(
+    "typesense",
+    os.environ.get("TYPESENSE_URL", "http://localhost:8108"),  # your Typesense server
+    api_key=os.environ.get("TYPESENSE_API_KEY", 'Icm3xooVhTLe3WkeIDQGukk5QnUkZI3sVYetYQrotucHBwkv'),
+    timeout=float(os.environ.get("TYPESENSE_TIMEOUT", 2)),    # default per-call deadline, seconds
+  ))
 
 
 df = pd.read_csv("sample.csv")
+# the Attribute_N columns are floats and never match text
+string_columns = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
 
-# globallist = []
-# for i,j in df.iterrows():
-#     temp = {}
-#     for k,v in j.items():
-#         temp[k]=v
-#     globallist.append(temp)
-
-
-# schema = {
-#   "name": "machinedata",  
-#   "fields": [
-#     {"name": ".*", "type": "string" }
-#   ]
-# }
-
-# try:
-#     client.collections["machinedata"].delete()
-#     client.collections.create(schema)
-# except:
-#     client.collections.create(schema)
-
-
-# for item in globallist:
-#     client.collections['machinedata'].documents.create(item)
+# Reload the collection with the bulk loader (JSONL batches via documents.import_).
+# The schema is inferred from df.dtypes: text columns as string, Attribute_N as faceted float.
+# from typesense_loader import load
+# print(load(client, df, "machinedata", batch_size=1000, concurrency=4))
 
 
 limit = 3
@@ -48,7 +33,7 @@ limit = 3
 query = "17FU4"
 search_parameters = {
         'q': query,
-        'query_by': ",".join(list(df.columns)),  # This tells Typesense to search in all fields
+        'query_by': ",".join(string_columns),  # search the text fields only
         'per_page': limit,
         'prefix': 'true',  # Enable prefix matching
         'num_typos': 0, #Allow up to 2 typos for fuzzy matching
@@ -73,3 +58,14 @@ print(results["hits"])
 #         "sort_by": "_text_match:desc",
 #         "text_match_type":"sum_score"
 #     }
+
+
+# Numeric range + MPN prefix, answered from the typed schema:
+# search_parameters = {
+#         'q': '*',
+#         'query_by': ",".join(string_columns),
+#         'filter_by': 'Attribute_3:[10..20] && MPN:17F*',
+#         'sort_by': 'Attribute_1:desc',
+#         'facet_by': 'Attribute_3',
+#         'per_page': limit,
+#     }
@@ -0,0 +1,227 @@
+"""
+Bulk-load a CSV / DataFrame into a Typesense collection.
+
+    python typesense_loader.py sample.csv --collection machinedata --host localhost --port 8108
+    python typesense_loader.py sample.csv --stub --repeat 100     # benchmark against stub_servers
+
+Rows are converted column-wise (DataFrame.to_dict("records"), NaN -> None),
+serialized to JSONL one batch at a time and sent to documents.import_, so
+one HTTP request carries batch_size documents instead of one. Up to
+concurrency batches are in flight; documents the server rejects with a
+transient error (429/5xx), and batches that fail outright with a
+connection or server error, are retried with exponential backoff and jitter.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+# typesense.exceptions that are worth retrying (the client raises these by
+# name; matched by name so this module does not need typesense installed)
+RETRYABLE_ERRORS = {"Timeout", "ServerError", "ServiceUnavailable", "HTTPStatus0Error"}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def to_jsonl(records):
+    return "\n".join(json.dumps(r, default=_json_default) for r in records)
+
+
+def _records(df):
+    """DataFrame -> list of dicts, with NaN/NaT as None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def iter_batches(source, batch_size=1000):
+    """Yield lists of document dicts from a CSV path or a DataFrame, batch_size rows at a time."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_size):
+            yield _records(source.iloc[start:start + batch_size])
+        return
+    for chunk in pd.read_csv(source, chunksize=batch_size):
+        yield _records(chunk)
+
+
+def infer_schema(df, name="machinedata", facet_numeric=True):
+    """
+    Typesense schema from DataFrame dtypes: text columns -> string, floats ->
+    float, integers -> int64, booleans -> bool. Numeric fields are faceted
+    (so they can be range-filtered, sorted and summarized); columns with
+    missing values are optional.
+    """
+    fields = []
+    for column, dtype in df.dtypes.items():
+        if column == "id":
+            continue
+        if pd.api.types.is_bool_dtype(dtype):
+            field = {"name": column, "type": "bool"}
+        elif pd.api.types.is_integer_dtype(dtype):
+            field = {"name": column, "type": "int64", "facet": facet_numeric}
+        elif pd.api.types.is_float_dtype(dtype):
+            field = {"name": column, "type": "float", "facet": facet_numeric}
+        else:
+            field = {"name": column, "type": "string"}
+        if df[column].isna().any():
+            field["optional"] = True
+        fields.append(field)
+    return {"name": name, "fields": fields}
+
+
+def _retryable(exc):
+    return (type(exc).__name__ in RETRYABLE_ERRORS or getattr(exc, "status", None) in RETRYABLE_CODES
+            or isinstance(exc, (ConnectionError, TimeoutError)))
+
+
+def import_batch(collection, docs, action="upsert", max_retries=3, backoff=0.1):
+    """
+    Import one batch; returns (imported, failed, retries). Documents rejected
+    with a transient code are retried as a smaller batch.
+    """
+    imported = failed = attempt = 0
+    while docs:
+        try:
+            response = collection.documents.import_(to_jsonl(docs), {"action": action})
+        except Exception as exc:
+            if not _retryable(exc) or attempt >= max_retries:
+                raise
+            retry = docs
+        else:
+            results = [json.loads(line) for line in response.split("\n") if line.strip()]
+            retry = [d for d, r in zip(docs, results) if not r.get("success") and r.get("code") in RETRYABLE_CODES]
+            ok = sum(1 for r in results if r.get("success"))
+            imported += ok
+            failed += len(docs) - ok - len(retry)
+            if retry and attempt >= max_retries:
+                failed += len(retry)
+                retry = []
+            if not retry:
+                break
+        attempt += 1
+        # full jitter: spread retries from concurrent batches apart
+        time.sleep(random.uniform(0, backoff * 2 ** attempt))
+        docs = retry
+    return imported, failed, attempt
+
+
+def bulk_import(collection, batches, action="upsert", concurrency=4, max_retries=3, backoff=0.1):
+    """
+    Import every batch from batches (an iter_batches() generator) with up to
+    concurrency requests in flight. Returns stats: docs, imported, failed,
+    batches, retries, seconds, docs_per_s.
+    """
+    stats = {"docs": 0, "imported": 0, "failed": 0, "batches": 0, "retries": 0}
+
+    def collect(future):
+        imported, failed, retries = future.result()
+        stats["imported"] += imported
+        stats["failed"] += failed
+        stats["retries"] += retries
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        pending = deque()
+        for docs in batches:
+            stats["docs"] += len(docs)
+            stats["batches"] += 1
+            pending.append(pool.submit(import_batch, collection, docs, action, max_retries, backoff))
+            if len(pending) >= 2 * concurrency:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    stats["seconds"] = time.perf_counter() - start
+    stats["docs_per_s"] = stats["docs"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def recreate_collection(client, schema):
+    """Drop the collection if it exists and create it from schema."""
+    try:
+        client.collections[schema["name"]].delete()
+    except Exception:
+        pass
+    client.collections.create(schema)
+
+
+def load(client, source, name="machinedata", schema=None, batch_size=1000, concurrency=4, **kwargs):
+    """
+    Recreate collection name and bulk-import source (CSV path or DataFrame)
+    into it. schema defaults to infer_schema() of the DataFrame (or of the
+    first 10,000 rows of the CSV).
+    """
+    if schema is None:
+        schema = infer_schema(source if isinstance(source, pd.DataFrame) else pd.read_csv(source, nrows=10000))
+    recreate_collection(client, dict(schema, name=name))
+    return bulk_import(client.collections[name], iter_batches(source, batch_size), concurrency=concurrency, **kwargs)
+
+
+def _client(host, port, api_key="xyz", timeout=10):
+    import typesense
+    return typesense.Client({
+        "nodes": [{"host": host, "port": str(port), "protocol": "http"}],
+        "api_key": api_key,
+        "connection_timeout_seconds": timeout,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load a CSV into Typesense.")
+    parser.add_argument("csv")
+    parser.add_argument("--collection", default="machinedata")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8108)
+    parser.add_argument("--api-key", default="xyz")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--stub", action="store_true", help="load into a local stub server and compare with per-document create()")
+    parser.add_argument("--repeat", type=int, default=1, help="replicate the CSV rows this many times (benchmarking)")
+    parser.add_argument("--latency", type=float, default=0.0005, help="stub: seconds added per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="stub: fraction of imported docs rejected with 503")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.csv)
+    if args.repeat > 1:
+        df = pd.concat([df] * args.repeat, ignore_index=True)
+    df.insert(0, "id", df.index.astype(str))
+
+    if not args.stub:
+        client = _client(args.host, args.port, args.api_key)
+        stats = load(client, df, args.collection, batch_size=args.batch_size,
+                     concurrency=args.concurrency, max_retries=args.max_retries)
+        print(stats, file=sys.stderr)
+        return
+
+    from stub_servers import TypesenseStub
+    with TypesenseStub(latency=args.latency, fail_rate=args.fail_rate) as stub:
+        client = _client(stub.host, stub.port)
+
+        # baseline: the old loader, one documents.create() per row
+        n = min(len(df), 2000)
+        recreate_collection(client, infer_schema(df, args.collection))
+        t0 = time.perf_counter()
+        for doc in _records(df.iloc[:n]):
+            client.collections[args.collection].documents.create(doc)
+        per_doc = n / (time.perf_counter() - t0)
+        print(f"create() per document: {n} docs, {per_doc:,.0f} docs/s")
+
+        stats = load(client, df, args.collection, batch_size=args.batch_size,
+                     concurrency=args.concurrency, max_retries=args.max_retries)
+        found = client.collections[args.collection].retrieve()["num_documents"]
+        print(f"import_ batch={args.batch_size} concurrency={args.concurrency}: {stats['docs']} docs, "
+              f"{stats['docs_per_s']:,.0f} docs/s ({stats['docs_per_s'] / per_doc:.0f}x), "
+              f"{stats['retries']} retries, {stats['failed']} failed, {found} in collection")
+
+
+if __name__ == "__main__":
+    main()
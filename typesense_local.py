@@ -0,0 +1,656 @@
+"""
+In-process stand-in for the Typesense collection used by typesense_client.py.
+
+    from typesense_local import LocalClient
+    client = LocalClient.from_csv("sample.csv", "machinedata")
+    client.collections["machinedata"].documents.search({"q": "17FU4", "query_by": "ProductName,MPN"})
+
+Only the string columns are indexed, in a token trie with prefix and
+typo-tolerant lookup; results come back in Typesense's {"hits": [...]} shape,
+so the same search code runs offline and in tests without a server.
+"""
+import csv
+import json
+import re
+import time
+
+import numpy as np
+
+from code_index import CodeIndex, compact
+
+# Typesense-style tokens: case-folded runs of letters/digits
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+NUMERIC_TYPES = ("int32", "int64", "float")
+
+
+def tokenize(text: str):
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def _per_field(value, n, parse):
+    """Typesense accepts one value or a comma list with one value per query_by field."""
+    parts = [parse(p.strip()) for p in str(value).split(",")]
+    return parts * n if len(parts) == 1 else parts
+
+
+def _parse_bool(value):
+    return value.lower() == "true"
+
+
+class _Node:
+    __slots__ = ("children", "docs")
+
+    def __init__(self):
+        self.children = {}
+        self.docs = None                         # {field: set(doc ids)} for a complete token
+
+
+class Trie:
+    """
+    Token trie with typo-tolerant exact and prefix lookup: a Levenshtein DP
+    row is carried down the trie and branches whose best cell already
+    exceeds max_typos are pruned.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+
+    def insert(self, token, field, doc_id):
+        node = self.root
+        for ch in token:
+            node = node.children.setdefault(ch, _Node())
+        if node.docs is None:
+            node.docs = {}
+        node.docs.setdefault(field, set()).add(doc_id)
+
+    @staticmethod
+    def _words(node, path):
+        """Every complete token at or below node."""
+        stack = [(node, path)]
+        while stack:
+            node, path = stack.pop()
+            if node.docs is not None:
+                yield path, node.docs
+            for ch, child in node.children.items():
+                stack.append((child, path + ch))
+
+    def search(self, token, max_typos=0, prefix=False):
+        """
+        Yield (indexed token, typos, {field: doc ids}) for tokens within
+        max_typos edits of token (or, with prefix=True, starting with a
+        string within max_typos edits of token).
+        """
+        if max_typos == 0:
+            node = self.root
+            for ch in token:
+                node = node.children.get(ch)
+                if node is None:
+                    return
+            if prefix:
+                yield from ((word, 0, docs) for word, docs in self._words(node, token))
+            elif node.docs is not None:
+                yield token, 0, node.docs
+            return
+
+        # only cells within max_typos of the diagonal can stay under the limit,
+        # so each row computes that band and caps everything else at k + 1
+        n, k = len(token), max_typos
+        start = [min(j, k + 1) for j in range(n + 1)]
+        stack = [(self.root, "", start, start[n])]
+        while stack:
+            node, path, row, typos = stack.pop()
+            if prefix:
+                # a word's typos are those of its best-aligned prefix: the
+                # fewest row[n] seen on the way down
+                typos = min(typos, row[n])
+                if typos <= k and min(row) >= typos:
+                    # no row below gets under min(row): every word below has typos
+                    yield from ((word, typos, docs) for word, docs in self._words(node, path))
+                    continue
+            else:
+                typos = row[n]
+            if node.docs is not None and typos <= k:
+                yield path, typos, node.docs
+            d = len(path) + 1
+            lo, hi = max(1, d - k), min(n, d + k)
+            if lo > hi and not (prefix and typos <= k):
+                continue
+            for ch, child in node.children.items():
+                new = [k + 1] * (n + 1)
+                new[0] = min(d, k + 1)
+                best = new[0]
+                for j in range(lo, hi + 1):
+                    v = min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (token[j - 1] != ch), k + 1)
+                    new[j] = v
+                    if v < best:
+                        best = v
+                if best <= k or (prefix and typos <= k):
+                    stack.append((child, path + ch, new, typos))
+
+
+class _Documents:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def create(self, document):
+        self._collection.add(document, action="create")
+        return document
+
+    def upsert(self, document):
+        self._collection.add(document, action="upsert")
+        return document
+
+    def import_(self, documents, import_parameters=None, batch_size=None):
+        """
+        Bulk import like Typesense's /documents/import: documents is a list of
+        dicts (returns a list of results) or a JSONL string (returns JSONL).
+        Each result is {"success": true} or {"success": false, "error", "code", "document"}.
+        """
+        action = (import_parameters or {}).get("action", "create")
+        raw = isinstance(documents, (str, bytes))
+        if raw:
+            lines = documents.decode("utf-8") if isinstance(documents, bytes) else documents
+            documents = [line for line in lines.split("\n") if line.strip()]
+        results = []
+        for doc in documents:
+            try:
+                self._collection.add(json.loads(doc) if isinstance(doc, str) else doc, action=action)
+                results.append({"success": True})
+            except (ValueError, KeyError) as exc:
+                code = 409 if isinstance(exc, KeyError) else 400
+                results.append({"success": False, "error": str(exc).strip("'\""), "code": code,
+                                "document": doc if isinstance(doc, str) else json.dumps(doc)})
+        return "\n".join(json.dumps(r) for r in results) if raw else results
+
+    def search(self, params):
+        return self._collection.search(params)
+
+
+class EmbeddedCollection:
+    """
+    In-process Typesense collection.
+
+    String fields go into the token trie; numeric fields are kept as NumPy
+    columns. search() takes the same parameters as documents.search() (q,
+    query_by, per_page, page, prefix, num_typos, infix, filter_by, sort_by,
+    facet_by) and returns the same response shape.
+
+    Every query token must match (the last one as a prefix when prefix is
+    on); if nothing matches, tokens are dropped from the right, as with
+    Typesense's default drop_tokens_threshold. By default hits are ranked by
+    total typos, then exact over prefix matches, then the earliest query_by
+    field.
+
+    infix ("off", "always" or "fallback", per query_by field) matches part
+    codes anywhere inside a value, ignoring separators and case ("4iwp"
+    finds 17FU4-IWPCM). It is answered from a code_index.CodeIndex over the
+    string fields, built on first use and kept up to date on writes; with
+    "fallback" it only runs when the regular match needed to drop tokens.
+
+    filter_by is answered with boolean masks: numeric ranges and comparisons
+    come from a sorted copy of the column with searchsorted, string token /
+    prefix filters from the trie. Clauses are joined with && and ||
+    (no parentheses).
+    """
+
+    # Typesense defaults: no typos below 4 characters, 1 typo below 7
+    min_len_1typo = 4
+    min_len_2typo = 7
+
+    def __init__(self, name, string_fields=None, documents=(), numeric_fields=()):
+        self.name = name
+        # None: index every field that holds a string or a number (a ".*" schema)
+        self.auto_fields = string_fields is None
+        self.string_fields = [] if string_fields is None else list(string_fields)
+        self.numeric_fields = list(numeric_fields)
+        self.docs = []
+        self._ids = {}                           # document "id" -> internal id
+        self._columns = {f: [] for f in self.numeric_fields}   # field -> values by internal id (NaN = missing)
+        self._sorted = {}                        # field -> (values, argsort, sorted values), built on demand
+        self._masks = {}                         # (field, string filter) -> bool mask, reset on writes
+        self._codes = None                       # CodeIndex over string_fields for infix, built on demand
+        self.trie = Trie()
+        self.documents = _Documents(self)
+        for doc in documents:
+            self.add(doc)
+
+    @classmethod
+    def from_schema(cls, schema):
+        """Collection for a Typesense schema dict: string fields are indexed, int/float fields become columns."""
+        fields = schema.get("fields", [])
+        if any(f["name"] == ".*" for f in fields):
+            return cls(schema["name"])
+        return cls(schema["name"], [f["name"] for f in fields if f.get("type") in ("string", "string[]")],
+                   numeric_fields=[f["name"] for f in fields if f.get("type") in NUMERIC_TYPES])
+
+    @classmethod
+    def from_csv(cls, path, name):
+        """
+        Load a CSV in one pass; columns whose values all parse as numbers are
+        stored as float columns and left out of the text index.
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            numeric = {c: True for c in reader.fieldnames or ()}
+            rows = []
+            for row in reader:
+                for c, v in row.items():
+                    if numeric.get(c) and v:
+                        try:
+                            float(v)
+                        except ValueError:
+                            numeric[c] = False
+                rows.append(row)
+        num_cols = [c for c, is_num in numeric.items() if is_num]
+        for row in rows:
+            for c in num_cols:
+                row[c] = float(row[c]) if row[c] else None
+        return cls(name, [c for c, is_num in numeric.items() if not is_num], rows, num_cols)
+
+    def add(self, doc, action="create"):
+        """
+        Index a document (dict); returns its internal id. With action="create"
+        an existing "id" raises KeyError; with "upsert" it is replaced.
+        """
+        key = str(doc.get("id", len(self.docs)))
+        doc_id = self._ids.get(key)
+        if doc_id is not None and action == "create":
+            raise KeyError(f"A document with id {key} already exists.")
+        doc = dict(doc, id=key)
+
+        # validate and convert everything first: a bad value must leave the index untouched
+        new_strings, new_numeric = [], []
+        if self.auto_fields:
+            for field, value in doc.items():
+                if field == "id" or field in self.string_fields or field in self._columns:
+                    continue
+                if isinstance(value, str):
+                    new_strings.append(field)
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    new_numeric.append(field)
+        numbers = {}
+        for field in [*self._columns, *new_numeric]:
+            value = doc.get(field)
+            try:
+                numbers[field] = np.nan if value is None else float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Field `{field}` must be a number.") from None
+
+        if doc_id is None:
+            doc_id = len(self.docs)
+            self._ids[key] = doc_id
+            self.docs.append(doc)
+        else:
+            self._unindex(doc_id)
+            self.docs[doc_id] = doc
+        self.string_fields.extend(new_strings)
+        for field in new_numeric:
+            self.numeric_fields.append(field)
+            self._columns[field] = [np.nan] * len(self.docs)
+        for field in self.string_fields:
+            value = doc.get(field)
+            if value is not None:
+                for token in tokenize(value):
+                    self.trie.insert(token, field, doc_id)
+        for field, column in self._columns.items():
+            if doc_id < len(column):
+                column[doc_id] = numbers[field]
+            else:
+                column.append(numbers[field])
+        if self._codes is not None:
+            if new_strings or doc_id < len(self._codes):
+                self._codes = None               # new field or replaced row: rebuild on next infix query
+            else:
+                self._codes.add(doc)
+        self._sorted.clear()
+        self._masks.clear()
+        return doc_id
+
+    def _unindex(self, doc_id):
+        doc = self.docs[doc_id]
+        for field in self.string_fields:
+            value = doc.get(field)
+            if value is None:
+                continue
+            for token in tokenize(value):
+                node = self.trie.root
+                for ch in token:
+                    node = node.children[ch]
+                node.docs.get(field, set()).discard(doc_id)
+
+    def column(self, field):
+        """(values, argsort, sorted values) for a numeric field; NaN (missing) sorts last."""
+        if field not in self._sorted:
+            values = np.asarray(self._columns[field], dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            self._sorted[field] = (values, order, values[order])
+        return self._sorted[field]
+
+    # -- filter_by ---------------------------------------------------------
+
+    def _range_mask(self, field, lo=-np.inf, hi=np.inf, lo_incl=True, hi_incl=True):
+        _, order, ordered = self.column(field)
+        i = np.searchsorted(ordered, lo, "left" if lo_incl else "right")
+        j = np.searchsorted(ordered, hi, "right" if hi_incl else "left")
+        mask = np.zeros(len(self.docs), dtype=bool)
+        mask[order[i:j]] = True
+        return mask
+
+    def _numeric_mask(self, field, cond):
+        for op in (">=", "<=", "!=", ">", "<", "="):
+            if cond.startswith(op):
+                x = float(cond[len(op):])
+                if op == "!=":
+                    return ~self._range_mask(field, x, x) & ~np.isnan(self.column(field)[0])
+                return {
+                    ">=": lambda: self._range_mask(field, lo=x),
+                    "<=": lambda: self._range_mask(field, hi=x),
+                    ">": lambda: self._range_mask(field, lo=x, lo_incl=False),
+                    "<": lambda: self._range_mask(field, hi=x, hi_incl=False),
+                    "=": lambda: self._range_mask(field, x, x),
+                }[op]()
+        mask = np.zeros(len(self.docs), dtype=bool)
+        items = cond[1:-1].split(",") if cond.startswith("[") and cond.endswith("]") else [cond]
+        for item in items:
+            if ".." in item:                     # [lo..hi], inclusive
+                lo, hi = item.split("..")
+                mask |= self._range_mask(field, float(lo), float(hi))
+            else:
+                x = float(item)
+                mask |= self._range_mask(field, x, x)
+        return mask
+
+    def _token_mask(self, field, value):
+        """Docs whose field contains every token of value (the last one as a prefix if value ends with *)."""
+        prefix = value.endswith("*")
+        tokens = tokenize(value.rstrip("*"))
+        mask = np.ones(len(self.docs), dtype=bool)
+        for i, token in enumerate(tokens):
+            ids = set()
+            for _, _, docs in self.trie.search(token, 0, prefix and i == len(tokens) - 1):
+                ids.update(docs.get(field, ()))
+            token_mask = np.zeros(len(self.docs), dtype=bool)
+            token_mask[list(ids)] = True
+            mask &= token_mask
+        return mask
+
+    def _string_mask(self, field, cond):
+        key = (field, cond)
+        if key not in self._masks:
+            if len(self._masks) >= 1024:
+                self._masks.clear()
+            self._masks[key] = self._build_string_mask(field, cond)
+        return self._masks[key]
+
+    def _build_string_mask(self, field, cond):
+        negate = cond.startswith("!=")
+        exact = negate or cond.startswith("=")
+        cond = cond[2 if negate else 1 if exact else 0:].strip()
+        items = cond[1:-1].split(",") if cond.startswith("[") and cond.endswith("]") else [cond]
+        items = [item.strip().strip("`") for item in items]
+        mask = np.zeros(len(self.docs), dtype=bool)
+        for item in items:
+            if exact:
+                mask |= np.fromiter((d.get(field) == item for d in self.docs), bool, len(self.docs))
+            else:
+                mask |= self._token_mask(field, item)
+        return ~mask if negate else mask
+
+    def filter_mask(self, filter_by):
+        """Boolean mask over internal ids for a Typesense filter_by expression."""
+        mask = np.zeros(len(self.docs), dtype=bool)
+        for disjunct in filter_by.split("||"):
+            part = np.ones(len(self.docs), dtype=bool)
+            for clause in disjunct.split("&&"):
+                field, sep, cond = clause.partition(":")
+                field, cond = field.strip(), cond.strip()
+                if not sep or not cond:
+                    raise ValueError(f"Could not parse the filter query: {clause.strip()!r}.")
+                if field in self._columns:
+                    part &= self._numeric_mask(field, cond.replace(" ", ""))
+                elif field in self.string_fields:
+                    part &= self._string_mask(field, cond)
+                else:
+                    raise ValueError(f"Could not find a filter field named `{field}` in the schema.")
+            mask |= part
+        return mask
+
+    # -- text match --------------------------------------------------------
+
+    def _typos(self, token, num_typos):
+        if len(token) < self.min_len_1typo:
+            return 0
+        if len(token) < self.min_len_2typo:
+            return min(num_typos, 1)
+        return num_typos
+
+    def _match(self, tokens, fields, prefixes, num_typos):
+        """{doc id: [typos, prefix matches, best field rank, matched tokens]} for docs matching every token."""
+        matched = None
+        for i, token in enumerate(tokens):
+            last = i == len(tokens) - 1
+            # one trie walk per distinct (typos, prefix) setting, not per field
+            groups = {}
+            for rank, field in enumerate(fields):
+                setting = (self._typos(token, num_typos[rank]), prefixes[rank] and last)
+                groups.setdefault(setting, []).append((rank, field))
+            per_doc = {}
+            for (max_typos, prefix), group in groups.items():
+                for word, typos, docs in self.trie.search(token, max_typos, prefix):
+                    is_prefix = word != token
+                    for rank, field in group:
+                        for doc_id in docs.get(field, ()):
+                            cand = (typos, is_prefix, rank, word)
+                            if doc_id not in per_doc or cand < per_doc[doc_id]:
+                                per_doc[doc_id] = cand
+            if matched is None:
+                matched = {d: [t, int(p), r, [w]] for d, (t, p, r, w) in per_doc.items()}
+            else:
+                matched = {d: [m[0] + per_doc[d][0], m[1] + per_doc[d][1], min(m[2], per_doc[d][2]),
+                               m[3] + [per_doc[d][3]]]
+                           for d, m in matched.items() if d in per_doc}
+            if not matched:
+                return {}
+        return matched or {}
+
+    def code_index(self):
+        """CodeIndex over the string fields; its row ids are internal doc ids."""
+        if self._codes is None:
+            self._codes = CodeIndex(self.string_fields)
+            for doc in self.docs:
+                self._codes.add(doc)
+        return self._codes
+
+    def _infix(self, q, fields, infix, fallback):
+        """{doc id: best field rank} for docs with q inside a field whose infix mode applies."""
+        hits = {}
+        for rank, (field, mode) in enumerate(zip(fields, infix)):
+            if mode == "always" or (mode == "fallback" and fallback):
+                for doc_id in self.code_index().contains(q, [field], limit=None):
+                    hits.setdefault(doc_id, rank)
+        return hits
+
+    def _highlights(self, doc, fields, words):
+        highlights = []
+        for field in fields:
+            value = doc.get(field)
+            tokens = set(tokenize(value)) if value is not None else ()
+            hit = [w for w in words if w in tokens]
+            if hit:
+                highlights.append({"field": field, "snippet": value, "matched_tokens": hit})
+        return highlights
+
+    # -- sort_by / facet_by ------------------------------------------------
+
+    def _order(self, ids, text_match, sort_by):
+        """Positions into ids in sort_by order (default _text_match:desc); ties keep ids ascending."""
+        keys = [ids]
+        for spec in reversed([s.strip() for s in (sort_by or "_text_match:desc").split(",") if s.strip()]):
+            field, _, direction = spec.partition(":")
+            desc = direction.strip().lower() != "asc"
+            if field == "_text_match":
+                values = text_match.astype(np.float64)
+            elif field in self._columns:
+                values = self.column(field)[0][ids]
+            else:
+                raise ValueError(f"Could not find a field named `{field}` in the schema for sorting.")
+            values = -values if desc else values
+            keys.append(np.where(np.isnan(values), np.inf, values))     # missing values last
+        return np.lexsort(keys)
+
+    def _facets(self, ids, facet_by):
+        facets = []
+        for field in [f.strip() for f in facet_by.split(",") if f.strip()]:
+            if field in self._columns:
+                values = self.column(field)[0][ids]
+                values = values[~np.isnan(values)]
+                uniq, counts = np.unique(values, return_counts=True)
+                top = np.argsort(-counts, kind="stable")[:10]
+                stats = {"total_values": int(len(uniq))}
+                if len(values):
+                    stats.update(min=float(values.min()), max=float(values.max()),
+                                 sum=float(values.sum()), avg=float(values.mean()))
+                facets.append({"field_name": field, "counts": [
+                    {"count": int(counts[i]), "value": repr(float(uniq[i]))} for i in top], "stats": stats})
+            elif field in self.string_fields:
+                counts = {}
+                for i in ids:
+                    value = self.docs[i].get(field)
+                    if value is not None:
+                        counts[value] = counts.get(value, 0) + 1
+                top = sorted(counts.items(), key=lambda x: -x[1])[:10]
+                facets.append({"field_name": field, "counts": [{"count": c, "value": v} for v, c in top],
+                               "stats": {"total_values": len(counts)}})
+            else:
+                raise ValueError(f"Could not find a facet field named `{field}` in the schema.")
+        return facets
+
+    def search(self, params):
+        start = time.perf_counter()
+        q = str(params.get("q", ""))
+        # numeric fields never match text; only the indexed string fields are searched
+        fields = [f.strip() for f in str(params.get("query_by", "")).split(",")]
+        fields = [f for f in fields if f in self.string_fields]
+        per_page = int(params.get("per_page", 10))
+        page = int(params.get("page", 1))
+        prefix = params.get("prefix", True)
+        prefixes = [prefix] * len(fields) if isinstance(prefix, bool) else _per_field(prefix, len(fields), _parse_bool)
+        num_typos = _per_field(params.get("num_typos", 2), len(fields), int)
+        infix = _per_field(params.get("infix", "off"), len(fields), str.lower)
+        mask = self.filter_mask(params["filter_by"]) if params.get("filter_by") else None
+
+        tokens = []
+        matched = {}
+        if q.strip() == "*":
+            ids = np.flatnonzero(mask) if mask is not None else np.arange(len(self.docs))
+            text_match = np.zeros(len(ids), dtype=np.int64)
+        else:
+            tokens = tokenize(q)
+            while tokens and fields:
+                matched = self._match(tokens, fields, prefixes, num_typos)
+                if mask is not None:
+                    matched = {d: m for d, m in matched.items() if mask[d]}
+                if matched:
+                    break
+                tokens = tokens[:-1]             # drop tokens from the right
+            full = tokenize(q)
+            if compact(q) and any(mode != "off" for mode in infix):
+                hits = self._infix(q, fields, infix, fallback=len(tokens) < len(full))
+                hits = {d: r for d, r in hits.items() if mask is None or mask[d]}
+                if hits and len(tokens) < len(full):
+                    matched, tokens = {}, full   # whole-query infix hits beat dropped-token matches
+                for doc_id, rank in hits.items():
+                    matched.setdefault(doc_id, [0, 1, rank, []])
+            ids = np.fromiter(matched, dtype=np.int64, count=len(matched))
+            text_match = np.fromiter(
+                ((len(tokens) << 24) - (t << 16) - (p << 8) - r for t, p, r, _ in matched.values()),
+                dtype=np.int64, count=len(matched))
+
+        order = self._order(ids, text_match, params.get("sort_by"))
+        hits = []
+        for pos in order[(page - 1) * per_page: page * per_page]:
+            doc_id = int(ids[pos])
+            doc = self.docs[doc_id]
+            words = matched[doc_id][3] if matched else []
+            hits.append({
+                "document": doc,
+                "highlights": self._highlights(doc, fields, words),
+                "text_match": int(text_match[pos]),
+            })
+        return {
+            "facet_counts": self._facets(ids, params["facet_by"]) if params.get("facet_by") else [],
+            "found": len(ids),
+            "hits": hits,
+            "out_of": len(self.docs),
+            "page": page,
+            "request_params": {"collection_name": self.name, "per_page": per_page, "q": q},
+            "search_time_ms": int((time.perf_counter() - start) * 1000),
+        }
+
+
+class _Collections(dict):
+    def __missing__(self, name):
+        raise KeyError(f"Collection not found: {name}")
+
+    def create(self, schema):
+        self[schema["name"]] = EmbeddedCollection.from_schema(schema)
+        return {"name": schema["name"], "num_documents": 0, "fields": schema.get("fields", [])}
+
+
+class LocalClient:
+    """Offline replacement for typesense.Client: client.collections[name].documents.search(params)."""
+
+    def __init__(self):
+        self.collections = _Collections()
+
+    @classmethod
+    def from_csv(cls, path, name):
+        client = cls()
+        client.collections[name] = EmbeddedCollection.from_csv(path, name)
+        return client
+
+
+if __name__ == "__main__":
+    # Query latency over sample.csv.
+    t0 = time.perf_counter()
+    col = LocalClient.from_csv("sample.csv", "machinedata").collections["machinedata"]
+    query_by = ",".join(col.string_fields)
+    print(f"loaded {len(col.docs)} docs in {(time.perf_counter() - t0) * 1e3:.1f} ms, indexed fields: {query_by}")
+
+    for q, typos in [("17FU4", 0), ("17FU4IWPCN", 1), ("17FU4IWPCN", 2), ("ytie99 q51ptg4z", 0)]:
+        params = {"q": q, "query_by": query_by, "per_page": 3, "prefix": "true", "num_typos": typos}
+        n = 200
+        t0 = time.perf_counter()
+        for _ in range(n):
+            res = col.documents.search(params)
+        t = (time.perf_counter() - t0) / n
+        print(f"{q!r} num_typos={typos}: found {res['found']}, {t * 1e6:.0f} us/query,",
+              [h["document"]["ProductName"] for h in res["hits"]])
+
+    # Filtered browse over 100x sample.csv: sorted columns + masks vs. a row scan.
+    import random
+
+    big = EmbeddedCollection("big", col.string_fields, numeric_fields=col.numeric_fields)
+    rng = random.Random(0)
+    for i in range(100):
+        for doc in col.docs:
+            doc = dict(doc, id=f"{i}-{doc['id']}")
+            doc["MPN"] = rng.choice(["17F", "X1J", "847"]) + doc["MPN"][3:]
+            big.add(doc)
+    params = {"q": "*", "filter_by": "Attribute_3:[10..20] && MPN:17F*", "sort_by": "Attribute_1:desc", "per_page": 10}
+
+    def scan():
+        rows = [d for d in big.docs if d["Attribute_3"] is not None and 10 <= d["Attribute_3"] <= 20
+                and any(t.startswith("17f") for t in tokenize(d["MPN"]))]
+        return sorted(rows, key=lambda d: -d["Attribute_1"])[:10]
+
+    res = big.documents.search(params)
+    assert [h["document"]["id"] for h in res["hits"]] == [d["id"] for d in scan()]
+    for name, fn in [("columnar", lambda: big.documents.search(params)), ("row scan", scan)]:
+        n = 50
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        print(f"{params['filter_by']!r} over {len(big.docs)} docs, {name}: "
+              f"{(time.perf_counter() - t0) / n * 1e3:.2f} ms/query (found {res['found']})")